@@ -0,0 +1,83 @@
+''' Benchmark of step and step_back pairs in RLCard games
+
+Every decision of a few games is expanded as in tree search: each legal
+action is stepped into and stepped back from. The undo log of the games is
+compared with the deep copy of the game state that the games used to take
+before every step.
+'''
+import argparse
+import time
+from copy import deepcopy
+
+import rlcard
+
+
+def snapshot_game(game):
+    ''' Deep copy the game state, as the games did before the undo log
+    '''
+    return deepcopy({key: value for key, value in vars(game).items() if key not in ('np_random', 'history')})
+
+def run_pairs(env, num_games, with_deepcopy):
+    ''' Step into and back from every legal action of num_games games
+
+    Returns:
+        (tuple): The number of step and step_back pairs, and the elapsed seconds
+    '''
+    num_pairs = 0
+    elapsed = 0.
+    for _ in range(num_games):
+        state, _ = env.reset()
+        while not env.is_over():
+            legal_actions = list(state['legal_actions'])
+            start = time.perf_counter()
+            for action in legal_actions:
+                if with_deepcopy:
+                    snapshot_game(env.game)
+                env.step(action)
+                env.step_back()
+            elapsed += time.perf_counter() - start
+            num_pairs += len(legal_actions)
+            state, _ = env.step(legal_actions[env.np_random.randint(len(legal_actions))])
+    return num_pairs, elapsed
+
+def run(args):
+    print('{:<18}{:>16}{:>16}{:>10}'.format('game', 'undo log (/s)', 'deepcopy (/s)', 'speedup'))
+    for env_name in args.envs:
+        rates = []
+        for with_deepcopy in (False, True):
+            env = rlcard.make(env_name, config={'seed': args.seed, 'allow_step_back': True})
+            num_pairs, elapsed = run_pairs(env, args.num_games, with_deepcopy)
+            rates.append(num_pairs / elapsed)
+        print('{:<18}{:>16.0f}{:>16.0f}{:>9.1f}x'.format(env_name, rates[0], rates[1], rates[0] / rates[1]))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Step back benchmark in RLCard")
+    parser.add_argument(
+        '--envs',
+        type=str,
+        nargs='+',
+        default=[
+            'blackjack',
+            'leduc-holdem',
+            'limit-holdem',
+            'no-limit-holdem',
+            'uno',
+            'mahjong',
+            'doudizhu',
+            'pisti',
+        ],
+    )
+    parser.add_argument(
+        '--num_games',
+        type=int,
+        default=20,
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+    )
+
+    args = parser.parse_args()
+
+    run(args)
@@ -12,26 +12,11 @@ from rlcard.utils import (
     get_device,
     set_seed,
     tournament,
+    parallel_tournament,
+    duplicate_tournament,
+    load_model,
 )
 
-def load_model(model_path, env=None, position=None, device=None):
-    if os.path.isfile(model_path):  # Torch model
-        import torch
-        agent = torch.load(model_path, map_location=device)
-        agent.set_device(device)
-    elif os.path.isdir(model_path):  # CFR model
-        from rlcard.agents import CFRAgent
-        agent = CFRAgent(env, model_path)
-        agent.load()
-    elif model_path == 'random':  # Random model
-        from rlcard.agents import RandomAgent
-        agent = RandomAgent(num_actions=env.num_actions)
-    else:  # A model in the model zoo
-        from rlcard import models
-        agent = models.load(model_path).agents[position]
-    
-    return agent
-
 def evaluate(args):
 
     # Check whether gpu is available
@@ -50,9 +35,24 @@ def evaluate(args):
     env.set_agents(agents)
 
     # Evaluate
-    rewards = tournament(env, args.num_games)
-    for position, reward in enumerate(rewards):
-        print(position, args.models[position], reward)
+    if args.duplicate:
+        result = duplicate_tournament(env, args.num_games, args.seed, args.target_width)
+        print('Played', len(result.scores.payoffs), 'duplicate deals')
+        for position, reward in enumerate(result.scores.mean):
+            print(position, args.models[position], reward,
+                  '95% CI [{:.4f}, {:.4f}]'.format(result.scores.lower[position], result.scores.upper[position]),
+                  'difference', result.differences.mean[position],
+                  '95% CI [{:.4f}, {:.4f}]'.format(result.differences.lower[position],
+                                                   result.differences.upper[position]))
+    elif args.num_workers > 1:
+        result = parallel_tournament(env, args.num_games, args.num_workers, args.seed)
+        for position, reward in enumerate(result.mean):
+            print(position, args.models[position], reward,
+                  '95% CI [{:.4f}, {:.4f}]'.format(result.lower[position], result.upper[position]))
+    else:
+        rewards = tournament(env, args.num_games)
+        for position, reward in enumerate(rewards):
+            print(position, args.models[position], reward)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser("Evaluation example in RLCard")
@@ -69,6 +69,7 @@ if __name__ == '__main__':
             'no-limit-holdem',
             'uno',
             'gin-rummy',
+            'pisti',
         ],
     )
     parser.add_argument(
@@ -94,6 +95,23 @@ if __name__ == '__main__':
         type=int,
         default=10000,
     )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=1,
+        help='Number of processes playing the games',
+    )
+    parser.add_argument(
+        '--duplicate',
+        action='store_true',
+        help='Play every deal in all the seatings, num_games is then the maximum number of deals',
+    )
+    parser.add_argument(
+        '--target_width',
+        type=float,
+        default=None,
+        help='Stop the duplicate evaluation once the 95%% confidence intervals of the differences are narrower',
+    )
 
     args = parser.parse_args()
 
@@ -0,0 +1,95 @@
+''' An example of evaluating many models against each other in RLCard
+'''
+import argparse
+
+import numpy as np
+
+from rlcard.utils import (
+    League,
+    find_models,
+)
+
+def evaluate_league(args):
+
+    # Gather the models
+    models = list(args.models)
+    if args.models_dir:
+        models += find_models(args.models_dir)
+
+    # Play the pairings that are not cached yet
+    league = League(
+        args.env,
+        models,
+        args.num_games,
+        cache_path=args.cache,
+        num_workers=args.num_workers,
+        seed=args.seed,
+    )
+    league.run()
+
+    # Print the ratings and the payoff matrix
+    payoffs, ratings = league.results()
+    for i in np.argsort(-ratings):
+        print('{:8.1f}  {}'.format(ratings[i], models[i]))
+    print()
+    print('Mean payoff of the row model against the column model')
+    for i, model in enumerate(models):
+        print('{:3d} '.format(i) + ' '.join('{:8.3f}'.format(payoff) for payoff in payoffs[i]) + '  ' + model)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("League evaluation example in RLCard")
+    parser.add_argument(
+        '--env',
+        type=str,
+        default='leduc-holdem',
+        choices=[
+            'blackjack',
+            'leduc-holdem',
+            'limit-holdem',
+            'doudizhu',
+            'mahjong',
+            'no-limit-holdem',
+            'uno',
+            'gin-rummy',
+            'pisti',
+        ],
+    )
+    parser.add_argument(
+        '--models',
+        nargs='*',
+        default=[
+            'random',
+            'leduc-holdem-cfr',
+            'leduc-holdem-rule-v1',
+            'leduc-holdem-rule-v2',
+        ],
+    )
+    parser.add_argument(
+        '--models_dir',
+        type=str,
+        default='',
+        help='Directory of torch models and CFR model directories added to the league',
+    )
+    parser.add_argument(
+        '--cache',
+        type=str,
+        default='experiments/league/pairings.json',
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+    )
+    parser.add_argument(
+        '--num_games',
+        type=int,
+        default=1000,
+    )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=1,
+    )
+
+    args = parser.parse_args()
+    evaluate_league(args)
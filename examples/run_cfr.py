@@ -6,6 +6,8 @@ import argparse
 import rlcard
 from rlcard.agents import (
     CFRAgent,
+    TabularCFRAgent,
+    ParallelCFRAgent,
     RandomAgent,
 )
 from rlcard.utils import (
@@ -35,13 +37,33 @@ def train(args):
     set_seed(args.seed)
 
     # Initilize CFR Agent
-    agent = CFRAgent(
-        env,
-        os.path.join(
-            args.log_dir,
-            'cfr_model',
-        ),
-    )
+    if args.num_workers > 1:
+        agent = ParallelCFRAgent(
+            env,
+            os.path.join(
+                args.log_dir,
+                'parallel_cfr_model',
+            ),
+            num_workers=args.num_workers,
+            seed=args.seed,
+        )
+    elif args.tabular:
+        agent = TabularCFRAgent(
+            env,
+            os.path.join(
+                args.log_dir,
+                'tabular_cfr_model',
+            ),
+            variant=args.variant,
+        )
+    else:
+        agent = CFRAgent(
+            env,
+            os.path.join(
+                args.log_dir,
+                'cfr_model',
+            ),
+        )
     agent.load()  # If we have saved model, we first load the model
 
     # Evaluate CFR against random
@@ -68,6 +90,8 @@ def train(args):
 
         # Get the paths
         csv_path, fig_path = logger.csv_path, logger.fig_path
+    if args.num_workers > 1:
+        agent.close()
     # Plot the learning curve
     plot_curve(csv_path, fig_path, 'cfr')
 
@@ -93,6 +117,28 @@ if __name__ == '__main__':
         type=int,
         default=100,
     )
+    parser.add_argument(
+        '--tabular',
+        action='store_true',
+        help='Keep the regrets and policies in NumPy tables',
+    )
+    parser.add_argument(
+        '--variant',
+        type=str,
+        default='cfr',
+        choices=[
+            'cfr',
+            'cfr+',
+            'linear',
+        ],
+        help='The CFR variant of the tabular agent',
+    )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=1,
+        help='Run the traversals in this many processes',
+    )
     parser.add_argument(
         '--log_dir',
         type=str,
@@ -0,0 +1,135 @@
+''' An example of training Monte Carlo CFR with external or outcome sampling
+'''
+import os
+import argparse
+
+import rlcard
+from rlcard.agents import (
+    MCCFRAgent,
+    RandomAgent,
+)
+from rlcard.utils import (
+    set_seed,
+    tournament,
+    Logger,
+    plot_curve,
+)
+
+def train(args):
+    # Make environments, MCCFR needs step_back for the traversals
+    env = rlcard.make(
+        args.env,
+        config={
+            'seed': args.seed,
+            'allow_step_back': True,
+        }
+    )
+    eval_env = rlcard.make(
+        args.env,
+        config={
+            'seed': args.seed,
+        }
+    )
+
+    # Seed numpy, torch, random
+    set_seed(args.seed)
+
+    # Initilize MCCFR Agent
+    agent = MCCFRAgent(
+        env,
+        os.path.join(
+            args.log_dir,
+            'mccfr_model',
+        ),
+        sampling=args.sampling,
+        num_traversals=args.num_traversals,
+        num_workers=args.num_workers,
+        seed=args.seed,
+    )
+    agent.load()  # If we have saved model, we first load the model
+
+    # Evaluate MCCFR against random
+    eval_env.set_agents([agent] + [RandomAgent(num_actions=env.num_actions) for _ in range(1, env.num_players)])
+
+    # Start training
+    with Logger(args.log_dir) as logger:
+        for episode in range(args.num_episodes):
+            agent.train()
+            print('\rIteration {}'.format(episode), end='')
+            # Evaluate the performance. Play with Random agents.
+            if episode % args.evaluate_every == 0:
+                agent.save() # Save model
+                logger.log_performance(
+                    episode,
+                    tournament(
+                        eval_env,
+                        args.num_eval_games
+                    )[0]
+                )
+
+        # Get the paths
+        csv_path, fig_path = logger.csv_path, logger.fig_path
+    agent.close()
+    # Plot the learning curve
+    plot_curve(csv_path, fig_path, 'mccfr')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("MCCFR example in RLCard")
+    parser.add_argument(
+        '--env',
+        type=str,
+        default='leduc-holdem',
+        choices=[
+            'leduc-holdem',
+            'limit-holdem',
+            'pisti',
+        ],
+    )
+    parser.add_argument(
+        '--sampling',
+        type=str,
+        default='external',
+        choices=[
+            'external',
+            'outcome',
+        ],
+    )
+    parser.add_argument(
+        '--num_traversals',
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+    )
+    parser.add_argument(
+        '--num_episodes',
+        type=int,
+        default=5000,
+    )
+    parser.add_argument(
+        '--num_eval_games',
+        type=int,
+        default=2000,
+    )
+    parser.add_argument(
+        '--evaluate_every',
+        type=int,
+        default=100,
+    )
+    parser.add_argument(
+        '--log_dir',
+        type=str,
+        default='experiments/mccfr_result/',
+    )
+
+    args = parser.parse_args()
+
+    train(args)
@@ -12,6 +12,8 @@ from rlcard.utils import (
     set_seed,
     tournament,
     reorganize,
+    run_batch,
+    AsyncEvaluator,
     Logger,
     plot_curve,
 )
@@ -44,7 +46,8 @@ def train(args):
                 mlp_layers=[64,64],
                 device=device,
                 save_path=args.log_dir,
-                save_every=args.save_every
+                save_every=args.save_every,
+                prioritized_replay=args.prioritized_replay,
             )
 
     elif args.algorithm == 'nfsp':
@@ -59,34 +62,62 @@ def train(args):
                 q_mlp_layers=[64,64],
                 device=device,
                 save_path=args.log_dir,
-                save_every=args.save_every
+                save_every=args.save_every,
+                q_prioritized_replay=args.prioritized_replay,
             )
     agents = [agent]
     for _ in range(1, env.num_players):
         agents.append(RandomAgent(num_actions=env.num_actions))
     env.set_agents(agents)
 
+    # Copies of the environment played together, the decisions of the agent
+    # in all of them are batched
+    train_envs = [env]
+    for i in range(1, args.num_envs):
+        train_env = rlcard.make(args.env, config={'seed': args.seed + i})
+        train_env.set_agents(agents)
+        train_envs.append(train_env)
+
     # Start training
     with Logger(args.log_dir) as logger:
-        for episode in range(args.num_episodes):
+        # Evaluate snapshots of the agent in a background process
+        if args.async_evaluation:
+            evaluator = AsyncEvaluator(
+                env,
+                agents,
+                logger,
+                args.num_eval_games,
+                max_outstanding=args.max_outstanding_evaluations,
+                seed=args.seed,
+            )
+
+        for episode in range(0, args.num_episodes, args.num_envs):
 
             if args.algorithm == 'nfsp':
                 agents[0].sample_episode_policy()
 
-            # Generate data from the environment
-            trajectories, payoffs = env.run(is_training=True)
+            # Generate data from the environments
+            if args.num_envs > 1:
+                batch_trajectories, _ = run_batch(train_envs, is_training=True)
+            else:
+                trajectories, payoffs = env.run(is_training=True)
 
-            # Reorganaize the data to be state, action, reward, next_state, done
-            trajectories = reorganize(trajectories, payoffs)
+                # Reorganaize the data to be state, action, reward, next_state, done
+                batch_trajectories = [reorganize(trajectories, payoffs)]
 
             # Feed transitions into agent memory, and train the agent
             # Here, we assume that DQN always plays the first position
             # and the other players play randomly (if any)
-            for ts in trajectories[0]:
-                agent.feed(ts)
+            for trajectories in batch_trajectories:
+                for ts in trajectories[0]:
+                    agent.feed(ts)
 
             # Evaluate the performance. Play with random agents.
-            if episode % args.evaluate_every == 0:
+            if args.async_evaluation:
+                if episode % args.evaluate_every < args.num_envs:
+                    evaluator.submit(episode, agent)
+                evaluator.poll()
+            elif episode % args.evaluate_every < args.num_envs:
                 logger.log_performance(
                     episode,
                     tournament(
@@ -95,6 +126,9 @@ def train(args):
                     )[0]
                 )
 
+        if args.async_evaluation:
+            evaluator.close()
+
         # Get the paths
         csv_path, fig_path = logger.csv_path, logger.fig_path
 
@@ -175,6 +209,32 @@ if __name__ == '__main__':
         type=int,
         default=-1)
 
+    parser.add_argument(
+        '--num_envs',
+        type=int,
+        default=1,
+        help='Number of environments played together with batched decisions',
+    )
+
+    parser.add_argument(
+        '--async_evaluation',
+        action='store_true',
+        help='Evaluate snapshots of the agent in a background process',
+    )
+
+    parser.add_argument(
+        '--max_outstanding_evaluations',
+        type=int,
+        default=2,
+        help='Number of pending background evaluations before training waits',
+    )
+
+    parser.add_argument(
+        '--prioritized_replay',
+        action='store_true',
+        help='Sample the replay memory of DQN by priority',
+    )
+
     args = parser.parse_args()
 
     os.environ["CUDA_VISIBLE_DEVICES"] = args.cuda
@@ -10,6 +10,10 @@ if 'torch' in installed_packages:
     from rlcard.agents.nfsp_agent import NFSPAgent as NFSPAgent
 
 from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.cfr_policy_agent import CFRPolicyAgent
+from rlcard.agents.tabular_cfr_agent import TabularCFRAgent
+from rlcard.agents.mccfr_agent import MCCFRAgent
+from rlcard.agents.parallel_cfr_agent import ParallelCFRAgent
 from rlcard.agents.human_agents.limit_holdem_human_agent import HumanAgent as LimitholdemHumanAgent
 from rlcard.agents.human_agents.nolimit_holdem_human_agent import HumanAgent as NolimitholdemHumanAgent
 from rlcard.agents.human_agents.leduc_holdem_human_agent import HumanAgent as LeducholdemHumanAgent
@@ -5,6 +5,7 @@ import os
 import pickle
 
 from rlcard.utils.utils import *
+from rlcard.agents.cfr_policy_agent import save_cfr_policy
 
 class CFRAgent():
     ''' Implement CFR (chance sampling) algorithm
@@ -197,6 +198,13 @@ class CFRAgent():
         pickle.dump(self.iteration, iteration_file)
         iteration_file.close()
 
+        # The average policy is also saved in the format of CFRPolicyAgent for serving
+        keys = list(self.average_policy.keys())
+        average_policy = np.zeros((len(keys), self.env.num_actions))
+        for i, key in enumerate(keys):
+            average_policy[i] = self.average_policy[key]
+        save_cfr_policy(self.model_path, keys, average_policy)
+
     def load(self):
         ''' Load model
         '''
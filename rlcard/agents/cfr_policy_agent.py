@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+
+from rlcard.utils.utils import remove_illegal
+
+KEYS_FILE = 'average_policy_keys.npy'
+PROBS_FILE = 'average_policy_probs.npy'
+
+def save_cfr_policy(model_path, keys, average_policy):
+    ''' Save an average policy in the columnar format read by CFRPolicyAgent
+
+    The keys are sorted and written as a fixed width bytes array, and the rows of
+    the average policy, normalized over all the actions, as a float32 matrix in the
+    same order. Both are plain .npy files in model_path.
+
+    Args:
+        model_path (str): The directory the policy is saved in
+        keys (list): The state_str of every information set, all of the same length
+        average_policy (numpy.array): The (len(keys), num_actions) cumulative average policy
+    '''
+    if not os.path.exists(model_path):
+        os.makedirs(model_path)
+
+    keys = np.array(keys, dtype=bytes)
+    probs = np.asarray(average_policy, dtype=np.float64)
+    order = np.argsort(keys, kind='stable')
+    sums = probs.sum(axis=1, keepdims=True)
+    probs = np.divide(probs, sums, out=np.zeros_like(probs), where=sums > 0)
+
+    np.save(os.path.join(model_path, KEYS_FILE), keys[order])
+    np.save(os.path.join(model_path, PROBS_FILE), probs[order].astype(np.float32))
+
+class CFRPolicyAgent():
+    ''' Play the average policy of a CFR model saved by save_cfr_policy
+
+    The keys and probabilities are memory-mapped, and a state is looked up by binary
+    search on the sorted keys, so loading a model does not read it into memory and
+    several processes serving the same model share its pages.
+    '''
+
+    def __init__(self, model_path):
+        ''' Load the policy
+
+        Args:
+            model_path (str): The directory the policy was saved in
+        '''
+        self.use_raw = False
+        self.model_path = model_path
+        self.keys = np.load(os.path.join(model_path, KEYS_FILE), mmap_mode='r')
+        self.probs = np.load(os.path.join(model_path, PROBS_FILE), mmap_mode='r')
+        self.num_actions = self.probs.shape[1]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, obs):
+        ''' Find the row of a state
+
+        Args:
+            obs (bytes): state_str
+
+        Returns:
+            (int): The row of the state, or None if it is not in the policy
+        '''
+        if len(obs) > self.keys.dtype.itemsize:
+            return None
+        index = int(np.searchsorted(self.keys, obs))
+        # Fixed width bytes are padded with zeros, which indexing strips
+        if index < len(self.keys) and self.keys[index] == obs.rstrip(b'\x00'):
+            return index
+        return None
+
+    def action_probs(self, obs, legal_actions):
+        ''' Obtain the average policy of a state
+
+        Args:
+            obs (bytes): state_str
+            legal_actions (list): List of leagel actions
+
+        Returns:
+            action_probs(numpy.array): The action probabilities, uniform over the legal
+                                       actions for an unknown state
+        '''
+        index = self.lookup(obs)
+        if index is None:
+            action_probs = np.zeros(self.num_actions)
+        else:
+            action_probs = self.probs[index].astype(np.float64)
+        return remove_illegal(action_probs, legal_actions)
+
+    def eval_step(self, state):
+        ''' Given a state, predict action based on average policy
+
+        Args:
+            state (numpy.array): State representation
+
+        Returns:
+            action (int): Predicted action
+            info (dict): A dictionary containing information
+        '''
+        legal_actions = list(state['legal_actions'].keys())
+        probs = self.action_probs(state['obs'].tobytes(), legal_actions)
+        action = np.random.choice(len(probs), p=probs)
+
+        info = {}
+        info['probs'] = {state['raw_legal_actions'][i]: float(probs[legal_actions[i]]) for i in range(len(legal_actions))}
+
+        return action, info
+
+    def step(self, state):
+        ''' Predict the action like in evaluation, the policy is fixed
+
+        Args:
+            state (numpy.array): State representation
+
+        Returns:
+            action (int): Predicted action
+        '''
+        return self.eval_step(state)[0]
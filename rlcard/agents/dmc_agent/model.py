@@ -58,26 +58,31 @@ class DMCAgent:
         self.action_shape = action_shape
 
     def step(self, state):
-        action_keys, values = self.predict(state)
+        return self.step_batch([state])[0]
 
-        if self.exp_epsilon > 0 and np.random.rand() < self.exp_epsilon:
-            action = np.random.choice(action_keys)
-        else:
-            action_idx = np.argmax(values)
-            action = action_keys[action_idx]
+    def step_batch(self, states):
+        action_keys, values = self.predict_batch(states)
+        actions = self._best_actions(action_keys, values)
 
-        return action
+        if self.exp_epsilon > 0:
+            for i in np.flatnonzero(np.random.rand(len(states)) < self.exp_epsilon):
+                actions[i] = np.random.choice(action_keys[i])
+
+        return actions
 
     def eval_step(self, state):
-        action_keys, values = self.predict(state)
+        actions, infos = self.eval_step_batch([state])
+        return actions[0], infos[0]
 
-        action_idx = np.argmax(values)
-        action = action_keys[action_idx]
+    def eval_step_batch(self, states):
+        action_keys, values = self.predict_batch(states)
+        actions = self._best_actions(action_keys, values)
 
-        info = {}
-        info['values'] = {state['raw_legal_actions'][i]: float(values[i]) for i in range(len(action_keys))}
+        infos = []
+        for state, keys, state_values in zip(states, action_keys, values):
+            infos.append({'values': {state['raw_legal_actions'][i]: float(state_values[i]) for i in range(len(keys))}})
 
-        return action, info
+        return actions, infos
 
     def share_memory(self):
         self.net.share_memory()
@@ -89,25 +94,54 @@ class DMCAgent:
         return self.net.parameters()
 
     def predict(self, state):
+        action_keys, values = self.predict_batch([state])
+        return action_keys[0], values[0]
+
+    def predict_batch(self, states):
+        ''' Predict the values of the legal actions of a batch of states
+
+        Every legal action of every state is a row of a single forward pass,
+        with the observation of its state.
+
+        Args:
+            states (list): State dicts
+
+        Returns:
+            action_keys (list): The legal actions of every state
+            values (list): The values of these actions
+        '''
         # Prepare obs and actions
-        obs = state['obs'].astype(np.float32)
-        legal_actions = state['legal_actions']
-        action_keys = np.array(list(legal_actions.keys()))
-        action_values = list(legal_actions.values())
+        obs = np.stack([state['obs'] for state in states]).astype(np.float32)
+        counts = [len(state['legal_actions']) for state in states]
+        keys = np.array([key for state in states for key in state['legal_actions']])
+        action_values = [value for state in states for value in state['legal_actions'].values()]
+        features = np.zeros((len(keys), self.action_shape[0]), dtype=np.float32)
         # One-hot encoding if there is no action features
-        for i in range(len(action_values)):
-            if action_values[i] is None:
-                action_values[i] = np.zeros(self.action_shape[0])
-                action_values[i][action_keys[i]] = 1
-        action_values = np.array(action_values, dtype=np.float32)
+        for i, value in enumerate(action_values):
+            if value is None:
+                features[i, keys[i]] = 1
+            else:
+                features[i] = value
 
-        obs = np.repeat(obs[np.newaxis, :], len(action_keys), axis=0)
+        obs = np.repeat(obs, counts, axis=0)
 
         # Predict Q values
         values = self.net.forward(torch.from_numpy(obs).to(self.device),
-                                  torch.from_numpy(action_values).to(self.device))
-
-        return action_keys, values.cpu().detach().numpy()
+                                  torch.from_numpy(features).to(self.device))
+
+        splits = np.cumsum(counts)[:-1]
+        return np.split(keys, splits), np.split(values.cpu().detach().numpy(), splits)
+
+    @staticmethod
+    def _best_actions(action_keys, values):
+        # Pad the values of the states to the same number of actions
+        counts = np.array([len(state_values) for state_values in values])
+        rows = np.repeat(np.arange(len(values)), counts)
+        columns = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        padded = np.full((len(values), counts.max()), -np.inf, dtype=np.float32)
+        padded[rows, columns] = np.concatenate(values)
+        best = np.argmax(padded, axis=1)
+        return [keys[index] for keys, index in zip(action_keys, best)]
 
     def forward(self, obs, actions):
         return self.net.forward(obs, actions)
@@ -11,6 +11,12 @@ class DMCAgentPettingZoo(DMCAgent):
     def eval_step(self, state):
         return super().eval_step(wrap_state(state))
 
+    def step_batch(self, states):
+        return super().step_batch([wrap_state(state) for state in states])
+
+    def eval_step_batch(self, states):
+        return super().eval_step_batch([wrap_state(state) for state in states])
+
     def feed(self, ts):
         state, action, reward, next_state, done = tuple(ts)
         state = wrap_state(state)
@@ -33,7 +33,7 @@ import torch.nn as nn
 from collections import namedtuple
 from copy import deepcopy
 
-from rlcard.utils.utils import remove_illegal
+from rlcard.utils.utils import remove_illegal, stack_states, sample_actions
 
 Transition = namedtuple('Transition', ['state', 'action', 'reward', 'next_state', 'done', 'legal_actions'])
 
@@ -59,7 +59,10 @@ class DQNAgent(object):
                  learning_rate=0.00005,
                  device=None,
                  save_path=None,
-                 save_every=float('inf'),):
+                 save_every=float('inf'),
+                 prioritized_replay=False,
+                 prioritized_replay_alpha=0.6,
+                 prioritized_replay_beta=0.4,):
 
         '''
         Q-Learning algorithm for off-policy TD control using Function Approximation.
@@ -86,6 +89,10 @@ class DQNAgent(object):
             device (torch.device): whether to use the cpu or gpu
             save_path (str): The path to save the model checkpoints
             save_every (int): Save the model every X training steps
+            prioritized_replay (bool): Sample the replay memory by priority
+            prioritized_replay_alpha (float): How much the priorities are used, 0 is uniform
+            prioritized_replay_beta (float): The importance sampling exponent, which
+              is annealed to 1 over epsilon_decay_steps
         '''
         self.use_raw = False
         self.replay_memory_init_size = replay_memory_init_size
@@ -95,6 +102,8 @@ class DQNAgent(object):
         self.batch_size = batch_size
         self.num_actions = num_actions
         self.train_every = train_every
+        self.prioritized_replay = prioritized_replay
+        self.prioritized_replay_alpha = prioritized_replay_alpha
 
         # Torch device
         if device is None:
@@ -111,6 +120,9 @@ class DQNAgent(object):
         # The epsilon decay scheduler
         self.epsilons = np.linspace(epsilon_start, epsilon_end, epsilon_decay_steps)
 
+        # The importance sampling exponent scheduler of prioritized replay
+        self.betas = np.linspace(prioritized_replay_beta, 1.0, epsilon_decay_steps)
+
         # Create estimators
         self.q_estimator = Estimator(num_actions=num_actions, learning_rate=learning_rate, state_shape=state_shape, \
             mlp_layers=mlp_layers, device=self.device)
@@ -118,7 +130,10 @@ class DQNAgent(object):
             mlp_layers=mlp_layers, device=self.device)
 
         # Create replay memory
-        self.memory = Memory(replay_memory_size, batch_size)
+        if prioritized_replay:
+            self.memory = PrioritizedMemory(replay_memory_size, batch_size, num_actions, alpha=prioritized_replay_alpha)
+        else:
+            self.memory = Memory(replay_memory_size, batch_size, num_actions)
         
         # Checkpoint saving parameters
         self.save_path = save_path
@@ -149,15 +164,27 @@ class DQNAgent(object):
         Returns:
             action (int): an action id
         '''
-        q_values = self.predict(state)
+        return self.step_batch([state])[0]
+
+    def step_batch(self, states):
+        ''' Predict the epsilon-greedy actions of a batch of states with one forward pass
+
+        Args:
+            states (list): current states
+
+        Returns:
+            actions (list): an action id for every state
+        '''
+        obs, legal_mask = stack_states(states, self.num_actions)
+        q_values = self.predict_batch(obs, legal_mask)
         epsilon = self.epsilons[min(self.total_t, self.epsilon_decay_steps-1)]
-        legal_actions = list(state['legal_actions'].keys())
-        probs = np.ones(len(legal_actions), dtype=float) * epsilon / len(legal_actions)
-        best_action_idx = legal_actions.index(np.argmax(q_values))
-        probs[best_action_idx] += (1.0 - epsilon)
-        action_idx = np.random.choice(np.arange(len(probs)), p=probs)
+        # With probability epsilon a uniformly random legal action, else the best one
+        actions = np.argmax(q_values, axis=1)
+        explore = np.random.random_sample(len(states)) < epsilon
+        if explore.any():
+            actions[explore] = sample_actions(legal_mask[explore])
 
-        return legal_actions[action_idx]
+        return actions.tolist()
 
     def eval_step(self, state):
         ''' Predict the action for evaluation purpose.
@@ -169,13 +196,28 @@ class DQNAgent(object):
             action (int): an action id
             info (dict): A dictionary containing information
         '''
-        q_values = self.predict(state)
-        best_action = np.argmax(q_values)
+        actions, infos = self.eval_step_batch([state])
+        return actions[0], infos[0]
+
+    def eval_step_batch(self, states):
+        ''' Predict the greedy actions of a batch of states with one forward pass
+
+        Args:
+            states (list): current states
+
+        Returns:
+            actions (list): an action id for every state
+            infos (list): A dictionary containing information for every state
+        '''
+        q_values = self.predict_batch(*stack_states(states, self.num_actions))
+        actions = np.argmax(q_values, axis=1).tolist()
 
-        info = {}
-        info['values'] = {state['raw_legal_actions'][i]: float(q_values[list(state['legal_actions'].keys())[i]]) for i in range(len(state['legal_actions']))}
+        infos = []
+        for state, state_q_values in zip(states, q_values):
+            legal_actions = list(state['legal_actions'].keys())
+            infos.append({'values': {state['raw_legal_actions'][i]: float(state_q_values[legal_actions[i]]) for i in range(len(legal_actions))}})
 
-        return best_action, info
+        return actions, infos
 
     def predict(self, state):
         ''' Predict the masked Q-values
@@ -186,13 +228,20 @@ class DQNAgent(object):
         Returns:
             q_values (numpy.array): a 1-d array where each entry represents a Q value
         '''
-        
-        q_values = self.q_estimator.predict_nograd(np.expand_dims(state['obs'], 0))[0]
-        masked_q_values = -np.inf * np.ones(self.num_actions, dtype=float)
-        legal_actions = list(state['legal_actions'].keys())
-        masked_q_values[legal_actions] = q_values[legal_actions]
+        return self.predict_batch(*stack_states([state], self.num_actions))[0]
+
+    def predict_batch(self, obs, legal_mask):
+        ''' Predict the masked Q-values of a batch of observations
 
-        return masked_q_values
+        Args:
+            obs (numpy.array): (batch, state_shape) observations
+            legal_mask (numpy.array): (batch, num_actions) boolean mask of the legal actions
+
+        Returns:
+            q_values (numpy.array): (batch, num_actions) Q values, -inf for the illegal actions
+        '''
+        q_values = self.q_estimator.predict_nograd(obs)
+        return np.where(legal_mask, q_values, -np.inf)
 
     def train(self):
         ''' Train the network
@@ -200,16 +249,17 @@ class DQNAgent(object):
         Returns:
             loss (float): The loss of the current batch.
         '''
-        state_batch, action_batch, reward_batch, next_state_batch, done_batch, legal_actions_batch = self.memory.sample()
+        if self.prioritized_replay:
+            beta = self.betas[min(self.total_t, self.epsilon_decay_steps-1)]
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, legal_actions_batch, \
+                weights, indices = self.memory.sample(beta)
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, legal_actions_batch = self.memory.sample()
 
         # Calculate best next actions using Q-network (Double DQN)
         q_values_next = self.q_estimator.predict_nograd(next_state_batch)
-        legal_actions = []
-        for b in range(self.batch_size):
-            legal_actions.extend([i + b * self.num_actions for i in legal_actions_batch[b]])
-        masked_q_values = -np.inf * np.ones(self.num_actions * self.batch_size, dtype=float)
-        masked_q_values[legal_actions] = q_values_next.flatten()[legal_actions]
-        masked_q_values = masked_q_values.reshape((self.batch_size, self.num_actions))
+        num_legal = legal_actions_batch.shape[1]
+        masked_q_values = np.where(legal_actions_batch, q_values_next[:, :num_legal], -np.inf)
         best_actions = np.argmax(masked_q_values, axis=1)
 
         # Evaluate best next actions using Target-network (Double DQN)
@@ -218,9 +268,11 @@ class DQNAgent(object):
             self.discount_factor * q_values_next_target[np.arange(self.batch_size), best_actions]
 
         # Perform gradient descent update
-        state_batch = np.array(state_batch)
-
-        loss = self.q_estimator.update(state_batch, action_batch, target_batch)
+        if self.prioritized_replay:
+            loss, td_errors = self.q_estimator.update(state_batch, action_batch, target_batch, weights, return_td_errors=True)
+            self.memory.update_priorities(indices, td_errors)
+        else:
+            loss = self.q_estimator.update(state_batch, action_batch, target_batch)
         print('\rINFO - Step {}, rl-loss: {}'.format(self.total_t, loss), end='')
 
         # Update the target estimator
@@ -255,17 +307,21 @@ class DQNAgent(object):
         self.q_estimator.device = device
         self.target_estimator.device = device
 
-    def checkpoint_attributes(self):
+    def checkpoint_attributes(self, with_buffers=True):
         '''
         Return the current checkpoint attributes (dict)
         Checkpoint attributes are used to save and restore the model in the middle of training
         Saves the model state dict, optimizer state dict, and all other instance variables
+
+        Args:
+            with_buffers (bool): Whether to include the transitions of the replay memory,
+              the agent is restored with an empty memory otherwise
         '''
         
         return {
             'agent_type': 'DQNAgent',
             'q_estimator': self.q_estimator.checkpoint_attributes(),
-            'memory': self.memory.checkpoint_attributes(),
+            'memory': self.memory.checkpoint_attributes(with_data=with_buffers),
             'total_t': self.total_t,
             'train_t': self.train_t,
             'replay_memory_init_size': self.replay_memory_init_size,
@@ -279,7 +335,10 @@ class DQNAgent(object):
             'train_every': self.train_every,
             'device': self.device,
             'save_path': self.save_path,
-            'save_every': self.save_every
+            'save_every': self.save_every,
+            'prioritized_replay': self.prioritized_replay,
+            'prioritized_replay_alpha': self.prioritized_replay_alpha,
+            'prioritized_replay_beta': self.betas.min() if len(self.betas) else None,
         }
 
     @classmethod
@@ -309,6 +368,9 @@ class DQNAgent(object):
             device=checkpoint['device'],
             save_path=checkpoint['save_path'],
             save_every=checkpoint['save_every'],
+            prioritized_replay=checkpoint.get('prioritized_replay', False),
+            prioritized_replay_alpha=checkpoint.get('prioritized_replay_alpha', 0.6),
+            prioritized_replay_beta=0.4 if checkpoint.get('prioritized_replay_beta') is None else checkpoint['prioritized_replay_beta'],
         )
         
         agent_instance.total_t = checkpoint['total_t']
@@ -316,7 +378,10 @@ class DQNAgent(object):
         
         agent_instance.q_estimator = Estimator.from_checkpoint(checkpoint['q_estimator'])
         agent_instance.target_estimator = deepcopy(agent_instance.q_estimator)
-        agent_instance.memory = Memory.from_checkpoint(checkpoint['memory'])
+        if agent_instance.prioritized_replay:
+            agent_instance.memory = PrioritizedMemory.from_checkpoint(checkpoint['memory'])
+        else:
+            agent_instance.memory = Memory.from_checkpoint(checkpoint['memory'])
 
         return agent_instance
                      
@@ -388,7 +453,7 @@ class Estimator(object):
             q_as = self.qnet(s).cpu().numpy()
         return q_as
 
-    def update(self, s, a, y):
+    def update(self, s, a, y, weights=None, return_td_errors=False):
         ''' Updates the estimator towards the given targets.
             In this case y is the target-network estimated
             value of the Q-network optimal actions, which
@@ -398,9 +463,11 @@ class Estimator(object):
           s (np.ndarray): (batch, state_shape) state representation
           a (np.ndarray): (batch,) integer sampled actions
           y (np.ndarray): (batch,) value of optimal actions according to Q-target
+          weights (np.ndarray): (batch,) importance sampling weights of the squared errors
+          return_td_errors (bool): also return the TD errors y - Q(s, a)
 
         Returns:
-          The calculated loss on the batch.
+          The calculated loss on the batch, and the (batch,) TD errors if return_td_errors is True.
         '''
         self.optimizer.zero_grad()
 
@@ -417,13 +484,19 @@ class Estimator(object):
         Q = torch.gather(q_as, dim=-1, index=a.unsqueeze(-1)).squeeze(-1)
 
         # update model
-        batch_loss = self.mse_loss(Q, y)
+        if weights is None:
+            batch_loss = self.mse_loss(Q, y)
+        else:
+            weights = torch.from_numpy(weights).float().to(self.device)
+            batch_loss = torch.mean(weights * (Q - y) ** 2)
         batch_loss.backward()
         self.optimizer.step()
         batch_loss = batch_loss.item()
 
         self.qnet.eval()
 
+        if return_td_errors:
+            return batch_loss, (y - Q).detach().cpu().numpy()
         return batch_loss
     
     def checkpoint_attributes(self):
@@ -495,16 +568,38 @@ class EstimatorNetwork(nn.Module):
 
 class Memory(object):
     ''' Memory for saving transitions
+
+    The transitions are kept in a ring buffer of preallocated arrays, created at
+    the first save with the shape and dtype of the state. The legal actions of
+    the next states are packed in bitmasks of num_actions bits, and a batch is
+    sampled with one fancy index per array.
     '''
 
-    def __init__(self, memory_size, batch_size):
+    def __init__(self, memory_size, batch_size, num_actions=None):
         ''' Initialize
         Args:
             memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+            num_actions (int): the number of actions, the legal action masks grow
+              to the largest saved action if it is not given
         '''
         self.memory_size = memory_size
         self.batch_size = batch_size
-        self.memory = []
+        self.num_actions = num_actions or 0
+
+        # Next position to write and number of saved transitions
+        self.position = 0
+        self.size = 0
+
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+        self.legal_actions = None
+
+    def __len__(self):
+        return self.size
 
     def save(self, state, action, reward, next_state, legal_actions, done):
         ''' Save transition into memory
@@ -517,33 +612,69 @@ class Memory(object):
             legal_actions (list): the legal actions of the next state
             done (boolean): whether the episode is finished
         '''
-        if len(self.memory) == self.memory_size:
-            self.memory.pop(0)
-        transition = Transition(state, action, reward, next_state, done, legal_actions)
-        self.memory.append(transition)
+        if self.states is None:
+            self._allocate(np.asarray(state))
+        if len(legal_actions) and max(legal_actions) >= self.num_actions:
+            self._widen(max(legal_actions) + 1)
+
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        # Pack the mask in the bit order of np.packbits, the first action is the highest bit
+        num_bits = self.legal_actions.shape[1] * 8
+        mask = 0
+        for legal_action in legal_actions:
+            mask |= 1 << (num_bits - 1 - legal_action)
+        self.legal_actions[i] = np.frombuffer(mask.to_bytes(num_bits // 8, 'big'), dtype=np.uint8)
+
+        self.position = (i + 1) % self.memory_size
+        self.size = min(self.size + 1, self.memory_size)
 
     def sample(self):
         ''' Sample a minibatch from the replay memory
 
         Returns:
-            state_batch (list): a batch of states
-            action_batch (list): a batch of actions
-            reward_batch (list): a batch of rewards
-            next_state_batch (list): a batch of states
-            done_batch (list): a batch of dones
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            done_batch (numpy.array): a batch of dones
+            legal_actions_batch (numpy.array): a (batch, num_actions) boolean mask of
+              the legal actions of the next states
         '''
-        samples = random.sample(self.memory, self.batch_size)
-        samples = tuple(zip(*samples))
-        return tuple(map(np.array, samples[:-1])) + (samples[-1],)
+        indices = np.array(random.sample(range(self.size), self.batch_size))
+        return self._gather(indices)
 
-    def checkpoint_attributes(self):
+    def _gather(self, indices):
+        ''' Get the transitions at the given positions, in the format of sample
+        '''
+        legal_actions = np.unpackbits(self.legal_actions[indices], axis=1, count=self.num_actions).astype(bool)
+        return (self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices], legal_actions)
+
+    def checkpoint_attributes(self, with_data=True):
         ''' Returns the attributes that need to be checkpointed
+
+        Args:
+            with_data (bool): Whether to include the transitions, the memory is restored
+              empty otherwise
         '''
-        
+        size = self.size if with_data and self.states is not None else 0
         return {
             'memory_size': self.memory_size,
             'batch_size': self.batch_size,
-            'memory': self.memory
+            'num_actions': self.num_actions,
+            'position': self.position if size else 0,
+            'size': size,
+            'states': self.states[:size] if size else None,
+            'actions': self.actions[:size] if size else None,
+            'rewards': self.rewards[:size] if size else None,
+            'next_states': self.next_states[:size] if size else None,
+            'dones': self.dones[:size] if size else None,
+            'legal_actions': self.legal_actions[:size] if size else None,
         }
             
     @classmethod
@@ -558,6 +689,209 @@ class Memory(object):
             instance (Memory): the restored instance
         '''
         
-        instance = cls(checkpoint['memory_size'], checkpoint['batch_size'])
-        instance.memory = checkpoint['memory']
+        instance = cls(checkpoint['memory_size'], checkpoint['batch_size'], checkpoint.get('num_actions'))
+        if 'memory' in checkpoint:
+            # Checkpoints saved with the list of transitions
+            for transition in checkpoint['memory']:
+                instance.save(transition.state, transition.action, transition.reward,
+                              transition.next_state, transition.legal_actions, transition.done)
+            return instance
+
+        if checkpoint['states'] is not None:
+            instance._allocate(checkpoint['states'][0])
+            size = checkpoint['size']
+            for name in ('states', 'actions', 'rewards', 'next_states', 'dones', 'legal_actions'):
+                getattr(instance, name)[:size] = checkpoint[name]
+            instance.position = checkpoint['position']
+            instance.size = size
+        return instance
+
+    def _allocate(self, state):
+        ''' Allocate the arrays for states like the given one
+        '''
+        self.states = np.zeros((self.memory_size,) + state.shape, dtype=state.dtype)
+        self.next_states = np.zeros((self.memory_size,) + state.shape, dtype=state.dtype)
+        self.actions = np.zeros(self.memory_size, dtype=np.int64)
+        self.rewards = np.zeros(self.memory_size, dtype=np.float32)
+        self.dones = np.zeros(self.memory_size, dtype=bool)
+        self.legal_actions = np.zeros((self.memory_size, (self.num_actions + 7) // 8), dtype=np.uint8)
+
+    def _widen(self, num_actions):
+        ''' Grow the legal action masks to num_actions bits
+        '''
+        self.num_actions = num_actions
+        num_bytes = (num_actions + 7) // 8
+        if num_bytes > self.legal_actions.shape[1]:
+            legal_actions = np.zeros((self.memory_size, num_bytes), dtype=np.uint8)
+            legal_actions[:, :self.legal_actions.shape[1]] = self.legal_actions
+            self.legal_actions = legal_actions
+
+
+class SumTree(object):
+    ''' Sums of priorities over a binary tree stored in an array
+
+    The leaves hold the priorities of the positions of a memory and every node
+    the sum of its children, with the root at index 1. Updates and searches run
+    over a batch of positions at once, one NumPy operation per level.
+    '''
+
+    def __init__(self, capacity):
+        ''' Initialize
+        Args:
+            capacity (int): the number of positions
+        '''
+        self.capacity = capacity
+        self.num_leaves = 1 << max(capacity - 1, 0).bit_length()
+        self.tree = np.zeros(2 * self.num_leaves)
+
+    def total(self):
+        ''' Returns the sum of all the priorities
+        '''
+        return self.tree[1]
+
+    def get(self, indices):
+        ''' Returns the priorities of the given positions
+        '''
+        return self.tree[np.asarray(indices) + self.num_leaves]
+
+    def update(self, indices, priorities):
+        ''' Set the priorities of the given positions
+
+        Args:
+            indices (numpy.array): the positions
+            priorities (numpy.array): their new priorities
+        '''
+        nodes = np.asarray(indices) + self.num_leaves
+        self.tree[nodes] = priorities
+        while nodes[0] > 1:
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        ''' Find the positions where the cumulative sums of the priorities reach the given values
+
+        Args:
+            values (numpy.array): values between 0 and total()
+
+        Returns:
+            (numpy.array): the positions
+        '''
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        while nodes[0] < self.num_leaves:
+            left = 2 * nodes
+            left_sums = self.tree[left]
+            right = values >= left_sums
+            values = np.where(right, values - left_sums, values)
+            nodes = np.where(right, left + 1, left)
+        return nodes - self.num_leaves
+
+
+class PrioritizedMemory(Memory):
+    ''' Memory sampling the transitions in proportion to their priorities
+
+    Proportional prioritized replay of Schaul et al. (2016). A new transition gets
+    the largest priority seen so far, and the priorities are updated from the TD
+    errors of the sampled batches. The importance sampling weights are normalized
+    by their maximum over the batch.
+    '''
+
+    def __init__(self, memory_size, batch_size, num_actions=None, alpha=0.6, epsilon=1e-6):
+        ''' Initialize
+        Args:
+            memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+            num_actions (int): the number of actions
+            alpha (float): the exponent of the priorities, 0 samples uniformly
+            epsilon (float): added to the absolute TD errors so that no priority is zero
+        '''
+        super().__init__(memory_size, batch_size, num_actions)
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(memory_size)
+
+    def save(self, state, action, reward, next_state, legal_actions, done):
+        ''' Save transition into memory with the largest priority
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            legal_actions (list): the legal actions of the next state
+            done (boolean): whether the episode is finished
+        '''
+        position = self.position
+        super().save(state, action, reward, next_state, legal_actions, done)
+        self.tree.update([position], [self.max_priority ** self.alpha])
+
+    def sample(self, beta=0.4):
+        ''' Sample a minibatch by priority, one transition in each of batch_size equal
+        ranges of the cumulative priorities
+
+        Args:
+            beta (float): the importance sampling exponent
+
+        Returns:
+            The batch of Memory.sample, followed by
+            weights (numpy.array): the importance sampling weights
+            indices (numpy.array): the positions of the transitions, for update_priorities
+        '''
+        total = self.tree.total()
+        values = (np.arange(self.batch_size) + np.random.random_sample(self.batch_size)) * total / self.batch_size
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.get(indices) / total
+        weights = (self.size * probs) ** -beta
+        weights /= weights.max()
+        return self._gather(indices) + (weights, indices)
+
+    def update_priorities(self, indices, td_errors):
+        ''' Set the priorities of sampled transitions from their TD errors
+
+        Args:
+            indices (numpy.array): the positions returned by sample
+            td_errors (numpy.array): the TD errors of the transitions
+        '''
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def checkpoint_attributes(self, with_data=True):
+        ''' Returns the attributes that need to be checkpointed
+
+        Args:
+            with_data (bool): Whether to include the transitions and their priorities
+        '''
+        attributes = super().checkpoint_attributes(with_data)
+        attributes.update({
+            'alpha': self.alpha,
+            'epsilon': self.epsilon,
+            'max_priority': self.max_priority,
+            'priorities': self.tree.get(np.arange(attributes['size'])),
+        })
+        return attributes
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        ''' 
+        Restores the attributes from the checkpoint
+        
+        Args:
+            checkpoint (dict): the checkpoint dictionary
+            
+        Returns:
+            instance (PrioritizedMemory): the restored instance
+        '''
+        instance = super().from_checkpoint(checkpoint)
+        instance.alpha = checkpoint.get('alpha', instance.alpha)
+        instance.epsilon = checkpoint.get('epsilon', instance.epsilon)
+        instance.max_priority = checkpoint.get('max_priority', instance.max_priority)
+        if len(instance):
+            # Transitions saved without priorities get the largest one
+            priorities = checkpoint.get('priorities')
+            if priorities is None:
+                priorities = np.full(len(instance), instance.max_priority ** instance.alpha)
+            instance.tree.update(np.arange(len(instance)), priorities)
         return instance
@@ -0,0 +1,228 @@
+import multiprocessing
+import weakref
+
+import numpy as np
+
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.utils import seeding
+
+# The agent of a worker process, built by _init_worker
+_worker_agent = None
+
+def _init_worker(env, sampling, exploration):
+    global _worker_agent
+    _worker_agent = MCCFRAgent(env, sampling=sampling, exploration=exploration)
+
+def _run_worker_jobs(task):
+    policy, iteration, jobs = task
+    _worker_agent.policy = policy
+    _worker_agent.iteration = iteration
+    return _worker_agent.run_jobs(jobs)
+
+def _release(pools):
+    # Stop the pool of an MCCFRAgent, by close() or when the agent is garbage
+    # collected or the interpreter exits
+    for pool in pools:
+        pool.close()
+        pool.join()
+    del pools[:]
+
+class MCCFRAgent(CFRAgent):
+    ''' Implement Monte Carlo CFR with external or outcome sampling
+
+    The policies and regrets are kept and saved like in CFRAgent, so the models
+    can be loaded by either agent. An iteration samples num_traversals traversals
+    for every player against the current policy, which is only updated at the end
+    of the iteration. The traversals are independent and seeded from the seed of
+    the agent, so they can be spread over num_workers processes and the result
+    does not depend on the number of workers.
+
+    Sampling:
+        'external': All the actions of the traversing player are explored and one
+                    action is sampled at the nodes of the other players. A traversal
+                    grows with the number of actions of the traversing player.
+        'outcome': A single trajectory is sampled, with exploration at the nodes of
+                   the traversing player. A traversal only visits as many nodes as
+                   the game is long, which suits long games like Pisti.
+    '''
+
+    def __init__(self, env, model_path='./mccfr_model', sampling='external', exploration=0.6,
+                 num_traversals=1, num_workers=1, seed=None):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class, with step_back allowed. It is reseeded before every traversal.
+            model_path (str): The directory the model is saved in
+            sampling (str): The sampling scheme: external or outcome
+            exploration (float): The probability of a uniform random action of the traversing
+                player in outcome sampling
+            num_traversals (int): The number of traversals per player in an iteration
+            num_workers (int): The number of processes running the traversals
+            seed (int): The random seed of the traversals
+        '''
+        if sampling not in ('external', 'outcome'):
+            raise ValueError('Sampling must be either of the following: external, outcome')
+        super().__init__(env, model_path)
+        self.sampling = sampling
+        self.exploration = exploration
+        self.num_traversals = num_traversals
+        self.num_workers = num_workers
+        self.np_random, _ = seeding.np_random(seed)
+        self.traversal_random = None
+
+        self._pools = []
+        self._finalizer = weakref.finalize(self, _release, self._pools)
+        self._regret_deltas = {}
+        self._average_deltas = {}
+
+    def train(self):
+        ''' Do one iteration of MCCFR
+        '''
+        self.iteration += 1
+        jobs = [(player_id, self.np_random.randint(np.iinfo(np.int32).max))
+                for player_id in range(self.env.num_players)
+                for _ in range(self.num_traversals)]
+
+        if self.num_workers > 1:
+            if not self._pools:
+                # A pool started again after close() is released like the first one
+                if not self._finalizer.alive:
+                    self._finalizer = weakref.finalize(self, _release, self._pools)
+                self._pools.append(multiprocessing.Pool(self.num_workers,
+                                                        initializer=_init_worker,
+                                                        initargs=(self.env, self.sampling, self.exploration)))
+            chunks = np.array_split(np.arange(len(jobs)), self.num_workers)
+            tasks = [(self.policy, self.iteration, [jobs[i] for i in chunk]) for chunk in chunks if len(chunk)]
+            results = [deltas for chunk_deltas in self._pools[0].map(_run_worker_jobs, tasks) for deltas in chunk_deltas]
+        else:
+            results = self.run_jobs(jobs)
+
+        # Merge the deltas in the order of the jobs
+        for regret_deltas, average_deltas in results:
+            for obs, delta in regret_deltas.items():
+                if obs not in self.regrets:
+                    self.regrets[obs] = np.zeros(self.env.num_actions)
+                self.regrets[obs] += delta
+            for obs, delta in average_deltas.items():
+                if obs not in self.average_policy:
+                    self.average_policy[obs] = np.zeros(self.env.num_actions)
+                self.average_policy[obs] += delta
+
+        self.update_policy()
+
+    def run_jobs(self, jobs):
+        ''' Run traversals against the current policy
+
+        Args:
+            jobs (list): (player_id, seed) of every traversal
+
+        Returns:
+            (list): The regret and average policy deltas of every traversal, as dicts from
+                    the state_str to the action values
+        '''
+        results = []
+        for player_id, seed in jobs:
+            self.env.seed(seed)
+            self.traversal_random = np.random.RandomState(seed)
+            self._regret_deltas, self._average_deltas = {}, {}
+            self.env.reset()
+            if self.sampling == 'external':
+                self.traverse_external(player_id)
+            else:
+                self.traverse_outcome(np.ones(self.env.num_players), 1.0, player_id)
+            results.append((self._regret_deltas, self._average_deltas))
+        self._regret_deltas, self._average_deltas = {}, {}
+        return results
+
+    def traverse_external(self, player_id):
+        ''' Traverse the game tree with external sampling
+
+        Args:
+            player_id: The player to update the regrets
+
+        Returns:
+            (float): The sampled utility of the player
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
+
+        current_player = self.env.get_player_id()
+        obs, legal_actions = self.get_state(current_player)
+        action_probs = self.action_probs(obs, legal_actions, self.policy)
+
+        if not current_player == player_id:
+            self._add_delta(self._average_deltas, obs, self.iteration * action_probs)
+            action = self.traversal_random.choice(len(action_probs), p=action_probs)
+            self.env.step(action)
+            utility = self.traverse_external(player_id)
+            self.env.step_back()
+            return utility
+
+        action_utilities = np.zeros(self.env.num_actions)
+        for action in legal_actions:
+            self.env.step(action)
+            action_utilities[action] = self.traverse_external(player_id)
+            self.env.step_back()
+
+        state_utility = np.dot(action_probs, action_utilities)
+        regrets = np.zeros(self.env.num_actions)
+        regrets[legal_actions] = action_utilities[legal_actions] - state_utility
+        self._add_delta(self._regret_deltas, obs, regrets)
+        return state_utility
+
+    def traverse_outcome(self, probs, sample_prob, player_id):
+        ''' Traverse one sampled trajectory with outcome sampling
+
+        Args:
+            probs: The reach probability of the current node for every player
+            sample_prob: The probability of sampling the current node
+            player_id: The player to update the regrets
+
+        Returns:
+            (float): The importance weighted utility of the player
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
+
+        current_player = self.env.get_player_id()
+        obs, legal_actions = self.get_state(current_player)
+        action_probs = self.action_probs(obs, legal_actions, self.policy)
+
+        if current_player == player_id:
+            sample_probs = (1 - self.exploration) * action_probs
+            sample_probs[legal_actions] += self.exploration / len(legal_actions)
+        else:
+            sample_probs = action_probs
+        action = self.traversal_random.choice(len(sample_probs), p=sample_probs)
+
+        new_probs = probs.copy()
+        new_probs[current_player] *= action_probs[action]
+        self.env.step(action)
+        utility = self.traverse_outcome(new_probs, sample_prob * sample_probs[action], player_id)
+        self.env.step_back()
+
+        action_utilities = np.zeros(self.env.num_actions)
+        action_utilities[action] = utility / sample_probs[action]
+        state_utility = action_probs[action] * action_utilities[action]
+
+        if current_player == player_id:
+            counterfactual_prob = (np.prod(probs[:current_player]) *
+                                   np.prod(probs[current_player + 1:]))
+            regrets = np.zeros(self.env.num_actions)
+            regrets[legal_actions] = (action_utilities[legal_actions] - state_utility) * counterfactual_prob / sample_prob
+            self._add_delta(self._regret_deltas, obs, regrets)
+        else:
+            self._add_delta(self._average_deltas, obs, self.iteration * probs[current_player] * action_probs / sample_prob)
+        return state_utility
+
+    def close(self):
+        ''' Stop the worker processes, which is otherwise done when the agent is garbage collected
+        '''
+        self._finalizer()
+
+    @staticmethod
+    def _add_delta(deltas, obs, values):
+        if obs in deltas:
+            deltas[obs] += values
+        else:
+            deltas[obs] = values.copy()
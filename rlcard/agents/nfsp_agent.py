@@ -29,7 +29,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 
 from rlcard.agents.dqn_agent import DQNAgent
-from rlcard.utils.utils import remove_illegal
+from rlcard.utils.utils import remove_illegal_batch, stack_states, sample_actions
 
 Transition = collections.namedtuple('Transition', 'info_state action_probs')
 
@@ -65,7 +65,10 @@ class NFSPAgent(object):
                  evaluate_with='average_policy',
                  device=None,
                  save_path=None,
-                 save_every=float('inf')):
+                 save_every=float('inf'),
+                 q_prioritized_replay=False,
+                 q_prioritized_replay_alpha=0.6,
+                 q_prioritized_replay_beta=0.4):
         ''' Initialize the NFSP agent.
 
         Args:
@@ -92,6 +95,9 @@ class NFSPAgent(object):
             q_train_step (int): Train the model every X steps.
             q_mlp_layers (list): The layer sizes of inner DQN agent.
             device (torch.device): Whether to use the cpu or gpu
+            q_prioritized_replay (bool): Whether the inner DQN agent uses prioritized replay.
+            q_prioritized_replay_alpha (float): The priority exponent of inner DQN agent.
+            q_prioritized_replay_beta (float): The starting importance sampling exponent of inner DQN agent.
         '''
         self.use_raw = False
         self._num_actions = num_actions
@@ -103,7 +109,10 @@ class NFSPAgent(object):
         self._anticipatory_param = anticipatory_param
         self._min_buffer_size_to_learn = min_buffer_size_to_learn
 
-        self._reservoir_buffer = ReservoirBuffer(reservoir_buffer_capacity)
+        self._reservoir_buffer = ReservoirBuffer(reservoir_buffer_capacity, num_actions, pin_memory=torch.cuda.is_available())
+        # Transitions of the current episode, added to the reservoir buffer together
+        self._pending_states = []
+        self._pending_actions = []
         self._prev_timestep = None
         self._prev_action = None
         self.evaluate_with = evaluate_with
@@ -123,7 +132,8 @@ class NFSPAgent(object):
         self._rl_agent = DQNAgent(q_replay_memory_size, q_replay_memory_init_size, \
             q_update_target_estimator_every, q_discount_factor, q_epsilon_start, q_epsilon_end, \
             q_epsilon_decay_steps, q_batch_size, num_actions, state_shape, q_train_every, q_mlp_layers, \
-            rl_learning_rate, device)
+            rl_learning_rate, device, prioritized_replay=q_prioritized_replay, \
+            prioritized_replay_alpha=q_prioritized_replay_alpha, prioritized_replay_beta=q_prioritized_replay_beta)
 
         # Build the average policy supervised model
         self._build_model()
@@ -158,6 +168,7 @@ class NFSPAgent(object):
         Args:
             ts (list): A list of 5 elements that represent the transition.
         '''
+        self._flush_transitions()
         self._rl_agent.feed(ts)
         self.total_t += 1
         if self.total_t>0 and len(self._reservoir_buffer) >= self._min_buffer_size_to_learn and self.total_t%self._train_every == 0:
@@ -173,20 +184,28 @@ class NFSPAgent(object):
         Returns:
             action (int): An action id
         '''
-        obs = state['obs']
-        legal_actions = list(state['legal_actions'].keys())
+        return self.step_batch([state])[0]
+
+    def step_batch(self, states):
+        ''' Returns the actions to be taken in a batch of states, with one forward pass
+
+        Args:
+            states (list): The current states
+
+        Returns:
+            actions (list): An action id for every state
+        '''
         if self._mode == 'best_response':
-            action = self._rl_agent.step(state)
-            one_hot = np.zeros(self._num_actions)
-            one_hot[action] = 1
-            self._add_transition(obs, one_hot)
+            actions = self._rl_agent.step_batch(states)
+            for state, action in zip(states, actions):
+                self._add_transition(state['obs'], action)
 
         elif self._mode == 'average_policy':
-            probs = self._act(obs)
-            probs = remove_illegal(probs, legal_actions)
-            action = np.random.choice(len(probs), p=probs)
+            obs, legal_mask = stack_states(states, self._num_actions)
+            probs = remove_illegal_batch(self._act_batch(obs), legal_mask)
+            actions = sample_actions(probs).tolist()
 
-        return action
+        return actions
 
     def eval_step(self, state):
         ''' Use the average policy for evaluation purpose
@@ -198,19 +217,32 @@ class NFSPAgent(object):
             action (int): An action id.
             info (dict): A dictionary containing information
         '''
+        actions, infos = self.eval_step_batch([state])
+        return actions[0], infos[0]
+
+    def eval_step_batch(self, states):
+        ''' Use the average policy for evaluation purpose, in a batch of states with one forward pass
+
+        Args:
+            states (list): The current states.
+
+        Returns:
+            actions (list): An action id for every state.
+            infos (list): A dictionary containing information for every state
+        '''
         if self.evaluate_with == 'best_response':
-            action, info = self._rl_agent.eval_step(state)
+            actions, infos = self._rl_agent.eval_step_batch(states)
         elif self.evaluate_with == 'average_policy':
-            obs = state['obs']
-            legal_actions = list(state['legal_actions'].keys())
-            probs = self._act(obs)
-            probs = remove_illegal(probs, legal_actions)
-            action = np.random.choice(len(probs), p=probs)
-            info = {}
-            info['probs'] = {state['raw_legal_actions'][i]: float(probs[list(state['legal_actions'].keys())[i]]) for i in range(len(state['legal_actions']))}
+            obs, legal_mask = stack_states(states, self._num_actions)
+            probs = remove_illegal_batch(self._act_batch(obs), legal_mask)
+            actions = sample_actions(probs).tolist()
+            infos = []
+            for state, state_probs in zip(states, probs):
+                legal_actions = list(state['legal_actions'].keys())
+                infos.append({'probs': {state['raw_legal_actions'][i]: float(state_probs[legal_actions[i]]) for i in range(len(legal_actions))}})
         else:
             raise ValueError("'evaluate_with' should be either 'average_policy' or 'best_response'.")
-        return action, info
+        return actions, infos
 
     def sample_episode_policy(self):
         ''' Sample average/best_response policy
@@ -229,29 +261,44 @@ class NFSPAgent(object):
         Returns:
             action_probs (numpy.array): The predicted action probability.
         '''
-        info_state = np.expand_dims(info_state, axis=0)
-        info_state = torch.from_numpy(info_state).float().to(self.device)
+        return self._act_batch(np.expand_dims(info_state, axis=0))[0]
 
-        with torch.no_grad():
-            log_action_probs = self.policy_network(info_state).cpu().numpy()
+    def _act_batch(self, info_states):
+        ''' Predict the action probabilities of a batch of observations
+            Not connected to computation graph
+        Args:
+            info_states (numpy.array): (batch, state_shape) obervations.
+
+        Returns:
+            action_probs (numpy.array): (batch, num_actions) predicted action probabilities.
+        '''
+        info_states = torch.from_numpy(info_states).float().to(self.device)
 
-        action_probs = np.exp(log_action_probs)[0]
+        with torch.no_grad():
+            log_action_probs = self.policy_network(info_states).cpu().numpy()
 
-        return action_probs
+        return np.exp(log_action_probs)
 
-    def _add_transition(self, state, probs):
+    def _add_transition(self, state, action):
         ''' Adds the new transition to the reservoir buffer.
 
-        Transitions are in the form (state, probs).
+        Transitions are in the form (state, action), the action standing for
+        its one-hot probabilities. They are kept until the next feed and then
+        added to the buffer at once.
 
         Args:
             state (numpy.array): The state.
-            probs (numpy.array): The probabilities of each action.
+            action (int): The action taken by the best response.
+        '''
+        self._pending_states.append(state)
+        self._pending_actions.append(action)
+
+    def _flush_transitions(self):
+        ''' Add the pending transitions to the reservoir buffer
         '''
-        transition = Transition(
-                info_state=state,
-                action_probs=probs)
-        self._reservoir_buffer.add(transition)
+        if self._pending_states:
+            self._reservoir_buffer.add_many(self._pending_states, self._pending_actions)
+            self._pending_states, self._pending_actions = [], []
 
     def train_sl(self):
         ''' Compute the loss on sampled transitions and perform a avg-network update.
@@ -266,19 +313,12 @@ class NFSPAgent(object):
                 len(self._reservoir_buffer) < self._min_buffer_size_to_learn):
             return None
 
-        transitions = self._reservoir_buffer.sample(self._batch_size)
-        info_states = [t.info_state for t in transitions]
-        action_probs = [t.action_probs for t in transitions]
+        # (batch, state_size), (batch, num_actions)
+        info_states, eval_action_probs = self._reservoir_buffer.sample(self._batch_size, self.device)
 
         self.policy_network_optimizer.zero_grad()
         self.policy_network.train()
 
-        # (batch, state_size)
-        info_states = torch.from_numpy(np.array(info_states)).float().to(self.device)
-
-        # (batch, num_actions)
-        eval_action_probs = torch.from_numpy(np.array(action_probs)).float().to(self.device)
-
         # (batch, num_actions)
         log_forecast_action_probs = self.policy_network(info_states)
 
@@ -303,18 +343,24 @@ class NFSPAgent(object):
         self.device = device
         self._rl_agent.set_device(device)
         
-    def checkpoint_attributes(self):
+    def checkpoint_attributes(self, with_buffers=True):
         '''
         Return the current checkpoint attributes (dict)
         Checkpoint attributes are used to save and restore the model in the middle of training
         Saves the model state dict, optimizer state dict, and all other instance variables
+
+        Args:
+            with_buffers (bool): Whether to include the reservoir buffer and the replay
+              memory of the RL agent, the agent is restored with empty ones otherwise
         '''
         
+        if with_buffers:
+            self._flush_transitions()
         return {
             'agent_type': 'NFSPAgent',
             'policy_network': self.policy_network.checkpoint_attributes(),
-            'reservoir_buffer': self._reservoir_buffer.checkpoint_attributes(),
-            'rl_agent': self._rl_agent.checkpoint_attributes(),
+            'reservoir_buffer': self._reservoir_buffer.checkpoint_attributes(with_data=with_buffers),
+            'rl_agent': self._rl_agent.checkpoint_attributes(with_buffers=with_buffers),
             'policy_network_optimizer': self.policy_network_optimizer.state_dict(),
             'device': self.device,
             'anticipatory_param': self._anticipatory_param,
@@ -361,7 +407,7 @@ class NFSPAgent(object):
         agent.policy_network.eval()
         agent.policy_network_optimizer = torch.optim.Adam(agent.policy_network.parameters(), lr=agent._sl_learning_rate)
         agent.policy_network_optimizer.load_state_dict(checkpoint['policy_network_optimizer'])
-        agent._rl_agent.from_checkpoint(checkpoint['rl_agent'])
+        agent._rl_agent = DQNAgent.from_checkpoint(checkpoint['rl_agent'])
         agent._rl_agent.set_device(agent.device)
         return agent
         
@@ -454,73 +500,215 @@ class AveragePolicyNetwork(nn.Module):
 class ReservoirBuffer(object):
     ''' Allows uniform sampling over a stream of data.
 
-    This class supports the storage of arbitrary elements, such as observation
-    tensors, integer actions, etc.
+    The elements are pairs of an information state and target action
+    probabilities, kept in preallocated arrays created at the first add with
+    the shape of the first state. The targets are stored sparsely, as the
+    actions with a nonzero probability and their probabilities, so a one-hot
+    target takes a single action, and they are expanded to (batch, num_actions)
+    only when a batch is sampled, on the device of the batch. A batch of
+    elements is added at once with add_many, which draws the reservoir
+    replacements of all of them together.
 
     See https://en.wikipedia.org/wiki/Reservoir_sampling for more details.
     '''
 
-    def __init__(self, reservoir_buffer_capacity):
+    def __init__(self, reservoir_buffer_capacity, num_actions=None, pin_memory=False):
         ''' Initialize the buffer.
+
+        Args:
+            reservoir_buffer_capacity (int): The maximum number of elements.
+            num_actions (int): The number of actions, the targets grow to the largest
+              added action if it is not given.
+            pin_memory (bool): Whether the samples moved to a cuda device are
+              staged in pinned memory.
         '''
         self._reservoir_buffer_capacity = reservoir_buffer_capacity
-        self._data = []
+        self.num_actions = num_actions or 0
+        self.pin_memory = pin_memory
+        self._size = 0
         self._add_calls = 0
 
+        self.info_states = None
+        self.actions = None
+        self.probs = None
+
     def add(self, element):
         ''' Potentially adds `element` to the reservoir buffer.
 
         Args:
-            element (object): data to be added to the reservoir buffer.
+            element (Transition): data to be added to the reservoir buffer.
         '''
-        if len(self._data) < self._reservoir_buffer_capacity:
-            self._data.append(element)
-        else:
-            idx = np.random.randint(0, self._add_calls + 1)
-            if idx < self._reservoir_buffer_capacity:
-                self._data[idx] = element
-        self._add_calls += 1
+        actions, probs = sparse_probs([element.action_probs])
+        self.num_actions = max(self.num_actions, len(element.action_probs))
+        self.add_many([element.info_state], actions, probs)
+
+    def add_many(self, info_states, actions, probs=None):
+        ''' Potentially adds a batch of elements to the reservoir buffer, in order.
+
+        The elements fill the free slots first. Then the element seen after k
+        others replaces a random slot with probability capacity / (k + 1), as if
+        they were added one by one.
 
-    def sample(self, num_samples):
+        Args:
+            info_states (numpy.array): (batch, state_shape) information states.
+            actions (numpy.array): (batch,) actions of one-hot targets, or (batch, k)
+              actions of sparse targets.
+            probs (numpy.array): (batch, k) probabilities of the actions of sparse
+              targets, None for one-hot targets.
+        '''
+        info_states = np.asarray(info_states)
+        num_elements = len(info_states)
+        if num_elements == 0:
+            return
+        actions = np.asarray(actions).reshape(num_elements, -1)
+        if probs is None:
+            probs = np.ones(actions.shape, dtype=np.float32)
+        if self.info_states is None:
+            self._allocate(info_states[0])
+        self._widen(actions.shape[1], int(actions.max()) + 1)
+
+        num_free = min(self._reservoir_buffer_capacity - self._size, num_elements)
+        if num_free > 0:
+            slots = np.arange(self._size, self._size + num_free)
+            self._write(slots, info_states[:num_free], actions[:num_free], probs[:num_free])
+            self._size += num_free
+
+        if num_free < num_elements:
+            calls = self._add_calls + np.arange(num_free, num_elements)
+            slots = np.random.randint(0, calls + 1)
+            kept = np.flatnonzero(slots < self._reservoir_buffer_capacity) + num_free
+            slots = slots[kept - num_free]
+            # A slot drawn twice holds the later element
+            _, last = np.unique(slots[::-1], return_index=True)
+            rows = kept[len(slots) - 1 - last]
+            self._write(slots[len(slots) - 1 - last], info_states[rows], actions[rows], probs[rows])
+        self._add_calls += num_elements
+
+    def sample(self, num_samples, device=None):
         ''' Returns `num_samples` uniformly sampled from the buffer.
 
         Args:
             num_samples (int): The number of samples to draw.
+            device (torch.device): The device of the returned tensors, cpu if None.
 
         Returns:
-            An iterable over `num_samples` random elements of the buffer.
+            info_states (Tensor): (num_samples, state_shape) float information states.
+            action_probs (Tensor): (num_samples, num_actions) float target action probabilities.
 
         Raises:
             ValueError: If there are less than `num_samples` elements in the buffer
         '''
-        if len(self._data) < num_samples:
+        if self._size < num_samples:
             raise ValueError("{} elements could not be sampled from size {}".format(
-                    num_samples, len(self._data)))
-        return random.sample(self._data, num_samples)
+                    num_samples, self._size))
+        indices = np.array(random.sample(range(self._size), num_samples))
+        info_states = torch.from_numpy(self.info_states[indices]).float()
+        actions = torch.from_numpy(self.actions[indices])
+        probs = torch.from_numpy(self.probs[indices])
+        if device is not None and torch.device(device).type != 'cpu':
+            non_blocking = self.pin_memory and torch.device(device).type == 'cuda'
+            if non_blocking:
+                info_states = info_states.pin_memory()
+                actions = actions.pin_memory()
+                probs = probs.pin_memory()
+            info_states = info_states.to(device, non_blocking=non_blocking)
+            actions = actions.to(device, non_blocking=non_blocking)
+            probs = probs.to(device, non_blocking=non_blocking)
+        action_probs = torch.zeros((num_samples, self.num_actions), device=info_states.device)
+        action_probs.scatter_add_(1, actions.long(), probs)
+        return info_states, action_probs
 
     def clear(self):
         ''' Clear the buffer
         '''
-        self._data = []
+        self._size = 0
         self._add_calls = 0
         
-    def checkpoint_attributes(self):
+    def checkpoint_attributes(self, with_data=True):
+        ''' Returns the attributes that need to be checkpointed
+
+        Args:
+            with_data (bool): Whether to include the elements, the buffer is restored
+              empty otherwise
+        '''
+        size = self._size if with_data and self.info_states is not None else 0
         return {
-            'data': self._data,
-            'add_calls': self._add_calls,
+            'info_states': self.info_states[:size] if size else None,
+            'actions': self.actions[:size] if size else None,
+            'probs': self.probs[:size] if size else None,
+            'num_actions': self.num_actions,
+            'add_calls': self._add_calls if with_data else 0,
             'reservoir_buffer_capacity': self._reservoir_buffer_capacity,
+            'pin_memory': self.pin_memory,
         }
         
     @classmethod
     def from_checkpoint(cls, checkpoint):
-        reservoir_buffer = cls(checkpoint['reservoir_buffer_capacity'])
-        reservoir_buffer._data = checkpoint['data']
+        reservoir_buffer = cls(checkpoint['reservoir_buffer_capacity'],
+                               checkpoint.get('num_actions'),
+                               checkpoint.get('pin_memory', False))
+        if 'data' in checkpoint:
+            # Checkpoints saved with the list of transitions
+            data = checkpoint['data']
+            if data:
+                actions, probs = sparse_probs([t.action_probs for t in data])
+                reservoir_buffer.num_actions = max(reservoir_buffer.num_actions, len(data[0].action_probs))
+                reservoir_buffer.add_many([t.info_state for t in data], actions, probs)
+        elif checkpoint['info_states'] is not None:
+            reservoir_buffer.add_many(checkpoint['info_states'], checkpoint['actions'], checkpoint['probs'])
         reservoir_buffer._add_calls = checkpoint['add_calls']
         return reservoir_buffer
 
+    def _allocate(self, info_state):
+        ''' Allocate the arrays for elements with states like the given one
+        '''
+        capacity = self._reservoir_buffer_capacity
+        self.info_states = np.zeros((capacity,) + info_state.shape, dtype=info_state.dtype)
+        self.actions = np.zeros((capacity, 0), dtype=np.int32)
+        self.probs = np.zeros((capacity, 0), dtype=np.float32)
+
+    def _widen(self, width, num_actions):
+        ''' Grow the targets to width actions and num_actions actions
+        '''
+        self.num_actions = max(self.num_actions, num_actions)
+        if width > self.actions.shape[1]:
+            actions = np.zeros((self._reservoir_buffer_capacity, width), dtype=np.int32)
+            probs = np.zeros((self._reservoir_buffer_capacity, width), dtype=np.float32)
+            actions[:, :self.actions.shape[1]] = self.actions
+            probs[:, :self.probs.shape[1]] = self.probs
+            self.actions, self.probs = actions, probs
+
+    def _write(self, slots, info_states, actions, probs):
+        ''' Write elements to the given slots, padding their targets with zero probabilities
+        '''
+        width = actions.shape[1]
+        self.info_states[slots] = info_states
+        self.actions[slots, :width] = actions
+        self.actions[slots, width:] = 0
+        self.probs[slots, :width] = probs
+        self.probs[slots, width:] = 0
+
     def __len__(self):
-        return len(self._data)
+        return self._size
 
     def __iter__(self):
-        return iter(self._data)
+        for i in range(self._size):
+            action_probs = np.zeros(self.num_actions, dtype=np.float32)
+            np.add.at(action_probs, self.actions[i], self.probs[i])
+            yield Transition(info_state=self.info_states[i], action_probs=action_probs)
 
+def sparse_probs(action_probs):
+    ''' Convert dense action probabilities to the sparse targets of ReservoirBuffer
+
+    Args:
+        action_probs (numpy.array): (batch, num_actions) probabilities
+
+    Returns:
+        actions (numpy.array): (batch, k) the actions with a nonzero probability, first in
+          every row and padded with actions of zero probability, k being the largest support
+        probs (numpy.array): (batch, k) the probabilities of these actions
+    '''
+    action_probs = np.asarray(action_probs, dtype=np.float32)
+    width = max(int((action_probs != 0).sum(axis=1).max()), 1)
+    actions = np.argsort(action_probs == 0, axis=1, kind='stable')[:, :width]
+    return actions, np.take_along_axis(action_probs, actions, axis=1)
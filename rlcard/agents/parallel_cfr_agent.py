@@ -0,0 +1,443 @@
+import collections
+import multiprocessing
+import os
+import pickle
+import weakref
+import zlib
+
+import numpy as np
+
+from rlcard.agents.cfr_policy_agent import save_cfr_policy
+from rlcard.utils import seeding
+from rlcard.utils.utils import remove_illegal
+
+# The worker of a pool process, built by _init_worker
+_worker = None
+
+def _init_worker(env):
+    global _worker
+    _worker = CFRWorker(env)
+
+def _run_worker_jobs(task):
+    return _worker.run(*task)
+
+def _release(pools, shards):
+    # Stop the pool and free the shared memory of a ParallelCFRAgent, by close()
+    # or when the agent is garbage collected or the interpreter exits
+    for pool in pools:
+        pool.close()
+        pool.join()
+    del pools[:]
+    for i, shard in enumerate(shards):
+        if shard is not None:
+            shard.close(unlink=True)
+            shards[i] = None
+
+class SharedShard():
+    ''' The keys, regrets, average policy and policy rows of a shard of the information sets
+
+    The tables are views of one shared memory block, so the worker processes can
+    attach to it by name: the float64 tables of shape (3, capacity, num_actions)
+    followed by the keys, as a (capacity, key_size) byte matrix.
+    '''
+
+    def __init__(self, num_actions, key_size, capacity, name=None):
+        ''' Create a shard, or attach to the shard of another process
+
+        Args:
+            num_actions (int): The number of actions of the game
+            key_size (int): The length of the information set keys
+            capacity (int): The number of rows
+            name (str): The name of the block to attach to, None to create a new one
+        '''
+        # shared_memory is only in Python 3.8+
+        from multiprocessing import shared_memory
+
+        self.num_actions = num_actions
+        self.key_size = key_size
+        self.capacity = capacity
+        tables_size = 3 * capacity * num_actions * np.dtype(np.float64).itemsize
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=tables_size + capacity * key_size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        tables = np.ndarray((3, capacity, num_actions), dtype=np.float64, buffer=self.memory.buf)
+        self.keys = np.ndarray((capacity, key_size), dtype=np.uint8, buffer=self.memory.buf, offset=tables_size)
+        if name is None:
+            tables[:] = 0
+        self.regrets, self.average_policy, self.policy = tables
+
+    def close(self, unlink=False):
+        ''' Release the block, and remove it if unlink is True
+        '''
+        self.regrets = self.average_policy = self.policy = self.keys = None
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+class CFRWorker():
+    ''' Run chance sampling CFR traversals against the policy in the shards
+
+    The regret and average policy deltas of the traversals are accumulated locally,
+    and returned grouped by shard to be merged by ParallelCFRAgent.
+    '''
+
+    def __init__(self, env, shards=None):
+        ''' Initialize the worker
+
+        Args:
+            env (Env): Env class, with step_back allowed
+            shards (list): The SharedShard objects to use, None to attach to them by name
+        '''
+        self.env = env
+        self.num_actions = env.num_actions
+        self.shards = shards
+        self.attached = shards is None
+        self.index = {}
+        self.num_rows = []
+        self.iteration = 0
+
+    def run(self, iteration, layout, jobs):
+        ''' Run traversals and collect their deltas
+
+        Args:
+            iteration (int): The current iteration, which weights the average policy
+            layout (list): The (name, key_size, capacity, number of rows) of every shard
+            jobs (list): The (player_id, seed) of every traversal
+
+        Returns:
+            (list): For every shard, a tuple of the keys, their regret deltas and
+                    their average policy deltas
+        '''
+        self.iteration = iteration
+        self._sync(layout)
+
+        self.regret_deltas = {}
+        self.average_deltas = {}
+        for player_id, seed in jobs:
+            self.env.seed(seed)
+            self.env.reset()
+            self.traverse_tree(np.ones(self.env.num_players), player_id)
+
+        deltas = [([], [], []) for _ in range(len(layout))]
+        for key, regrets in self.regret_deltas.items():
+            keys, shard_regrets, shard_average_policy = deltas[shard_of(key, len(layout))]
+            keys.append(key)
+            shard_regrets.append(regrets)
+            shard_average_policy.append(self.average_deltas[key])
+        return [(keys, np.array(regrets).reshape(-1, self.num_actions), np.array(average_policy).reshape(-1, self.num_actions))
+                for keys, regrets, average_policy in deltas]
+
+    def traverse_tree(self, probs, player_id):
+        ''' Traverse the game tree like CFRAgent, accumulate the deltas
+
+        Args:
+            probs: The reach probability of the current node
+            player_id: The player to update the value
+
+        Returns:
+            state_utilities (list): The expected utilities for all the players
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()
+
+        current_player = self.env.get_player_id()
+
+        action_utilities = {}
+        state_utility = np.zeros(self.env.num_players)
+        state = self.env.get_state(current_player)
+        obs, legal_actions = state['obs'].tobytes(), list(state['legal_actions'].keys())
+        action_probs = remove_illegal(self.policy(obs), legal_actions)
+
+        for action in legal_actions:
+            action_prob = action_probs[action]
+            new_probs = probs.copy()
+            new_probs[current_player] *= action_prob
+
+            # Keep traversing the child state
+            self.env.step(action)
+            utility = self.traverse_tree(new_probs, player_id)
+            self.env.step_back()
+
+            state_utility += action_prob * utility
+            action_utilities[action] = utility
+
+        if not current_player == player_id:
+            return state_utility
+
+        # If it is current player, we accumulate the regrets and the average policy
+        player_prob = probs[current_player]
+        counterfactual_prob = (np.prod(probs[:current_player]) *
+                               np.prod(probs[current_player + 1:]))
+        player_state_utility = state_utility[current_player]
+
+        if obs not in self.regret_deltas:
+            self.regret_deltas[obs] = np.zeros(self.num_actions)
+            self.average_deltas[obs] = np.zeros(self.num_actions)
+        regrets = self.regret_deltas[obs]
+        average_policy = self.average_deltas[obs]
+        for action in legal_actions:
+            action_prob = action_probs[action]
+            regrets[action] += counterfactual_prob * (action_utilities[action][current_player]
+                                                      - player_state_utility)
+            average_policy[action] += self.iteration * player_prob * action_prob
+        return state_utility
+
+    def policy(self, obs):
+        ''' Get the current policy of an information set, uniform if it is not in the shards
+        '''
+        location = self.index.get(obs)
+        if location is None:
+            return np.full(self.num_actions, 1.0 / self.num_actions)
+        shard, row = location
+        return self.shards[shard].policy[row]
+
+    def _sync(self, layout):
+        ''' Attach to the shards that moved and index the rows added since the last run
+        '''
+        if self.shards is None:
+            self.shards = [None] * len(layout)
+        if not self.num_rows:
+            self.num_rows = [0] * len(layout)
+        for i, (name, key_size, capacity, num_rows) in enumerate(layout):
+            if name is None:  # The shard has no information set yet
+                continue
+            if self.attached and (self.shards[i] is None or self.shards[i].name != name):
+                if self.shards[i] is not None:
+                    self.shards[i].close()
+                self.shards[i] = SharedShard(self.num_actions, key_size, capacity, name)
+            keys = self.shards[i].keys
+            for row in range(self.num_rows[i], num_rows):
+                self.index[keys[row].tobytes()] = (i, row)
+            self.num_rows[i] = num_rows
+
+def shard_of(key, num_shards):
+    ''' Get the shard of an information set key
+
+    The key is hashed with CRC32 rather than hash(), which is salted per process.
+    '''
+    return zlib.crc32(key) % num_shards
+
+class ParallelCFRAgent():
+    ''' Implement CFR (chance sampling) with the traversals spread over processes
+
+    An iteration runs num_traversals traversals per player, each on a deal drawn
+    from the seed of the agent, against the policy of the previous iteration as
+    in CFRAgent. The traversals are split over num_workers processes, which read
+    the policy from tables in shared memory and accumulate their regret and average
+    policy deltas locally. At the end of the iteration the deltas are merged into
+    the tables in the order of the traversals, and regret matching updates the
+    policy of every shard. The information sets are split in num_shards shards,
+    each of which is created with its first information set and grows on its
+    own. The worker processes and the shared memory are released by close(), or
+    when the agent is garbage collected. Reruns with the same seed and number of
+    workers give the same tables.
+
+    The model is saved like in CFRAgent, so it can be loaded by CFRAgent.
+    '''
+
+    def __init__(self, env, model_path='./parallel_cfr_model', num_workers=2, num_traversals=1,
+                 num_shards=16, capacity=1024, seed=None):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class, with step_back allowed. It is reseeded before every traversal.
+            model_path (str): The directory the model is saved in
+            num_workers (int): The number of processes running the traversals, 1 to run them in this process
+            num_traversals (int): The number of traversals per player in an iteration
+            num_shards (int): The number of shards of the tables
+            capacity (int): The number of rows allocated at first in every shard
+            seed (int): The random seed of the deals
+        '''
+        self.use_raw = False
+        self.env = env
+        self.model_path = model_path
+        self.num_workers = num_workers
+        self.num_traversals = num_traversals
+        self.num_shards = num_shards
+        self.np_random, _ = seeding.np_random(seed)
+
+        self.capacity = capacity
+        self.shards = [None] * num_shards
+        self.index = [{} for _ in range(num_shards)]
+        self.keys = [[] for _ in range(num_shards)]
+        self.iteration = 0
+
+        self._pools = []
+        self._worker = None
+        self._finalizer = weakref.finalize(self, _release, self._pools, self.shards)
+
+    def train(self):
+        ''' Do one iteration of CFR
+        '''
+        self.iteration += 1
+        jobs = [(player_id, self.np_random.randint(np.iinfo(np.int32).max))
+                for player_id in range(self.env.num_players)
+                for _ in range(self.num_traversals)]
+        layout = [(None, 0, 0, 0) if shard is None else (shard.name, shard.key_size, shard.capacity, len(keys))
+                  for shard, keys in zip(self.shards, self.keys)]
+
+        if self.num_workers > 1:
+            if not self._pools:
+                # The workers must share the resource tracker of this process, which
+                # owns the shared memory, rather than start their own before the
+                # first shard is created
+                from multiprocessing import resource_tracker
+                resource_tracker.ensure_running()
+                self._pools.append(multiprocessing.Pool(self.num_workers, initializer=_init_worker, initargs=(self.env,)))
+            chunks = np.array_split(np.arange(len(jobs)), self.num_workers)
+            tasks = [(self.iteration, layout, [jobs[i] for i in chunk])
+                     for chunk in chunks if len(chunk)]
+            results = self._pools[0].map(_run_worker_jobs, tasks)
+        else:
+            if self._worker is None:
+                self._worker = CFRWorker(self.env, self.shards)
+            results = [self._worker.run(self.iteration, layout, jobs)]
+
+        # Merge the deltas in the order of the traversals
+        for result in results:
+            for shard_id, (keys, regrets, average_policy) in enumerate(result):
+                if keys:
+                    rows = [self._row(shard_id, key) for key in keys]
+                    shard = self.shards[shard_id]
+                    shard.regrets[rows] += regrets
+                    shard.average_policy[rows] += average_policy
+
+        self.update_policy()
+
+    def update_policy(self):
+        ''' Update the policy of every shard based on the current regrets
+        '''
+        for shard, keys in zip(self.shards, self.keys):
+            if shard is None:
+                continue
+            n = len(keys)
+            positive_regrets = np.maximum(shard.regrets[:n], 0)
+            regret_sums = positive_regrets.sum(axis=1, keepdims=True)
+            shard.policy[:n] = np.where(regret_sums > 0,
+                                        positive_regrets / np.where(regret_sums > 0, regret_sums, 1),
+                                        1.0 / self.env.num_actions)
+
+    def action_probs(self, obs, legal_actions):
+        ''' Obtain the average policy of a state
+
+        Args:
+            obs (str): state_str
+            legal_actions (list): List of leagel actions
+
+        Returns:
+            action_probs(numpy.array): The action probabilities
+        '''
+        shard_id = shard_of(obs, self.num_shards)
+        row = self.index[shard_id].get(obs)
+        if row is None:
+            action_probs = np.full(self.env.num_actions, 1.0 / self.env.num_actions)
+        else:
+            action_probs = self.shards[shard_id].average_policy[row]
+        return remove_illegal(action_probs, legal_actions)
+
+    def eval_step(self, state):
+        ''' Given a state, predict action based on average policy
+
+        Args:
+            state (numpy.array): State representation
+
+        Returns:
+            action (int): Predicted action
+            info (dict): A dictionary containing information
+        '''
+        legal_actions = list(state['legal_actions'].keys())
+        probs = self.action_probs(state['obs'].tobytes(), legal_actions)
+        action = np.random.choice(len(probs), p=probs)
+
+        info = {}
+        info['probs'] = {state['raw_legal_actions'][i]: float(probs[legal_actions[i]]) for i in range(len(legal_actions))}
+
+        return action, info
+
+    def close(self):
+        ''' Stop the worker processes and free the shared memory
+        '''
+        self._worker = None
+        self._finalizer()
+
+    def save(self):
+        ''' Save model, in the format of CFRAgent
+        '''
+        if not os.path.exists(self.model_path):
+            os.makedirs(self.model_path)
+
+        tables = {'policy': collections.defaultdict(list),
+                  'average_policy': collections.defaultdict(np.array),
+                  'regrets': collections.defaultdict(np.array)}
+        for shard, keys in zip(self.shards, self.keys):
+            for row, key in enumerate(keys):
+                tables['policy'][key] = shard.policy[row].copy()
+                tables['average_policy'][key] = shard.average_policy[row].copy()
+                tables['regrets'][key] = shard.regrets[row].copy()
+        tables['iteration'] = self.iteration
+
+        for name, value in tables.items():
+            with open(os.path.join(self.model_path, name + '.pkl'), 'wb') as f:
+                pickle.dump(value, f)
+
+        # The average policy is also saved in the format of CFRPolicyAgent for serving
+        keys = [key for shard_keys in self.keys for key in shard_keys]
+        average_policy = np.concatenate([np.zeros((0, self.env.num_actions))] +
+                                        [shard.average_policy[:len(shard_keys)]
+                                         for shard, shard_keys in zip(self.shards, self.keys) if shard is not None])
+        save_cfr_policy(self.model_path, keys, average_policy)
+
+    def load(self):
+        ''' Load model saved by this agent or CFRAgent
+        '''
+        if not os.path.exists(self.model_path):
+            return
+
+        tables = {}
+        for name in ('policy', 'average_policy', 'regrets', 'iteration'):
+            with open(os.path.join(self.model_path, name + '.pkl'), 'rb') as f:
+                tables[name] = pickle.load(f)
+
+        for key, regrets in tables['regrets'].items():
+            shard_id = shard_of(key, self.num_shards)
+            row = self._row(shard_id, key)
+            self.shards[shard_id].regrets[row] = regrets
+            if key in tables['average_policy']:
+                self.shards[shard_id].average_policy[row] = tables['average_policy'][key]
+        self.iteration = tables['iteration']
+        self.update_policy()
+
+    def _row(self, shard_id, key):
+        ''' Get the row of an information set in its shard, adding it if it is new
+        '''
+        index = self.index[shard_id]
+        row = index.get(key)
+        if row is None:
+            if self.shards[shard_id] is None:
+                # The keys are stored with a fixed length, the one of the observations
+                self.shards[shard_id] = SharedShard(self.env.num_actions, len(key), self.capacity)
+            row = len(self.keys[shard_id])
+            if row == self.shards[shard_id].capacity:
+                self._grow(shard_id)
+            index[key] = row
+            self.keys[shard_id].append(key)
+            self.shards[shard_id].keys[row] = np.frombuffer(key, dtype=np.uint8)
+        return row
+
+    def _grow(self, shard_id):
+        ''' Move a full shard to a new block of twice its capacity
+
+        The workers attach to the new block in the next iteration.
+        '''
+        shard = self.shards[shard_id]
+        grown = SharedShard(shard.num_actions, shard.key_size, 2 * shard.capacity)
+        grown.keys[:shard.capacity] = shard.keys
+        grown.regrets[:shard.capacity] = shard.regrets
+        grown.average_policy[:shard.capacity] = shard.average_policy
+        grown.policy[:shard.capacity] = shard.policy
+        shard.close(unlink=True)
+        self.shards[shard_id] = grown
+        if self._worker is not None:
+            self._worker.shards = self.shards
@@ -0,0 +1,312 @@
+import os
+import pickle
+
+import numpy as np
+
+from rlcard.agents.cfr_policy_agent import save_cfr_policy
+
+
+def restrict(probs, legal_actions):
+    ''' Restrict a row of probabilities or weights to the legal actions
+
+    Args:
+        probs (numpy.array): The values of all the actions
+        legal_actions (list): Indices of the legal actions
+
+    Returns:
+        (numpy.array): The normalized values of the legal actions, uniform if they sum to zero
+    '''
+    probs = probs[legal_actions]
+    total = probs.sum()
+    if total > 0:
+        return probs / total
+    return np.full(len(legal_actions), 1.0 / len(legal_actions))
+
+
+class InfosetTable():
+    ''' Regrets and policies of the information sets, in contiguous arrays
+
+    The information set keys are interned to row indices. The rows of the
+    arrays hold the cumulative regrets, the current policy and the cumulative
+    average policy of an information set over all the actions, and the arrays
+    grow by doubling when they are full. As in CFRAgent, the legal actions are
+    not stored: the same observation may have different legal actions, so the
+    rows are restricted to the legal actions when they are used.
+    '''
+
+    def __init__(self, num_actions, capacity=1024):
+        ''' Initialize the table
+
+        Args:
+            num_actions (int): The number of actions of the game
+            capacity (int): The number of rows allocated at first
+        '''
+        self.num_actions = num_actions
+        self.index = {}
+        self.keys = []
+        self.regrets = np.zeros((capacity, num_actions))
+        self.policy = np.zeros((capacity, num_actions))
+        self.average_policy = np.zeros((capacity, num_actions))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, key):
+        ''' Get the row of an information set, adding it with the uniform policy if it is new
+
+        Args:
+            key (bytes): The information set key
+
+        Returns:
+            (int): The row index
+        '''
+        index = self.index.get(key)
+        if index is None:
+            index = len(self.keys)
+            if index == self.regrets.shape[0]:
+                self._grow()
+            self.index[key] = index
+            self.keys.append(key)
+            self.policy[index] = 1.0 / self.num_actions
+        return index
+
+    def regret_matching(self):
+        ''' Set the policy of every information set proportional to its positive regrets,
+        or uniform if there are none
+        '''
+        n = len(self.keys)
+        positive_regrets = np.maximum(self.regrets[:n], 0)
+        regret_sums = positive_regrets.sum(axis=1, keepdims=True)
+        self.policy[:n] = np.where(regret_sums > 0,
+                                   positive_regrets / np.where(regret_sums > 0, regret_sums, 1),
+                                   1.0 / self.num_actions)
+
+    def state_dict(self):
+        ''' Get the content of the table, trimmed to the used rows
+        '''
+        n = len(self.keys)
+        return {'keys': self.keys,
+                'regrets': self.regrets[:n],
+                'policy': self.policy[:n],
+                'average_policy': self.average_policy[:n]}
+
+    def load_state_dict(self, state):
+        ''' Restore the content of the table from state_dict
+        '''
+        self.keys = list(state['keys'])
+        self.index = {key: index for index, key in enumerate(self.keys)}
+        capacity = max(len(self.keys), 1)
+        for name in ('regrets', 'policy', 'average_policy'):
+            array = np.zeros((capacity, self.num_actions))
+            array[:len(self.keys)] = state[name]
+            setattr(self, name, array)
+
+    def _grow(self):
+        for name in ('regrets', 'policy', 'average_policy'):
+            array = getattr(self, name)
+            grown = np.zeros((2 * array.shape[0], self.num_actions))
+            grown[:array.shape[0]] = array
+            setattr(self, name, grown)
+
+
+class TabularCFRAgent():
+    ''' Implement CFR (chance sampling) with NumPy tables
+
+    The tree is traversed like in CFRAgent, but the regrets and policies are kept
+    in an InfosetTable. The regret and average policy increments of an iteration
+    are buffered during the traversal and added to the tables at once, then the
+    discounting and regret matching run over all the information sets together.
+
+    Variants:
+        'cfr': Vanilla CFR with the average policy weighted by the iteration, as CFRAgent
+        'cfr+': CFR+, regrets are floored at zero after every iteration
+        'linear': Linear CFR, regrets and average policy are discounted by t / (t + 1)
+    '''
+
+    def __init__(self, env, model_path='./tabular_cfr_model', variant='cfr'):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class
+            model_path (str): The directory the model is saved in
+            variant (str): The CFR variant: cfr, cfr+ or linear
+        '''
+        if variant not in ('cfr', 'cfr+', 'linear'):
+            raise ValueError('CFR variant must be either of the following: cfr, cfr+, linear')
+        self.use_raw = False
+        self.env = env
+        self.model_path = model_path
+        self.variant = variant
+
+        self.table = InfosetTable(env.num_actions)
+        self.iteration = 0
+
+        # Increments of the current iteration: rows, actions and values
+        self._rows = []
+        self._actions = []
+        self._regrets = []
+        self._average_policy = []
+
+    def train(self):
+        ''' Do one iteration of CFR
+        '''
+        self.iteration += 1
+        # Firstly, traverse tree to compute counterfactual regret for each player
+        # The regrets are buffered in traversal
+        for player_id in range(self.env.num_players):
+            self.env.reset()
+            probs = np.ones(self.env.num_players)
+            self.traverse_tree(probs, player_id)
+
+        self.update_tables()
+
+    def traverse_tree(self, probs, player_id):
+        ''' Traverse the game tree, buffer the regrets
+
+        Args:
+            probs: The reach probability of the current node
+            player_id: The player to update the value
+
+        Returns:
+            state_utilities (list): The expected utilities for all the players
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()
+
+        current_player = self.env.get_player_id()
+
+        obs, legal_actions = self.get_state(current_player)
+        index = self.table.lookup(obs)
+        action_probs = restrict(self.table.policy[index], legal_actions)
+
+        state_utility = np.zeros(self.env.num_players)
+        action_utilities = np.zeros(len(legal_actions))
+        for i, action_prob in enumerate(action_probs):
+            action = legal_actions[i]
+            new_probs = probs.copy()
+            new_probs[current_player] *= action_prob
+
+            # Keep traversing the child state
+            self.env.step(action)
+            utility = self.traverse_tree(new_probs, player_id)
+            self.env.step_back()
+
+            state_utility += action_prob * utility
+            action_utilities[i] = utility[current_player]
+
+        if not current_player == player_id:
+            return state_utility
+
+        # If it is current player, we buffer the regrets and the average policy
+        player_prob = probs[current_player]
+        counterfactual_prob = (np.prod(probs[:current_player]) *
+                               np.prod(probs[current_player + 1:]))
+
+        self._rows.extend([index] * len(legal_actions))
+        self._actions.extend(legal_actions)
+        self._regrets.append(counterfactual_prob * (action_utilities - state_utility[current_player]))
+        self._average_policy.append(player_prob * action_probs)
+        return state_utility
+
+    def update_tables(self):
+        ''' Add the buffered increments to the tables, then discount and apply regret matching
+        '''
+        table = self.table
+        if self._rows:
+            rows = np.array(self._rows)
+            actions = np.array(self._actions)
+            regrets = np.concatenate(self._regrets)
+            average_policy = np.concatenate(self._average_policy)
+            if self.variant != 'linear':
+                average_policy *= self.iteration
+            np.add.at(table.regrets, (rows, actions), regrets)
+            np.add.at(table.average_policy, (rows, actions), average_policy)
+        self._rows, self._actions, self._regrets, self._average_policy = [], [], [], []
+
+        n = len(table)
+        if self.variant == 'cfr+':
+            np.maximum(table.regrets[:n], 0, out=table.regrets[:n])
+        elif self.variant == 'linear':
+            discount = self.iteration / (self.iteration + 1)
+            table.regrets[:n] *= discount
+            table.average_policy[:n] *= discount
+
+        table.regret_matching()
+
+    def action_probs(self, obs, legal_actions):
+        ''' Obtain the average policy of a state
+
+        Args:
+            obs (bytes): state key
+            legal_actions (list): List of leagel actions
+
+        Returns:
+            action_probs(numpy.array): The action probabilities
+        '''
+        action_probs = np.zeros(self.env.num_actions)
+        index = self.table.index.get(obs)
+        if index is None:
+            action_probs[legal_actions] = 1.0 / len(legal_actions)
+        else:
+            action_probs[legal_actions] = restrict(self.table.average_policy[index], legal_actions)
+        return action_probs
+
+    def eval_step(self, state):
+        ''' Given a state, predict action based on average policy
+
+        Args:
+            state (numpy.array): State representation
+
+        Returns:
+            action (int): Predicted action
+            info (dict): A dictionary containing information
+        '''
+        legal_actions = list(state['legal_actions'].keys())
+        probs = self.action_probs(state['obs'].tobytes(), legal_actions)
+        action = np.random.choice(len(probs), p=probs)
+
+        info = {}
+        info['probs'] = {state['raw_legal_actions'][i]: float(probs[legal_actions[i]]) for i in range(len(legal_actions))}
+
+        return action, info
+
+    def get_state(self, player_id):
+        ''' Get state key of the player
+
+        Args:
+            player_id (int): The player id
+
+        Returns:
+            (tuple) that contains:
+                state (bytes): The state key
+                legal_actions (list): Indices of legal actions
+        '''
+        state = self.env.get_state(player_id)
+        return state['obs'].tobytes(), list(state['legal_actions'].keys())
+
+    def save(self):
+        ''' Save model
+        '''
+        if not os.path.exists(self.model_path):
+            os.makedirs(self.model_path)
+
+        with open(os.path.join(self.model_path, 'tables.pkl'), 'wb') as f:
+            pickle.dump({'table': self.table.state_dict(),
+                         'iteration': self.iteration,
+                         'variant': self.variant}, f)
+
+        # The average policy is also saved in the format of CFRPolicyAgent for serving
+        save_cfr_policy(self.model_path, self.table.keys, self.table.average_policy[:len(self.table)])
+
+    def load(self):
+        ''' Load model
+        '''
+        path = os.path.join(self.model_path, 'tables.pkl')
+        if not os.path.exists(path):
+            return
+
+        with open(path, 'rb') as f:
+            checkpoint = pickle.load(f)
+        self.table.load_state_dict(checkpoint['table'])
+        self.iteration = checkpoint['iteration']
+        self.variant = checkpoint['variant']
@@ -9,13 +9,14 @@ class DoudizhuEnv(Env):
     '''
 
     def __init__(self, config):
-        from rlcard.games.doudizhu.utils import ACTION_2_ID, ID_2_ACTION
+        from rlcard.games.doudizhu.utils import ACTION_2_ID, ID_2_ACTION, ACTION_COUNTS
         from rlcard.games.doudizhu.utils import cards2str, cards2str_with_suit
         from rlcard.games.doudizhu import Game
         self._cards2str = cards2str
         self._cards2str_with_suit = cards2str_with_suit
         self._ACTION_2_ID = ACTION_2_ID
         self._ID_2_ACTION = ID_2_ACTION
+        self._ACTION_COUNTS = ACTION_COUNTS
         
         self.name = 'doudizhu'
         self.game = Game()
@@ -115,8 +116,9 @@ class DoudizhuEnv(Env):
         Returns:
             legal_actions (list): a list of legal actions' id
         '''
-        legal_actions = self.game.state['actions']
-        legal_actions = {self._ACTION_2_ID[action]: _cards2array(action) for action in legal_actions}
+        action_ids = self.game.state['action_ids']
+        features = _counts2array(self._ACTION_COUNTS[action_ids])
+        legal_actions = dict(zip(action_ids.tolist(), features))
         return legal_actions
 
     def get_perfect_information(self):
@@ -166,6 +168,11 @@ def _cards2array(cards):
             matrix[:, Card2Column[card]] = NumOnes2Array[num_times]
     return np.concatenate((matrix.flatten('F'), jokers))
 
+def _counts2array(counts):
+    # The features of _cards2array of many actions from their rank counts
+    matrix = (np.arange(4) < counts[:, :13, np.newaxis]).reshape(len(counts), 52)
+    return np.concatenate((matrix, counts[:, 13:] > 0), axis=1).astype(np.int8)
+
 def _get_one_hot_array(num_left_cards, max_num_cards):
     one_hot = np.zeros(max_num_cards, dtype=np.int8)
     one_hot[num_left_cards - 1] = 1
@@ -1,10 +1,11 @@
 from collections import OrderedDict
+from collections.abc import Mapping
 
 import numpy as np
 
 from rlcard.envs import Env
-from rlcard.games.pisti import Game
-
+from rlcard.games.pisti import Game, ArrayGame
+from rlcard.games.pisti.pisti_card import PistiCard
 from rlcard.games.pisti.pisti_utils import cards2list
 
 DEFAULT_GAME_CONFIG = {
@@ -12,9 +13,14 @@ DEFAULT_GAME_CONFIG = {
         'allow_step_back': False,
         'seed': None,
         'playing_with_human': False,
-        'agent_level': 'hard'
+        'agent_level': 'hard',
+        'game_engine': 'object',
+        'share_obs_buffer': False,
         }
 
+# Scores are stored in the int8 observation, so they are capped at the int8 range
+MAX_OBS_SCORE = np.iinfo(np.int8).max
+
 
 class PistiEnv(Env):
 
@@ -23,13 +29,22 @@ class PistiEnv(Env):
         self.default_game_config = DEFAULT_GAME_CONFIG
 
 
-        if config is None:
-            config = DEFAULT_GAME_CONFIG
+        _config = DEFAULT_GAME_CONFIG.copy()
+        if config is not None:
+            _config.update(config)
+        config = _config
 
-        self.game = Game(playing_with_human=config['playing_with_human'])
+        # 'object' plays with PistiCard objects, 'array' with the array-backed engine
+        if config['game_engine'] == 'object':
+            self.game = Game(playing_with_human=config['playing_with_human'])
+        elif config['game_engine'] == 'array':
+            self.game = ArrayGame(playing_with_human=config['playing_with_human'])
+        else:
+            raise ValueError("Game engine must be either of the following: object, array")
         super().__init__(config)
 
         self.agent_level = config['agent_level']
+        self.playing_with_human = config['playing_with_human']
 
         if self.agent_level == 'easy':
             self.state_shape = [[1, 208] for _ in range(self.num_players)]
@@ -41,7 +56,18 @@ class PistiEnv(Env):
             raise ValueError("Agent level must be either of the following: easy, medium, hard")
         self.action_shape = [[52] for _ in range(self.num_players)]
 
+        # With share_obs_buffer the observations are views of the encoder buffers, which
+        # are only valid until the next step. Otherwise every state gets its own copy.
+        self.share_obs_buffer = config['share_obs_buffer']
+        self.encoder = PistiObsEncoder(self.num_players, self.agent_level)
 
+    def reset(self):
+        self.encoder.invalidate()
+        return super().reset()
+
+    def step_back(self):
+        self.encoder.invalidate()
+        return super().step_back()
 
     def get_payoffs(self):
 
@@ -50,12 +76,8 @@ class PistiEnv(Env):
     def _decode_action(self, action_id):
         legal_ids = self._get_legal_actions()
         if action_id not in legal_ids:
-            action_id = np.random.choice(legal_ids)
-        original_stock = self.game.dealer.original_shuffled_deck
-        for card in original_stock:
-            if action_id == card.card_numeric_id:
-                return card
-        return None
+            action_id = np.random.choice(list(legal_ids))
+        return PistiCard.card(action_id)
 
     def _get_legal_actions(self):
         legal_actions = self.game.get_legal_actions()
@@ -82,138 +104,215 @@ class PistiEnv(Env):
         ''' Extract useful information from state for RL.
 
         Args:
-            game (BridgeGame): The game
+            state (dict): The raw state
 
         Returns:
             (numpy.array): The extracted state
         '''
-        num_players = self.default_game_config['game_num_players']
-
-        game = self.game
         extracted_state = {}
 
         legal_actions = self._get_legal_actions()
         raw_legal_actions = np.ones(52, dtype=int)
 
-        current_player_id = game.get_player_id()
+        self.encoder.update(self.game)
+        obs = self.encoder.encode(self.game.get_player_id())
+        if not self.share_obs_buffer:
+            obs = obs.copy()
 
-        rep = []
+        extracted_state['obs'] = obs
+        extracted_state['legal_actions'] = legal_actions
+        extracted_state['raw_legal_actions'] = raw_legal_actions
+        extracted_state['raw_obs'] = obs
+        if self.playing_with_human:
+            extracted_state['human_req_info'] = PistiHumanStateView(self.game)
 
-        # Universal Info
+        return extracted_state
 
-        # 1 - Construct Dealer Related Information
-        ## Construct curr_stock_rep for current stockpile of cards
-        curr_stock_rep = np.zeros(shape=(1,52), dtype=int)
-        if not game.is_over():
-            for card in game.dealer.current_stock_pile:
-                curr_stock_rep[0][card.card_numeric_id] = 1
 
-        ## Construct top_card_rep for top card on the stack
-        top_card_rep = np.zeros(shape=(1,52), dtype=int)
-        if not game.is_over():
-            current_stock = game.dealer.current_stock_pile
-            if len(current_stock) != 0:
-                card = current_stock[-1]
-                top_card_rep[0][card.card_numeric_id] = 1
+class PistiHumanStateView(Mapping):
+    ''' Lazy view of the states of all the players, as returned by get_all_states.
 
-        # 2 - Construct Universal Player Information
-        # Construct current_player_rep for who is the current player
-        current_player_rep = np.zeros(shape=(num_players, 1), dtype=int)
-        if not game.is_over():
-            current_player_rep[current_player_id] = 1
+    The state of a player is only built when it is looked up, and is then kept, so
+    bot-only games never pay for the string conversions and score judging. The
+    states describe the game at lookup time, read them before the next step.
+    '''
 
-        # Construct player_scores_rep for current scores of the player
-        player_scores_rep = np.zeros(shape=(num_players, 1), dtype=int)
-        for player in self.game.players:
-            player_scores_rep[player.get_player_id()] = player.get_score()
+    def __init__(self, game):
+        self.game = game
+        self._states = {}
 
-        # Construct collected_cards_rep for number of the collected cards of the player
-        collected_cards_rep = np.zeros(shape=(num_players, 1), dtype=int)
-        for player in self.game.players:
-            collected_cards_rep[player.get_player_id()] = player.get_collected_num()
+    def __getitem__(self, key):
+        if key == 'num_players':
+            return self.game.get_num_players()
+        if not isinstance(key, int) or not 0 <= key < self.game.get_num_players():
+            raise KeyError(key)
+        if key not in self._states:
+            self._states[key] = self.game.get_state_for_player(key)
+        return self._states[key]
 
+    def __iter__(self):
+        yield 'num_players'
+        yield from range(self.game.get_num_players())
 
-        if self.agent_level == 'easy':
-            # 1 - Construct Player Related Information
-            ## Construct hands_rep for hands of players
-            curr_player = game.players[current_player_id]
-            hands_rep = np.zeros(shape=(1,52), dtype=int)
-            if not game.is_over():
-                for card in curr_player.hand:
-                    hands_rep[0][card.card_numeric_id] = 1
-
-            ## Construct seen_rep for seen cards of players
-            seen_rep = np.zeros(shape=(1,52), dtype=int)
-            if not game.is_over():
-                for seen_card in curr_player.seen_cards:
-                    seen_rep[0][seen_card.card_numeric_id] = 1
-
-            rep = [hands_rep, seen_rep, curr_stock_rep, top_card_rep]
+    def __len__(self):
+        return self.game.get_num_players() + 1
 
+
+class PistiObsEncoder(object):
+    ''' Incremental encoder of the PistiEnv observations.
+
+    The observation planes live in preallocated int8 buffers. They are built from
+    scratch once per game and then updated with the PistiDelta of every move (card
+    played, cards collected, cards dealt) instead of being rebuilt.
+
+    At the easy level every player has its own (1, 208) buffer, as the observation
+    only shows the hand and seen cards of the current player. At the medium and
+    hard levels the observation is the same for every player, so they share one
+    (num_players, width) buffer. The rows of a buffer are laid out as follows:
+
+        0:52 hand, 52:104 seen cards, 104:156 stock pile, 156:208 top card,
+        208 current player, 209 score, 210 collected cards (medium and hard),
+        211:263 next hand, 263:315 initial secret (hard)
+    '''
+
+    def __init__(self, num_players, agent_level):
+        self.num_players = num_players
+        self.agent_level = agent_level
+
+        if agent_level == 'easy':
+            self.buffer = np.zeros((num_players, 1, 208), dtype=np.int8)
+            planes = self.buffer[:, 0]
         else:
-            # 1 - Construct Player Related Information
-            ## Construct hands_rep for hands of players
-            hands_rep = np.zeros(shape=(num_players, 52), dtype=int)
-            if not game.is_over():
-                for player in game.players:
-                    player_id = player.get_player_id()
-                    for card in game.players[player_id].hand:
-                        hands_rep[player_id][card.card_numeric_id] = 1
-
-            ## Construct seen_rep for seen cards of players
-            seen_rep = np.zeros(shape=(num_players, 52), dtype=int)
-            if not game.is_over():
-                for player in game.players:
-                    player_id = player.get_player_id()
-                    for seen_card in game.players[player_id].seen_cards:
-                        seen_rep[player_id][seen_card.card_numeric_id] = 1
-
-            # 2 - Construct Dealer Related Information
-            ## Combine curr_stock_rep to achieve desired size
-            cumulative_curr_stock_rep = curr_stock_rep
-            for _ in range(self.num_players-1):
-                cumulative_curr_stock_rep = np.vstack((cumulative_curr_stock_rep, curr_stock_rep))
-
-            ## Combine top_card_rep to achieve desired size
-            cumulative_top_card_rep = top_card_rep
-            for _ in range(self.num_players-1):
-                cumulative_top_card_rep = np.vstack((cumulative_top_card_rep, top_card_rep))
-
-
-            rep = [hands_rep, seen_rep, cumulative_curr_stock_rep, cumulative_top_card_rep, current_player_rep, player_scores_rep, collected_cards_rep]
+            self.buffer = np.zeros((num_players, 315 if agent_level == 'hard' else 211), dtype=np.int8)
+            planes = self.buffer
+
+        # Views of the buffer, with one row per player
+        self.hands = planes[:, 0:52]
+        self.seen = planes[:, 52:104]
+        self.stock = planes[:, 104:156]
+        self.top = planes[:, 156:208]
+        self.current = planes[:, 208:209]
+        self.counters = planes[:, 209:211]
+        self.next_hands = planes[:, 211:263]
+        self.secret = planes[:, 263:315]
+
+        self.scores = [0 for _ in range(num_players)]
+        self.collected = [0 for _ in range(num_players)]
+        self.top_card = None
+        self.delta = None
+        self.is_valid = False
+
+    def invalidate(self):
+        ''' Mark the buffers as out of date, the next update encodes the game from scratch
+        '''
+        self.is_valid = False
 
-            if self.agent_level == 'hard':
-                # Including Future Information
-                next_hands_rep = np.zeros(shape=(num_players, 52), dtype=int)
-                if not game.is_over():
-                    rem_deck = game.dealer.remaining_deck
-                    if len(rem_deck)!=0:
-                        for player in game.players:
-                            player_id = player.get_player_id()
-                            next_hand = rem_deck[:game.deal_per_round]
-                            rem_deck = rem_deck[game.deal_per_round:]
-                            for card in next_hand:
-                                next_hands_rep[player_id][card.card_numeric_id] = 1
-
-                # Including Secret Information
-                initial_secret_rep = np.zeros(shape=(num_players, 52), dtype=int)
-                if not game.is_over():
-                    initial_secret = game.dealer.secret_initial_deck
-                    if len(initial_secret)!=0:
-                        for player in game.players:
-                            player_id = player.get_player_id()
-                            for card in initial_secret:
-                                initial_secret_rep[player_id][card.card_numeric_id] = 1
-
-                rep.append(next_hands_rep)
-                rep.append(initial_secret_rep)
-
-
-        obs = np.hstack(rep)
-        extracted_state['obs'] = obs
-        extracted_state['legal_actions'] = legal_actions
-        extracted_state['raw_legal_actions'] = raw_legal_actions
-        extracted_state['raw_obs'] = obs
-        extracted_state['human_req_info'] = self.game.get_all_states()
+    def update(self, game):
+        ''' Bring the buffers up to date with the game
 
-        return extracted_state
+        Args:
+            game (PistiGame or PistiArrayGame): The game
+        '''
+        if not self.is_valid:
+            self.reset(game)
+            return
+
+        delta = game.get_last_delta()
+        if delta is self.delta:
+            return
+        self.delta = delta
+        self.apply(delta)
+        self._set_current_player(game)
+
+    def reset(self, game):
+        ''' Encode the game from scratch
+
+        Args:
+            game (PistiGame or PistiArrayGame): The game
+        '''
+        arrays = game.get_state_arrays(with_future=self.agent_level == 'hard')
+        self.hands[:] = arrays['hands']
+        self.seen[:] = arrays['seen']
+        self.stock[:] = arrays['stock']
+        self.top[:] = arrays['top']
+        top_cards = np.flatnonzero(arrays['top'])
+        self.top_card = top_cards[0] if len(top_cards) != 0 else None
+
+        self.scores = [int(score) for score in arrays['scores']]
+        self.collected = [int(num) for num in arrays['collected']]
+        if self.agent_level != 'easy':
+            self.counters[:, 0] = np.minimum(self.scores, MAX_OBS_SCORE)
+            self.counters[:, 1] = self.collected
+        if self.agent_level == 'hard':
+            self.next_hands[:] = arrays['next_hands']
+            self.secret[:] = arrays['secret']
+
+        self.delta = game.get_last_delta()
+        self.is_valid = True
+        self._set_current_player(game)
+
+    def apply(self, delta):
+        ''' Apply the changes of one move to the buffers
+
+        Args:
+            delta (PistiDelta): The changes made by the move
+        '''
+        card_id = delta.card_id
+        self.hands[delta.player_id, card_id] = 0
+        self.seen[:, card_id] = 1
+        self.stock[:, card_id] = 1
+        if self.top_card is not None:
+            self.top[:, self.top_card] = 0
+        self.top[:, card_id] = 1
+        self.top_card = card_id
+
+        for i, (player_id, pile, points) in enumerate(delta.collections):
+            self.stock[:, pile] = 0
+            if self.top_card is not None:
+                self.top[:, self.top_card] = 0
+                self.top_card = None
+            if i == 0 and delta.secret_taken:
+                self.seen[player_id, pile] = 1
+                if self.agent_level == 'hard':
+                    self.secret[:, pile] = 1
+            self.scores[player_id] += points
+            self.collected[player_id] += len(pile)
+            if self.agent_level != 'easy':
+                self.counters[player_id] = (min(self.scores[player_id], MAX_OBS_SCORE), self.collected[player_id])
+
+        for player_id, card_ids in enumerate(delta.dealt):
+            self.hands[player_id, card_ids] = 1
+        if delta.dealt and self.agent_level == 'hard':
+            self.next_hands[:] = 0
+            for player_id, card_ids in enumerate(delta.next_hands):
+                self.next_hands[player_id, card_ids] = 1
+
+    def encode(self, player_id):
+        ''' Get the observation of a player
+
+        Args:
+            player_id (int): The id of the player
+
+        Returns:
+            (numpy.array): A view of the buffer, valid until the next update
+        '''
+        if self.agent_level == 'easy':
+            return self.buffer[player_id]
+        return self.buffer
+
+    def _set_current_player(self, game):
+        if game.is_over():
+            # Only the scores and collected cards are kept at the end of the game
+            self.hands[:] = 0
+            self.seen[:] = 0
+            self.stock[:] = 0
+            self.top[:] = 0
+            self.top_card = None
+            if self.agent_level != 'easy':
+                self.current[:] = 0
+            if self.agent_level == 'hard':
+                self.next_hands[:] = 0
+                self.secret[:] = 0
+        elif self.agent_level != 'easy':
+            self.current[:] = 0
+            self.current[game.get_player_id()] = 1
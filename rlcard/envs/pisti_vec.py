@@ -0,0 +1,288 @@
+import numpy as np
+
+from rlcard.utils import seeding
+from rlcard.envs.pisti import MAX_OBS_SCORE
+from rlcard.games.pisti.pisti_utils import CARD_POINTS, CARD_RANKS, JACK_RANK
+
+DEFAULT_VEC_CONFIG = {
+        'num_envs': 64,
+        'game_num_players': 2,
+        'seed': None,
+        'agent_level': 'hard',
+        }
+
+
+class PistiVecEnv(object):
+    ''' Batched Pisti environment that plays num_envs independent games in lockstep.
+
+    The games are kept in struct-of-arrays form, every field has the game index as
+    its first dimension, and a step advances all of them with vectorized NumPy
+    operations. The rules are the ones of PistiGame and the observations have the
+    layout of PistiEnv, stacked along a leading batch dimension. Finished games are
+    reset automatically, so every call returns a decision for every game.
+    '''
+
+    def __init__(self, config=None):
+        ''' Initialize the batched environment
+
+        Args:
+            config (dict): A config dictionary. Currently, the dictionary includes:
+                'num_envs' (int) - The number of games played in lockstep.
+                'game_num_players' (int) - The number of players in each game.
+                'seed' (int) - A environment local random seed.
+                'agent_level' (str) - The observation level of PistiEnv: easy, medium or hard.
+        '''
+        _config = DEFAULT_VEC_CONFIG.copy()
+        if config is not None:
+            _config.update(config)
+
+        self.name = 'pisti'
+        self.num_envs = _config['num_envs']
+        self.num_players = _config['game_num_players']
+        self.num_init_cards = 4
+        self.deal_per_round = 4
+        self.num_actions = 52
+        self.agent_level = _config['agent_level']
+
+        if (52 - self.num_init_cards) % (self.deal_per_round * self.num_players) != 0:
+            raise ValueError("The deck can not be dealt evenly to {} players".format(self.num_players))
+
+        if self.agent_level == 'easy':
+            self.state_shape = [[1, 208] for _ in range(self.num_players)]
+        elif self.agent_level == 'medium':
+            self.state_shape = [[self.num_players, 211] for _ in range(self.num_players)]
+        elif self.agent_level == 'hard':
+            self.state_shape = [[self.num_players, 315] for _ in range(self.num_players)]
+        else:
+            raise ValueError("Agent level must be either of the following: easy, medium, hard")
+        self.action_shape = [[52] for _ in range(self.num_players)]
+
+        num_envs, num_players = self.num_envs, self.num_players
+        self._rows = np.arange(num_envs)
+
+        self.deck = np.zeros((num_envs, 52), dtype=np.int64)
+        self.deck_pos = np.zeros(num_envs, dtype=np.int64)
+        self.hands = np.zeros((num_envs, num_players, 52), dtype=np.int8)
+        self.hand_sizes = np.zeros((num_envs, num_players), dtype=np.int64)
+        self.seen = np.zeros((num_envs, num_players, 52), dtype=np.int8)
+        self.stock_mask = np.zeros((num_envs, 52), dtype=np.int8)
+        self.stock_top = np.zeros(num_envs, dtype=np.int64)
+        self.stock_size = np.zeros(num_envs, dtype=np.int64)
+        self.secret_mask = np.zeros((num_envs, 52), dtype=np.int8)
+        self.secret_open = np.zeros(num_envs, dtype=bool)
+        self.scores = np.zeros((num_envs, num_players), dtype=np.int64)
+        self.collected = np.zeros((num_envs, num_players), dtype=np.int64)
+        self.current_player = np.zeros(num_envs, dtype=np.int64)
+        self.last_collector = np.zeros(num_envs, dtype=np.int64)
+
+        self.seed(_config['seed'])
+
+    def seed(self, seed=None):
+        self.np_random, seed = seeding.np_random(seed)
+        return seed
+
+    def reset(self):
+        ''' Start a new game in every slot
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array): (num_envs,) + state_shape observations
+                (numpy.array): (num_envs, 52) legal action masks of the current players
+                (numpy.array): (num_envs,) ids of the current players
+        '''
+        self._reset_games(self._rows)
+        return self.get_obs(), self.get_legal_masks(), self.current_player.copy()
+
+    def step(self, actions):
+        ''' Play one card in every game
+
+        Args:
+            actions (numpy.array): (num_envs,) card ids played by the current players. An
+                illegal action is replaced by a random legal one, as in PistiEnv.
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array): (num_envs,) + state_shape observations
+                (numpy.array): (num_envs, 52) legal action masks of the current players
+                (numpy.array): (num_envs,) ids of the current players
+                (numpy.array): (num_envs, num_players) payoffs of the games that ended in
+                               this step, zeros for the others
+                (numpy.array): (num_envs,) True for the games that ended in this step and
+                               were reset
+        '''
+        rows = self._rows
+        players = self.current_player
+        actions = np.asarray(actions, dtype=np.int64)
+
+        illegal = self.hands[rows, players, actions] == 0
+        if illegal.any():
+            actions = actions.copy()
+            noise = self.np_random.random_sample((int(illegal.sum()), 52))
+            actions[illegal] = np.argmax(self.hands[rows[illegal], players[illegal]] * noise, axis=1)
+
+        # Play the cards on the stock pile
+        self.hands[rows, players, actions] = 0
+        self.hand_sizes[rows, players] -= 1
+        self.seen[rows, :, actions] = 1
+        previous_top = self.stock_top.copy()
+        self.stock_mask[rows, actions] = 1
+        self.stock_top[:] = actions
+        self.stock_size += 1
+
+        # Matching the top card or playing a jack collects the pile
+        ranks = CARD_RANKS[actions]
+        matched = (self.stock_size > 1) & ((CARD_RANKS[previous_top] == ranks) | (ranks == JACK_RANK))
+
+        # The first collector also takes the secret cards
+        secret = np.flatnonzero(matched & self.secret_open)
+        if len(secret) != 0:
+            self.secret_mask[secret] |= self.stock_mask[secret]
+            self.seen[secret, players[secret]] |= self.secret_mask[secret]
+            self.stock_mask[secret] = self.secret_mask[secret]
+            self.stock_size[secret] = self.secret_mask[secret].sum(axis=1)
+            self.secret_open[secret] = False
+
+        collectors = np.flatnonzero(matched)
+        if len(collectors) != 0:
+            self._collect(collectors, players[collectors], previous_top[collectors])
+            self.last_collector[collectors] = players[collectors]
+
+        # The last collector takes the remaining cards at the end of the game
+        last = np.flatnonzero((self.deck_pos >= 52) & (self.hand_sizes[rows, players] == 0)
+                              & (players == self.num_players - 1) & (self.stock_size != 0))
+        if len(last) != 0:
+            others = self.stock_mask[last].copy()
+            others[np.arange(len(last)), self.stock_top[last]] = 0
+            self._collect(last, self.last_collector[last], np.argmax(others, axis=1))
+
+        self.current_player = (players + 1) % self.num_players
+
+        # Deal new hands, or finish the games without cards left to deal
+        empty = self.hand_sizes[rows, self.current_player] == 0
+        dones = empty & (self.deck_pos >= 52)
+        self._deal(np.flatnonzero(empty & ~dones))
+
+        payoffs = np.zeros((self.num_envs, self.num_players), dtype=np.int64)
+        finished = np.flatnonzero(dones)
+        if len(finished) != 0:
+            payoffs[finished] = self.scores[finished]
+            payoffs[finished, np.argmax(self.collected[finished], axis=1)] += 3
+            self._reset_games(finished)
+
+        return self.get_obs(), self.get_legal_masks(), self.current_player.copy(), payoffs, dones
+
+    def get_legal_masks(self):
+        ''' Get the legal actions of the current players
+
+        Returns:
+            (numpy.array): (num_envs, 52) int8 array, 1 for every card in the hand of the current player
+        '''
+        return self.hands[self._rows, self.current_player].copy()
+
+    def get_obs(self):
+        ''' Get the observations of all the games, encoded like PistiEnv
+
+        Returns:
+            (numpy.array): (num_envs,) + state_shape int8 array. Scores are capped at 127.
+        '''
+        num_envs, num_players = self.num_envs, self.num_players
+        rows = self._rows
+
+        top = np.zeros((num_envs, 52), dtype=np.int8)
+        has_top = np.flatnonzero(self.stock_size != 0)
+        top[has_top, self.stock_top[has_top]] = 1
+
+        if self.agent_level == 'easy':
+            players = self.current_player
+            return np.concatenate((self.hands[rows, players], self.seen[rows, players],
+                                   self.stock_mask, top), axis=1)[:, np.newaxis]
+
+        current = np.zeros((num_envs, num_players, 1), dtype=np.int8)
+        current[rows, self.current_player] = 1
+        scores = np.minimum(self.scores, MAX_OBS_SCORE).astype(np.int8)[:, :, np.newaxis]
+        collected = self.collected.astype(np.int8)[:, :, np.newaxis]
+        shared_shape = (num_envs, num_players, 52)
+        rep = [self.hands, self.seen,
+               np.broadcast_to(self.stock_mask[:, np.newaxis], shared_shape),
+               np.broadcast_to(top[:, np.newaxis], shared_shape),
+               current, scores, collected]
+
+        if self.agent_level == 'hard':
+            rep.append(self._next_hands())
+            rep.append(np.broadcast_to(self.secret_mask[:, np.newaxis], shared_shape))
+
+        return np.concatenate(rep, axis=2)
+
+    def _next_hands(self):
+        ''' Get the hands that will be dealt next in every game
+        '''
+        num_next = self.num_players * self.deal_per_round
+        positions = self.deck_pos[:, np.newaxis] + np.arange(num_next)
+        valid = positions < 52
+        card_ids = self.deck[self._rows[:, np.newaxis], np.minimum(positions, 51)]
+
+        next_hands = np.zeros((self.num_envs, self.num_players, 52), dtype=np.int8)
+        players = np.broadcast_to(np.arange(num_next) // self.deal_per_round, positions.shape)
+        rows = np.broadcast_to(self._rows[:, np.newaxis], positions.shape)
+        next_hands[rows[valid], players[valid], card_ids[valid]] = 1
+        return next_hands
+
+    def _reset_games(self, rows):
+        ''' Shuffle a new deck and deal the first cards in the given games
+        '''
+        num_init_cards = self.num_init_cards
+        self.deck[rows] = np.argsort(self.np_random.random_sample((len(rows), 52)), axis=1)
+        self.deck_pos[rows] = num_init_cards
+
+        self.secret_mask[rows] = 0
+        secret_rows = np.repeat(rows, num_init_cards - 1)
+        self.secret_mask[secret_rows, self.deck[rows, :num_init_cards - 1].ravel()] = 1
+        self.secret_open[rows] = num_init_cards > 1
+
+        self.stock_mask[rows] = 0
+        self.stock_top[rows] = self.deck[rows, num_init_cards - 1]
+        self.stock_mask[rows, self.stock_top[rows]] = 1
+        self.stock_size[rows] = 1
+
+        self.hands[rows] = 0
+        self.hand_sizes[rows] = 0
+        self.seen[rows] = 0
+        self.scores[rows] = 0
+        self.collected[rows] = 0
+        self.current_player[rows] = 0
+        self.last_collector[rows] = -1
+
+        self._deal(rows)
+
+    def _deal(self, rows):
+        ''' Deal the next deal_per_round cards to every player of the given games
+        '''
+        if len(rows) == 0:
+            return
+        num_next = self.num_players * self.deal_per_round
+        positions = self.deck_pos[rows, np.newaxis] + np.arange(num_next)
+        card_ids = self.deck[rows[:, np.newaxis], positions]
+        players = np.broadcast_to(np.arange(num_next) // self.deal_per_round, positions.shape)
+        self.hands[np.broadcast_to(rows[:, np.newaxis], positions.shape), players, card_ids] = 1
+        self.hand_sizes[rows] += self.deal_per_round
+        self.deck_pos[rows] += num_next
+
+    def _collect(self, rows, players, other_cards):
+        ''' Move the stock pile of the given games to the given players
+
+        Args:
+            rows (numpy.array): indices of the games
+            players (numpy.array): the collecting player of every game
+            other_cards (numpy.array): the card under the top card, used to detect pisti
+        '''
+        stock_size = self.stock_size[rows]
+        top_ranks = CARD_RANKS[self.stock_top[rows]]
+        pisti = (stock_size == 2) & (CARD_RANKS[other_cards] == top_ranks)
+        bonus = np.where(pisti, np.where(top_ranks == JACK_RANK, 20, 10), 0)
+
+        self.scores[rows, players] += bonus + self.stock_mask[rows] @ CARD_POINTS
+        self.collected[rows, players] += stock_size
+        self.stock_mask[rows] = 0
+        self.stock_size[rows] = 0
@@ -50,3 +50,91 @@ class Card:
             string: the combination of suit and rank of a card. Eg: 1S, 2H, AD, BJ, RJ...
         '''
         return self.suit+self.rank
+
+
+class UndoLog:
+    '''
+    UndoLog lets a game step back without copying itself
+
+    Note:
+        At the start of every step the game opens an entry with begin(), and then
+        records how to revert the changes the step is about to make. A record is
+        either an undo function registered with record(), or a shallow snapshot
+        taken with save_attrs(), save_list() or save_dict(), which only copy
+        references. Snapshots are restored in place, so the objects and containers
+        of the game keep their identity. undo() reverts the last entry by calling
+        its records in reverse order.
+    '''
+    def __init__(self):
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def begin(self):
+        ''' Open the entry of a new step
+        '''
+        self.entries.append([])
+
+    def record(self, undo, *args):
+        ''' Register a function reverting a change of the current step
+
+        Args:
+            undo (callable): the function, called with args when the step is undone
+            args: the arguments of the function
+        '''
+        self.entries[-1].append((undo, args))
+
+    def save_attrs(self, obj, *names):
+        ''' Record the current values of some attributes of an object
+
+        Args:
+            obj (object): the object
+            names (str): the names of the attributes
+        '''
+        self.entries[-1].append((_restore_attrs, (obj, names, [getattr(obj, name) for name in names])))
+
+    def save_list(self, items):
+        ''' Record the current content of a list
+
+        Args:
+            items (list): the list
+        '''
+        self.entries[-1].append((_restore_list, (items, items[:])))
+
+    def save_dict(self, items):
+        ''' Record the current content of a dict
+
+        Args:
+            items (dict): the dict
+        '''
+        self.entries[-1].append((_restore_dict, (items, items.copy())))
+
+    def undo(self):
+        ''' Revert the last step
+
+        Returns:
+            (bool): True if a step was reverted, False if the log is empty
+        '''
+        if not self.entries:
+            return False
+        for undo, args in reversed(self.entries.pop()):
+            undo(*args)
+        return True
+
+    def clear(self):
+        ''' Forget all the recorded steps
+        '''
+        self.entries.clear()
+
+
+def _restore_attrs(obj, names, values):
+    for name, value in zip(names, values):
+        setattr(obj, name, value)
+
+def _restore_list(items, content):
+    items[:] = content
+
+def _restore_dict(items, content):
+    items.clear()
+    items.update(content)
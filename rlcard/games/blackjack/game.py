@@ -1,9 +1,9 @@
-from copy import deepcopy
 import numpy as np
 
 from rlcard.games.blackjack import Dealer
 from rlcard.games.blackjack import Player
 from rlcard.games.blackjack import Judger
+from rlcard.games.base import UndoLog
 
 class BlackjackGame:
 
@@ -48,7 +48,7 @@ class BlackjackGame:
         for i in range(self.num_players):
             self.winner['player' + str(i)] = 0
 
-        self.history = []
+        self.history = UndoLog()
         self.game_pointer = 0
 
         return self.get_state(self.game_pointer), self.game_pointer
@@ -64,10 +64,17 @@ class BlackjackGame:
             int: next plater's id
         '''
         if self.allow_step_back:
-            p = deepcopy(self.players[self.game_pointer])
-            d = deepcopy(self.dealer)
-            w = deepcopy(self.winner)
-            self.history.append((d, p, w))
+            # First record what the action may change
+            history = self.history
+            history.begin()
+            history.save_attrs(self, 'game_pointer')
+            history.save_dict(self.winner)
+            for player in (self.players[self.game_pointer], self.dealer):
+                history.save_attrs(player, 'status', 'score')
+                history.save_list(player.hand)
+            history.save_list(self.dealer.deck)
+            # A hit draws with the dealer's generator, the same step must draw the same card again
+            history.record(self.dealer.np_random.set_state, self.dealer.np_random.get_state())
 
         next_state = {}
         # Play hit
@@ -128,11 +135,7 @@ class BlackjackGame:
         Returns:
             Status (bool): check if the step back is success or not
         '''
-        #while len(self.history) > 0:
-        if len(self.history) > 0:
-            self.dealer, self.players[self.game_pointer], self.winner = self.history.pop()
-            return True
-        return False
+        return self.history.undo()
 
     def get_num_players(self):
         ''' Return the number of players in blackjack
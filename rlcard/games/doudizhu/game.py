@@ -5,10 +5,11 @@ import functools
 from heapq import merge
 import numpy as np
 
-from rlcard.games.doudizhu.utils import cards2str, doudizhu_sort_card, CARD_RANK_STR
+from rlcard.games.doudizhu.utils import cards2str, doudizhu_sort_card, CARD_RANK_STR, ID_2_ACTION
 from rlcard.games.doudizhu import Player
 from rlcard.games.doudizhu import Round
 from rlcard.games.doudizhu import Judger
+from rlcard.games.base import UndoLog
 
 
 class DoudizhuGame:
@@ -29,7 +30,7 @@ class DoudizhuGame:
         '''
         # initialize public variables
         self.winner_id = None
-        self.history = []
+        self.history = UndoLog()
 
         # initialize players
         self.players = [Player(num, self.np_random)
@@ -60,12 +61,21 @@ class DoudizhuGame:
             dict: next player's state
             int: next player's id
         '''
+        player = self.players[self.round.current_player]
         if self.allow_step_back:
-            # TODO: don't record game.round, game.players, game.judger if allow_step_back not set
-            pass
+            # First record what the action may change. The round, player and judger
+            # revert the cards played with their own records in _undo_play, the
+            # hand is then restored in its original order
+            history = self.history
+            history.begin()
+            history.save_attrs(self, 'winner_id', 'state')
+            history.save_attrs(self.round, 'current_player', 'seen_cards')
+            history.save_dict(self.round.public)
+            history.save_attrs(player, 'played_cards', 'singles')
+            history.save_list(player.current_hand)
+            history.record(self._undo_play)
 
         # perfrom action
-        player = self.players[self.round.current_player]
         self.round.proceed_round(player, action)
         if (action != 'pass'):
             self.judger.calc_playable_cards(player)
@@ -86,27 +96,16 @@ class DoudizhuGame:
         Returns:
             (bool): True if the game steps back successfully
         '''
-        if not self.round.trace:
-            return False
-
-        #winner_id will be always None no matter step_back from any case
-        self.winner_id = None
+        return self.history.undo()
 
-        #reverse round
+    def _undo_play(self):
+        ''' Revert the cards played in the last step
+        '''
         player_id, cards = self.round.step_back(self.players)
-
-        #reverse player
-        if (cards != 'pass'):
-            self.players[player_id].played_cards = self.round.find_last_played_cards_in_trace(player_id)
         self.players[player_id].play_back()
-
-        #reverse judger.played_cards if needed
-        if (cards != 'pass'):
+        if cards != 'pass':
             self.judger.restore_playable_cards(player_id)
 
-        self.state = self.get_state(self.round.current_player)
-        return True
-
     def get_state(self, player_id):
         ''' Return player's state
 
@@ -120,10 +119,12 @@ class DoudizhuGame:
         others_hands = self._get_others_current_hand(player)
         num_cards_left = [len(self.players[i].current_hand) for i in range(self.num_players)]
         if self.is_over():
-            actions = []
+            action_ids = np.empty(0, dtype=np.int64)
         else:
-            actions = list(player.available_actions(self.round.greater_player, self.judger))
+            action_ids = player.available_action_ids(self.round.greater_player, self.judger)
+        actions = [ID_2_ACTION[action_id] for action_id in action_ids]
         state = player.get_state(self.round.public, others_hands, num_cards_left, actions)
+        state['action_ids'] = action_ids
 
         return state
 
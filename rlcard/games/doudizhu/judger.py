@@ -6,8 +6,8 @@ import collections
 from itertools import combinations
 from bisect import bisect_left
 
-from rlcard.games.doudizhu.utils import CARD_RANK_STR, CARD_RANK_STR_INDEX
-from rlcard.games.doudizhu.utils import cards2str, contains_cards
+from rlcard.games.doudizhu.utils import CARD_RANK_STR, CARD_RANK_STR_INDEX, ID_2_ACTION, PASS_ID
+from rlcard.games.doudizhu.utils import cards2str, cards2counts, contained_action_ids, contains_actions
 
 
 
@@ -259,13 +259,23 @@ class DoudizhuJudger:
 
     def __init__(self, players, np_random):
         ''' Initilize the Judger class for Dou Dizhu
+
+        The playable actions of a hand are all the actions whose cards it
+        contains, found by comparing its rank counts with the ones of all the
+        actions at once.
         '''
-        self.playable_cards = [set() for _ in range(3)]
-        self._recorded_removed_playable_cards = [[] for _ in range(3)]
+        self.playable_action_ids = [np.empty(0, dtype=np.int64) for _ in range(3)]
+        self._recorded_removed_playable_action_ids = [[] for _ in range(3)]
         for player in players:
             player_id = player.player_id
-            current_hand = cards2str(player.current_hand)
-            self.playable_cards[player_id] = self.playable_cards_from_hand(current_hand)
+            action_ids = contained_action_ids(cards2counts(cards2str(player.current_hand)))
+            self.playable_action_ids[player_id] = action_ids[action_ids != PASS_ID]
+
+    @property
+    def playable_cards(self):
+        ''' The playable cards of the players, as sets of strings
+        '''
+        return [set(ID_2_ACTION[action_id] for action_id in action_ids) for action_ids in self.playable_action_ids]
 
     def calc_playable_cards(self, player):
         ''' Recalculate all legal cards the player can play according to his
@@ -273,39 +283,16 @@ class DoudizhuJudger:
 
         Args:
             player (DoudizhuPlayer object): object of DoudizhuPlayer
-            init_flag (boolean): For the first time, set it True to accelerate
-              the preocess.
 
         Returns:
-            list: list of string of playable cards
+            numpy.array: the ids of the playable actions
         '''
-        removed_playable_cards = []
-
         player_id = player.player_id
-        current_hand = cards2str(player.current_hand)
-        missed = None
-        for single in player.singles:
-            if single not in current_hand:
-                missed = single
-                break
-
-        playable_cards = self.playable_cards[player_id].copy()
-
-        if missed is not None:
-            position = player.singles.find(missed)
-            player.singles = player.singles[position+1:]
-            for cards in playable_cards:
-                if missed in cards or (not contains_cards(current_hand, cards)):
-                    removed_playable_cards.append(cards)
-                    self.playable_cards[player_id].remove(cards)
-        else:
-            for cards in playable_cards:
-                if not contains_cards(current_hand, cards):
-                    #del self.playable_cards[player_id][cards]
-                    removed_playable_cards.append(cards)
-                    self.playable_cards[player_id].remove(cards)
-        self._recorded_removed_playable_cards[player_id].append(removed_playable_cards)
-        return self.playable_cards[player_id]
+        action_ids = self.playable_action_ids[player_id]
+        contained = contains_actions(cards2counts(cards2str(player.current_hand)), action_ids)
+        self._recorded_removed_playable_action_ids[player_id].append(action_ids[~contained])
+        self.playable_action_ids[player_id] = action_ids[contained]
+        return self.playable_action_ids[player_id]
 
     def restore_playable_cards(self, player_id):
         ''' restore playable_cards for judger for game.step_back().
@@ -313,8 +300,20 @@ class DoudizhuJudger:
         Args:
             player_id: The id of the player whose playable_cards need to be restored
         '''
-        removed_playable_cards = self._recorded_removed_playable_cards[player_id].pop()
-        self.playable_cards[player_id].update(removed_playable_cards)
+        removed = self._recorded_removed_playable_action_ids[player_id].pop()
+        self.playable_action_ids[player_id] = np.union1d(self.playable_action_ids[player_id], removed)
+
+    def get_playable_action_ids(self, player):
+        ''' Provide the ids of all legal actions the player can play according
+        to his current hand.
+
+        Args:
+            player (DoudizhuPlayer object): object of DoudizhuPlayer
+
+        Returns:
+            numpy.array: the ids of the playable actions
+        '''
+        return self.playable_action_ids[player.player_id]
 
     def get_playable_cards(self, player):
         ''' Provide all legal cards the player can play according to his
@@ -322,14 +321,11 @@ class DoudizhuJudger:
 
         Args:
             player (DoudizhuPlayer object): object of DoudizhuPlayer
-            init_flag (boolean): For the first time, set it True to accelerate
-              the preocess.
 
         Returns:
             list: list of string of playable cards
         '''
-        return self.playable_cards[player.player_id]
-
+        return [ID_2_ACTION[action_id] for action_id in self.get_playable_action_ids(player)]
 
     @staticmethod
     def judge_game(players, player_id):
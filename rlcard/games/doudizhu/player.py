@@ -3,7 +3,7 @@
 '''
 import functools
 
-from rlcard.games.doudizhu.utils import get_gt_cards
+from rlcard.games.doudizhu.utils import ID_2_ACTION, get_gt_action_ids
 from rlcard.games.doudizhu.utils import cards2str, doudizhu_sort_card
 
 
@@ -57,6 +57,21 @@ class DoudizhuPlayer:
 
         return state
 
+    def available_action_ids(self, greater_player=None, judger=None):
+        ''' Get the ids of the actions can be made based on the rules
+
+        Args:
+            greater_player (DoudizhuPlayer object): player who played
+        current biggest cards.
+            judger (DoudizhuJudger object): object of DoudizhuJudger
+
+        Returns:
+            numpy.array: the ids of the actions
+        '''
+        if greater_player is None or greater_player.player_id == self.player_id:
+            return judger.get_playable_action_ids(self)
+        return get_gt_action_ids(cards2str(self._current_hand), greater_player.played_cards)
+
     def available_actions(self, greater_player=None, judger=None):
         ''' Get the actions can be made based on the rules
 
@@ -68,12 +83,7 @@ class DoudizhuPlayer:
         Returns:
             list: list of string of actions. Eg: ['pass', '8', '9', 'T', 'J']
         '''
-        actions = []
-        if greater_player is None or greater_player.player_id == self.player_id:
-            actions = judger.get_playable_cards(self)
-        else:
-            actions = get_gt_cards(self, greater_player)
-        return actions
+        return [ID_2_ACTION[action_id] for action_id in self.available_action_ids(greater_player, judger)]
 
     def play(self, action, greater_player=None):
         ''' Perfrom action
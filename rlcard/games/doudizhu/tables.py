@@ -0,0 +1,108 @@
+''' Binary action tables of Doudizhu
+
+The action space and the card types of the actions, which come as JSON in
+jsondata.zip, are compiled to NumPy arrays in the tables directory. They are
+loaded with memory maps, so loading is fast and the pages are shared by all
+the processes using them. Nothing is written to the package at import time.
+
+Compile the tables again after changing jsondata.zip with:
+
+    python rlcard/games/doudizhu/tables.py
+'''
+import os
+import json
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+TABLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+JSONDATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jsondata.zip')
+
+# Rank of every character of the actions, as CARD_RANK_STR in utils
+RANKS = '3456789TJQKA2BR'
+
+# The arrays of the tables:
+#   actions: the actions by id, as bytes
+#   action_types: the index in card_types of the type of every action, -1 for 'pass'
+#   action_weights: the weight of every action in its type
+#   action_counts: the number of cards of every rank of every action
+#   action_masks: action_counts packed in 4 bits per rank
+#   type_action_ids: the action ids of the types one after another, in the order of type_card.json
+#   type_offsets: the start of every type in type_action_ids, and the end
+#   card_type_ids: the action ids in the order of card_type.json
+ARRAYS = ('actions', 'action_types', 'action_weights', 'action_counts', 'action_masks',
+          'type_action_ids', 'type_offsets', 'card_type_ids')
+CARD_TYPES_FILE = 'card_types.txt'
+
+def build_tables(jsondata_path=JSONDATA_PATH, tables_dir=TABLES_DIR):
+    ''' Compile the JSON data to the tables
+
+    Args:
+        jsondata_path (str): The zip file of the JSON data
+        tables_dir (str): The directory the tables are written to
+    '''
+    with zipfile.ZipFile(jsondata_path) as zip_ref:
+        id_2_action = zip_ref.read('jsondata/action_space.txt').decode().strip().split()
+        card_type = json.loads(zip_ref.read('jsondata/card_type.json'), object_pairs_hook=OrderedDict)
+        type_card = json.loads(zip_ref.read('jsondata/type_card.json'), object_pairs_hook=OrderedDict)
+    action_2_id = {action: i for i, action in enumerate(id_2_action)}
+    card_types = list(type_card)
+
+    num_actions = len(id_2_action)
+    action_types = np.full(num_actions, -1, dtype=np.int16)
+    action_weights = np.full(num_actions, -1, dtype=np.int16)
+    for cards, types in card_type.items():
+        if len(types) != 1:
+            raise ValueError('Every action must have a single type: {}'.format(cards))
+        (type_name, weight), = types
+        action_types[action_2_id[cards]] = card_types.index(type_name)
+        action_weights[action_2_id[cards]] = int(weight)
+
+    action_counts = np.zeros((num_actions, len(RANKS)), dtype=np.int8)
+    for i, action in enumerate(id_2_action):
+        if action != 'pass':
+            for card in action:
+                action_counts[i, RANKS.index(card)] += 1
+    shifts = 4 * np.arange(len(RANKS), dtype=np.uint64)
+    action_masks = (action_counts.astype(np.uint64) << shifts).sum(axis=1, dtype=np.uint64)
+
+    type_action_ids = [action_2_id[cards] for candidate in type_card.values()
+                       for cards_list in candidate.values() for cards in cards_list]
+    type_offsets = np.cumsum([0] + [sum(len(cards_list) for cards_list in candidate.values())
+                                    for candidate in type_card.values()])
+
+    arrays = {'actions': np.array(id_2_action, dtype=np.bytes_),
+              'action_types': action_types,
+              'action_weights': action_weights,
+              'action_counts': action_counts,
+              'action_masks': action_masks,
+              'type_action_ids': np.array(type_action_ids, dtype=np.int32),
+              'type_offsets': type_offsets.astype(np.int64),
+              'card_type_ids': np.array([action_2_id[cards] for cards in card_type], dtype=np.int32)}
+    if not os.path.exists(tables_dir):
+        os.makedirs(tables_dir)
+    for name in ARRAYS:
+        np.save(os.path.join(tables_dir, name + '.npy'), arrays[name])
+    with open(os.path.join(tables_dir, CARD_TYPES_FILE), 'w') as f:
+        f.write('\n'.join(card_types) + '\n')
+
+def load_tables(tables_dir=TABLES_DIR):
+    ''' Load the tables with memory maps
+
+    Args:
+        tables_dir (str): The directory of the tables
+
+    Returns:
+        (tuple) Tuple containing:
+
+            (dict): The read-only arrays of the tables, by name
+            (list): The names of the card types
+    '''
+    tables = {name: np.load(os.path.join(tables_dir, name + '.npy'), mmap_mode='r') for name in ARRAYS}
+    with open(os.path.join(tables_dir, CARD_TYPES_FILE)) as f:
+        card_types = f.read().split()
+    return tables, card_types
+
+if __name__ == '__main__':
+    build_tables()
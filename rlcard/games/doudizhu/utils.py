@@ -1,41 +1,76 @@
 ''' Doudizhu utils
 '''
-import os
-import json
 from collections import OrderedDict
 import threading
 import collections
 
+import numpy as np
+
 import rlcard
+from rlcard.games.doudizhu.tables import load_tables
 
 # Read required docs
 ROOT_PATH = rlcard.__path__[0]
 
-if not os.path.isfile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/action_space.txt')) \
-        or not os.path.isfile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/card_type.json')) \
-        or not os.path.isfile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/type_card.json')):
-    import zipfile
-    with zipfile.ZipFile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata.zip'),"r") as zip_ref:
-        zip_ref.extractall(os.path.join(ROOT_PATH, 'games/doudizhu/'))
+# The action tables, memory mapped from the binary tables of tables.py
+_TABLES, CARD_TYPES = load_tables()
 
 # Action space
-action_space_path = os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/action_space.txt')
-with open(action_space_path, 'r') as f:
-    ID_2_ACTION = f.readline().strip().split()
-    ACTION_2_ID = {}
-    for i, action in enumerate(ID_2_ACTION):
-        ACTION_2_ID[action] = i
-
-# a map of card to its type. Also return both dict and list to accelerate
-card_type_path = os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/card_type.json')
-with open(card_type_path, 'r') as f:
-    data = json.load(f, object_pairs_hook=OrderedDict)
-    CARD_TYPE = (data, list(data), set(data))
-
-# a map of type to its cards
-type_card_path = os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/type_card.json')
-with open(type_card_path, 'r') as f:
-    TYPE_CARD = json.load(f, object_pairs_hook=OrderedDict)
+ID_2_ACTION = _TABLES['actions'].astype(str).tolist()
+ACTION_2_ID = {action: i for i, action in enumerate(ID_2_ACTION)}
+PASS_ID = ACTION_2_ID['pass']
+
+# The index in CARD_TYPES of the type of every action and the weight of the
+# action in its type, -1 for 'pass'. Every action has a single type
+ACTION_TYPES = _TABLES['action_types']
+ACTION_WEIGHTS = _TABLES['action_weights']
+
+# Count vectors of the actions, indexed by action id, zero for 'pass'
+ACTION_COUNTS = _TABLES['action_counts']
+
+# The count vectors packed in 4 bits per rank. The top bit of every field of a
+# packed hand is set, a hand contains an action if no field of the hand minus
+# the action borrows it, which tests all the ranks with a single subtraction
+_RANK_SHIFTS = np.uint64(4) * np.arange(15, dtype=np.uint64)
+_GUARD = np.uint64(sum(8 << (4 * rank) for rank in range(15)))
+ACTION_MASKS = _TABLES['action_masks']
+
+def _type_action_ids():
+    # The action ids of every card type with their weights, in the order of the
+    # weights, as in TYPE_CARD
+    type_action_ids = {}
+    offsets = _TABLES['type_offsets']
+    for i, card_type in enumerate(CARD_TYPES):
+        ids = _TABLES['type_action_ids'][offsets[i]:offsets[i + 1]]
+        type_action_ids[card_type] = (ids, ACTION_WEIGHTS[ids])
+    return type_action_ids
+
+TYPE_ACTION_IDS = _type_action_ids()
+
+def _card_type():
+    # a map of card to its type. Also return both dict and list to accelerate
+    data = OrderedDict((ID_2_ACTION[i], [[CARD_TYPES[ACTION_TYPES[i]], str(ACTION_WEIGHTS[i])]])
+                       for i in _TABLES['card_type_ids'])
+    return (data, list(data), set(data))
+
+def _type_card():
+    # a map of type to its cards
+    type_card = OrderedDict()
+    for card_type, (ids, weights) in TYPE_ACTION_IDS.items():
+        candidate = type_card[card_type] = OrderedDict()
+        for action_id, weight in zip(ids, weights):
+            candidate.setdefault(str(weight), []).append(ID_2_ACTION[action_id])
+    return type_card
+
+_LAZY_TABLES = {'CARD_TYPE': _card_type, 'TYPE_CARD': _type_card}
+
+def __getattr__(name):
+    # CARD_TYPE and TYPE_CARD, the dicts of the JSON data, are only built when they are used
+    if name in _LAZY_TABLES:
+        value = _LAZY_TABLES[name]()
+        globals()[name] = value
+        return value
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
 
 # rank list of solo character of cards
 CARD_RANK_STR = ['3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K',
@@ -52,7 +87,6 @@ INDEX = {'3': 0, '4': 1, '5': 2, '6': 3, '7': 4,
          'K': 10, 'A': 11, '2': 12, 'B': 13, 'R': 14}
 INDEX = OrderedDict(sorted(INDEX.items(), key=lambda t: t[1]))
 
-
 def doudizhu_sort_str(card_1, card_2):
     ''' Compare the rank of two cards of str representation
 
@@ -222,6 +256,76 @@ def encode_cards(plane, cards):
         plane[0][rank] = 0
 
 
+def cards2counts(cards):
+    ''' Get the number of cards of every rank of a string of cards
+
+    Args:
+        cards (str): string of cards. Eg: '33366'
+
+    Returns:
+        numpy.array: the counts of the ranks of CARD_RANK_STR
+    '''
+    ranks = [CARD_RANK_STR_INDEX[card] for card in cards]
+    return np.bincount(ranks, minlength=len(CARD_RANK_STR)).astype(np.int8)
+
+def contains_actions(hand_counts, action_ids=None):
+    ''' Check if a hand contains the cards of actions, that is
+    all(hand_counts >= ACTION_COUNTS[action_id]) for every action
+
+    Args:
+        hand_counts (numpy.array): the counts of the ranks of the hand, from cards2counts
+        action_ids (numpy.array): the ids of the actions, all the actions if None
+
+    Returns:
+        numpy.array: boolean array, True for the actions contained in the hand
+    '''
+    hand = (hand_counts.astype(np.uint64) << _RANK_SHIFTS).sum(dtype=np.uint64) | _GUARD
+    masks = ACTION_MASKS if action_ids is None else ACTION_MASKS[action_ids]
+    return (hand - masks) & _GUARD == _GUARD
+
+def contained_action_ids(hand_counts, action_ids=None):
+    ''' Select the actions whose cards are all in a hand
+
+    Args:
+        hand_counts (numpy.array): the counts of the ranks of the hand, from cards2counts
+        action_ids (numpy.array): the ids of the candidate actions, all the actions if None
+
+    Returns:
+        numpy.array: the ids of the actions contained in the hand, in their order
+    '''
+    contained = contains_actions(hand_counts, action_ids)
+    if action_ids is None:
+        return np.flatnonzero(contained)
+    return action_ids[contained]
+
+def get_gt_action_ids(current_hand, target_cards):
+    ''' Get the ids of the actions of a hand which are greater than the cards
+    played by previous player in one round
+
+    Args:
+        current_hand (str): string of the cards of the hand
+        target_cards (str): string of the current biggest cards
+
+    Returns:
+        numpy.array: the ids of the greater actions, starting with 'pass'
+    '''
+    target_id = ACTION_2_ID[target_cards]
+    type_dict = {CARD_TYPES[ACTION_TYPES[target_id]]: ACTION_WEIGHTS[target_id]}
+    if 'rocket' in type_dict:
+        return np.array([PASS_ID])
+    type_dict['rocket'] = -1
+    if 'bomb' not in type_dict:
+        type_dict['bomb'] = -1
+
+    # Every action has a single type, so the candidates of the types are disjoint.
+    # The weights of a type are sorted, the greater actions are a slice
+    candidates = [np.array([PASS_ID])]
+    for card_type, weight in type_dict.items():
+        ids, weights = TYPE_ACTION_IDS[card_type]
+        candidates.append(ids[np.searchsorted(weights, int(weight), side='right'):])
+    candidates = np.concatenate(candidates)
+    return contained_action_ids(cards2counts(current_hand), candidates)
+
 def get_gt_cards(player, greater_player):
     ''' Provide player's cards which are greater than the ones played by
     previous player in one round
@@ -236,27 +340,5 @@ def get_gt_cards(player, greater_player):
     Note:
         1. return value contains 'pass'
     '''
-    # add 'pass' to legal actions
-    gt_cards = ['pass']
-    current_hand = cards2str(player.current_hand)
-    target_cards = greater_player.played_cards
-    target_types = CARD_TYPE[0][target_cards]
-    type_dict = {}
-    for card_type, weight in target_types:
-        if card_type not in type_dict:
-            type_dict[card_type] = weight
-    if 'rocket' in type_dict:
-        return gt_cards
-    type_dict['rocket'] = -1
-    if 'bomb' not in type_dict:
-        type_dict['bomb'] = -1
-    for card_type, weight in type_dict.items():
-        candidate = TYPE_CARD[card_type]
-        for can_weight, cards_list in candidate.items():
-            if int(can_weight) > int(weight):
-                for cards in cards_list:
-                    # TODO: improve efficiency
-                    if cards not in gt_cards and contains_cards(current_hand, cards):
-                        # if self.contains_cards(current_hand, cards):
-                        gt_cards.append(cards)
-    return gt_cards
+    action_ids = get_gt_action_ids(cards2str(player.current_hand), greater_player.played_cards)
+    return [ID_2_ACTION[action_id] for action_id in action_ids]
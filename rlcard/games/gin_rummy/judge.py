@@ -8,7 +8,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .game import GinRummyGame
 
-from typing import List, Tuple
+import functools
+from typing import Iterable, List, Tuple
 
 from .utils.action_event import *
 from .utils.scorers import GinRummyScorer
@@ -43,10 +44,10 @@ class GinRummyJudge:
             current_player = self.game.get_current_player()
             going_out_deadwood_count = self.game.settings.going_out_deadwood_count
             hand = current_player.hand
-            meld_clusters = current_player.get_meld_clusters()  # improve speed 2020-Apr
-            knock_cards, gin_cards = _get_going_out_cards(meld_clusters=meld_clusters,
-                                                          hand=hand,
-                                                          going_out_deadwood_count=going_out_deadwood_count)
+            knock_mask, gin_mask = _get_going_out_masks(hand_mask=current_player.hand_mask,
+                                                        going_out_deadwood_count=going_out_deadwood_count)
+            knock_cards = melding.get_mask_cards(knock_mask)
+            gin_cards = melding.get_mask_cards(gin_mask)
             if self.game.settings.is_allowed_gin and gin_cards:
                 legal_actions = [GinAction()]
             else:
@@ -105,11 +106,9 @@ def get_going_out_cards(hand: List[Card], going_out_deadwood_count: int) -> Tupl
     '''
     if not len(hand) == 11:
         raise GinRummyProgramError("len(hand) is {}: should be 11.".format(len(hand)))
-    meld_clusters = melding.get_meld_clusters(hand=hand)
-    knock_cards, gin_cards = _get_going_out_cards(meld_clusters=meld_clusters,
-                                                  hand=hand,
-                                                  going_out_deadwood_count=going_out_deadwood_count)
-    return list(knock_cards), list(gin_cards)
+    knock_mask, gin_mask = _get_going_out_masks(hand_mask=melding.get_hand_mask(hand),
+                                                going_out_deadwood_count=going_out_deadwood_count)
+    return melding.get_mask_cards(knock_mask), melding.get_mask_cards(gin_mask)
 
 
 #
@@ -127,29 +126,53 @@ def _get_going_out_cards(meld_clusters: List[List[List[Card]]],
     '''
     if not len(hand) == 11:
         raise GinRummyProgramError("len(hand) is {}: should be 11.".format(len(hand)))
-    knock_cards = set()
-    gin_cards = set()
-    for meld_cluster in meld_clusters:
-        meld_cards = [card for meld_pile in meld_cluster for card in meld_pile]
-        hand_deadwood = [card for card in hand if card not in meld_cards]  # hand has 11 cards
-        if len(hand_deadwood) == 0:
+    meld_cluster_masks = [tuple(melding.get_hand_mask(meld_pile) for meld_pile in meld_cluster)
+                          for meld_cluster in meld_clusters]
+    knock_mask, gin_mask = _get_meld_clusters_going_out_masks(meld_cluster_masks=meld_cluster_masks,
+                                                              hand_mask=melding.get_hand_mask(hand),
+                                                              going_out_deadwood_count=going_out_deadwood_count)
+    return melding.get_mask_cards(knock_mask), melding.get_mask_cards(gin_mask)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _get_going_out_masks(hand_mask: int, going_out_deadwood_count: int) -> Tuple[int, int]:
+    '''
+    :param hand_mask: int -- mask of the 11 cards of the hand
+    :param going_out_deadwood_count: int
+    :return int, int: masks of the cards in hand that can be knocked, that can be ginned
+    '''
+    return _get_meld_clusters_going_out_masks(meld_cluster_masks=melding.get_meld_cluster_masks(hand_mask),
+                                              hand_mask=hand_mask,
+                                              going_out_deadwood_count=going_out_deadwood_count)
+
+
+def _get_meld_clusters_going_out_masks(meld_cluster_masks: Iterable[Tuple[int, ...]],
+                                       hand_mask: int,
+                                       going_out_deadwood_count: int) -> Tuple[int, int]:
+    knock_mask = 0
+    gin_mask = 0
+    for meld_cluster_mask in meld_cluster_masks:
+        deadwood_mask = hand_mask
+        for meld_mask in meld_cluster_mask:
+            deadwood_mask &= ~meld_mask
+        if deadwood_mask == 0:
             # all 11 cards are melded;
             # take gin_card as first card of first 4+ meld;
             # could also take gin_card as last card of 4+ meld, but won't do this.
-            for meld_pile in meld_cluster:
-                if len(meld_pile) >= 4:
-                    gin_cards.add(meld_pile[0])
+            for meld_mask in meld_cluster_mask:
+                if bin(meld_mask).count('1') >= 4:
+                    gin_mask |= meld_mask & -meld_mask
                     break
-        elif len(hand_deadwood) == 1:
-            card = hand_deadwood[0]
-            gin_cards.add(card)
+        elif deadwood_mask & (deadwood_mask - 1) == 0:
+            gin_mask |= deadwood_mask
         else:
-            hand_deadwood_values = [utils.get_deadwood_value(card) for card in hand_deadwood]
+            deadwood_cards = melding.get_mask_cards(deadwood_mask)
+            hand_deadwood_values = [utils.get_deadwood_value(card) for card in deadwood_cards]
             hand_deadwood_count = sum(hand_deadwood_values)
             max_hand_deadwood_value = max(hand_deadwood_values, default=0)
             if hand_deadwood_count <= 10 + max_hand_deadwood_value:
-                for card in hand_deadwood:
-                    next_deadwood_count = hand_deadwood_count - utils.get_deadwood_value(card)
+                for card, deadwood_value in zip(deadwood_cards, hand_deadwood_values):
+                    next_deadwood_count = hand_deadwood_count - deadwood_value
                     if next_deadwood_count <= going_out_deadwood_count:
-                        knock_cards.add(card)
-    return list(knock_cards), list(gin_cards)
+                        knock_mask |= 1 << utils.get_card_id(card)
+    return knock_mask, gin_mask
@@ -158,7 +158,7 @@ class GinRummyRound:
         current_player = self.get_current_player()
         best_meld_clusters = melding.get_best_meld_clusters(hand=current_player.hand)
         best_meld_cluster = [] if not best_meld_clusters else best_meld_clusters[0]
-        deadwood_count = utils.get_deadwood_count(hand=current_player.hand, meld_cluster=best_meld_cluster)
+        deadwood_count = melding.get_min_deadwood_count(current_player.hand_mask)
         self.move_sheet.append(ScoreNorthMove(player=current_player,
                                               action=action,
                                               best_meld_cluster=best_meld_cluster,
@@ -174,7 +174,7 @@ class GinRummyRound:
         current_player = self.get_current_player()
         best_meld_clusters = melding.get_best_meld_clusters(hand=current_player.hand)
         best_meld_cluster = [] if not best_meld_clusters else best_meld_clusters[0]
-        deadwood_count = utils.get_deadwood_count(hand=current_player.hand, meld_cluster=best_meld_cluster)
+        deadwood_count = melding.get_min_deadwood_count(current_player.hand_mask)
         self.move_sheet.append(ScoreSouthMove(player=current_player,
                                               action=action,
                                               best_meld_cluster=best_meld_cluster,
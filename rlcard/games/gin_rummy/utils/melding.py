@@ -4,7 +4,8 @@
     Date created: 2/12/2020
 '''
 
-from typing import List
+import functools
+from typing import Iterable, List, Tuple
 
 from rlcard.games.base import Card
 
@@ -23,47 +24,15 @@ from rlcard.games.gin_rummy.utils.gin_rummy_error import GinRummyProgramError
 
 
 def get_meld_clusters(hand: List[Card]) -> List[List[List[Card]]]:
-    result = []  # type: List[List[List[Card]]]
-    all_run_melds = [frozenset(x) for x in get_all_run_melds(hand)]
-    all_set_melds = [frozenset(x) for x in get_all_set_melds(hand)]
-    all_melds = all_run_melds + all_set_melds
-    all_melds_count = len(all_melds)
-    for i in range(0, all_melds_count):
-        first_meld = all_melds[i]
-        first_meld_list = list(first_meld)
-        meld_cluster_1 = [first_meld_list]
-        result.append(meld_cluster_1)
-        for j in range(i + 1, all_melds_count):
-            second_meld = all_melds[j]
-            second_meld_list = list(second_meld)
-            if not second_meld.isdisjoint(first_meld):
-                continue
-            meld_cluster_2 = [first_meld_list, second_meld_list]
-            result.append(meld_cluster_2)
-            for k in range(j + 1, all_melds_count):
-                third_meld = all_melds[k]
-                third_meld_list = list(third_meld)
-                if not third_meld.isdisjoint(first_meld) or not third_meld.isdisjoint(second_meld):
-                    continue
-                meld_cluster_3 = [first_meld_list, second_meld_list, third_meld_list]
-                result.append(meld_cluster_3)
-    return result
+    return [[get_mask_cards(meld_mask) for meld_mask in meld_cluster_mask]
+            for meld_cluster_mask in get_meld_cluster_masks(get_hand_mask(hand))]
 
 
 def get_best_meld_clusters(hand: List[Card]) -> List[List[List[Card]]]:
     if len(hand) != 10:
         raise GinRummyProgramError("Hand contain {} cards: should be 10 cards.".format(len(hand)))
-    result = []  # type: List[List[List[Card]]]
-    meld_clusters = get_meld_clusters(hand=hand)  # type: List[List[List[Card]]]
-    meld_clusters_count = len(meld_clusters)
-    if meld_clusters_count > 0:
-        deadwood_counts = [utils.get_deadwood_count(hand=hand, meld_cluster=meld_cluster)
-                           for meld_cluster in meld_clusters]
-        best_deadwood_count = min(deadwood_counts)
-        for i in range(meld_clusters_count):
-            if deadwood_counts[i] == best_deadwood_count:
-                result.append(meld_clusters[i])
-    return result
+    return [[get_mask_cards(meld_mask) for meld_mask in meld_cluster_mask]
+            for meld_cluster_mask in get_best_meld_cluster_masks(get_hand_mask(hand))]
 
 
 def get_all_run_melds(hand: List[Card]) -> List[List[Card]]:
@@ -149,3 +118,126 @@ def get_all_run_melds_for_suit(cards: List[Card], suit: str) -> List[List[Card]]
             for j in range(i + 3, max_run_meld_count + 1):
                 result.append(max_run_meld[i:j])
     return result
+
+
+# ===============================================================
+#    Bitmask melding:
+#        A hand is a 52-bit mask with bit card_id set for each of its cards.
+#        A meld is the mask of its cards; a meld cluster is a tuple of disjoint meld masks.
+#        The meld clusters of a hand are memoized by its mask.
+# ===============================================================
+
+_CACHE_SIZE = 1 << 16
+
+
+def _make_meld_masks() -> List[int]:
+    # run melds by suit, first rank and length, then set melds by rank: the 4 cards before the 3-card subsets
+    meld_masks = []
+    for suit_id in range(4):
+        for first_rank_id in range(11):
+            for last_rank_id in range(first_rank_id + 2, 13):
+                meld_masks.append(sum(1 << (rank_id + 13 * suit_id) for rank_id in range(first_rank_id, last_rank_id + 1)))
+    for rank_id in range(13):
+        set_mask = sum(1 << (rank_id + 13 * suit_id) for suit_id in range(4))
+        meld_masks.append(set_mask)
+        for suit_id in range(4):
+            meld_masks.append(set_mask & ~(1 << (rank_id + 13 * suit_id)))
+    return meld_masks
+
+
+_MELD_MASKS = _make_meld_masks()  # type: List[int]
+_MELD_INDEX = {meld_mask: i for i, meld_mask in enumerate(_MELD_MASKS)}
+_MELD_MASKS_BY_CARD_ID = [[meld_mask for meld_mask in _MELD_MASKS if meld_mask >> card_id & 1]
+                          for card_id in range(52)]  # type: List[List[int]]
+_MELD_CARDS = {meld_mask: tuple(utils.get_card(card_id) for card_id in range(52) if meld_mask >> card_id & 1)
+               for meld_mask in _MELD_MASKS}
+_DEADWOOD_VALUES = [utils.get_deadwood_value(utils.get_card(card_id)) for card_id in range(52)]
+
+
+def get_hand_mask(hand: Iterable[Card]) -> int:
+    hand_mask = 0
+    for card in hand:
+        hand_mask |= 1 << utils.get_card_id(card)
+    return hand_mask
+
+
+def get_mask_cards(mask: int) -> List[Card]:
+    if mask in _MELD_CARDS:
+        return list(_MELD_CARDS[mask])
+    cards = []
+    while mask:
+        low_bit = mask & -mask
+        cards.append(utils.get_card(low_bit.bit_length() - 1))
+        mask ^= low_bit
+    return cards
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def get_meld_cluster_masks(hand_mask: int) -> Tuple[Tuple[int, ...], ...]:
+    '''
+    :param hand_mask: int -- mask of the cards of the hand
+    :return: all the meld clusters of 1 to 3 disjoint melds of the hand, in the order of get_meld_clusters
+    '''
+    result = []
+    all_melds = [meld_mask for meld_mask in _MELD_MASKS if meld_mask & hand_mask == meld_mask]
+    all_melds_count = len(all_melds)
+    for i in range(all_melds_count):
+        first_meld = all_melds[i]
+        result.append((first_meld,))
+        for j in range(i + 1, all_melds_count):
+            second_meld = all_melds[j]
+            if second_meld & first_meld:
+                continue
+            result.append((first_meld, second_meld))
+            used_mask = first_meld | second_meld
+            for k in range(j + 1, all_melds_count):
+                third_meld = all_melds[k]
+                if third_meld & used_mask:
+                    continue
+                result.append((first_meld, second_meld, third_meld))
+    return tuple(result)
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def get_min_deadwood_count(mask: int) -> int:
+    '''
+    :param mask: int -- mask of cards
+    :return: the least deadwood count of the cards over all the ways to meld them
+    '''
+    # The lowest card is either deadwood or in one of its melds that are in mask
+    if mask == 0:
+        return 0
+    low_bit = mask & -mask
+    card_id = low_bit.bit_length() - 1
+    result = _DEADWOOD_VALUES[card_id] + get_min_deadwood_count(mask ^ low_bit)
+    for meld_mask in _MELD_MASKS_BY_CARD_ID[card_id]:
+        if meld_mask & mask == meld_mask:
+            result = min(result, get_min_deadwood_count(mask ^ meld_mask))
+    return result
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def get_best_meld_cluster_masks(hand_mask: int) -> Tuple[Tuple[int, ...], ...]:
+    '''
+    :param hand_mask: int -- mask of the cards of the hand
+    :return: the meld clusters of the hand with the least deadwood count, in the order of get_meld_clusters
+    '''
+    result = [meld_cluster for meld_cluster in _get_min_deadwood_meld_clusters(hand_mask) if meld_cluster]
+    result = [tuple(sorted(meld_cluster, key=_MELD_INDEX.get)) for meld_cluster in result]
+    return tuple(sorted(result, key=lambda meld_cluster: [_MELD_INDEX[meld_mask] for meld_mask in meld_cluster]))
+
+
+def _get_min_deadwood_meld_clusters(mask: int) -> List[Tuple[int, ...]]:
+    # Follow the choices of get_min_deadwood_count for the lowest card that keep the least deadwood count
+    if mask == 0:
+        return [()]
+    min_deadwood_count = get_min_deadwood_count(mask)
+    low_bit = mask & -mask
+    card_id = low_bit.bit_length() - 1
+    result = []
+    if _DEADWOOD_VALUES[card_id] + get_min_deadwood_count(mask ^ low_bit) == min_deadwood_count:
+        result.extend(_get_min_deadwood_meld_clusters(mask ^ low_bit))
+    for meld_mask in _MELD_MASKS_BY_CARD_ID[card_id]:
+        if meld_mask & mask == meld_mask and get_min_deadwood_count(mask ^ meld_mask) == min_deadwood_count:
+            result.extend((meld_mask,) + meld_cluster for meld_cluster in _get_min_deadwood_meld_clusters(mask ^ meld_mask))
+    return result
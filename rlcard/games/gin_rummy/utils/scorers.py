@@ -16,7 +16,6 @@ from .move import ScoreNorthMove, ScoreSouthMove
 from .gin_rummy_error import GinRummyProgramError
 
 from rlcard.games.gin_rummy.utils import melding
-from rlcard.games.gin_rummy.utils import utils
 
 
 class GinRummyScorer:
@@ -75,9 +74,6 @@ def get_payoff_gin_rummy_v1(player: GinRummyPlayer, game: 'GinRummyGame') -> flo
     elif going_out_player_id == player.player_id and isinstance(going_out_action, GinAction):
         payoff = 1
     else:
-        hand = player.hand
-        best_meld_clusters = melding.get_best_meld_clusters(hand=hand)
-        best_meld_cluster = [] if not best_meld_clusters else best_meld_clusters[0]
-        deadwood_count = utils.get_deadwood_count(hand, best_meld_cluster)
+        deadwood_count = melding.get_min_deadwood_count(player.hand_mask)
         payoff = -deadwood_count / 100
     return payoff
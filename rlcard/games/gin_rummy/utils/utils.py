@@ -52,18 +52,20 @@ def get_card(card_id: int):
     return _deck[card_id]
 
 
+_rank_ids = {rank: rank_id for rank_id, rank in enumerate(Card.valid_rank)}
+_suit_ids = {suit: suit_id for suit_id, suit in enumerate(Card.valid_suit)}
+
+
 def get_card_id(card: Card) -> int:
-    rank_id = get_rank_id(card)
-    suit_id = get_suit_id(card)
-    return rank_id + 13 * suit_id
+    return _rank_ids[card.rank] + 13 * _suit_ids[card.suit]
 
 
 def get_rank_id(card: Card) -> int:
-    return Card.valid_rank.index(card.rank)
+    return _rank_ids[card.rank]
 
 
 def get_suit_id(card: Card) -> int:
-    return Card.valid_suit.index(card.suit)
+    return _suit_ids[card.suit]
 
 
 def get_deadwood_value(card: Card) -> int:
@@ -0,0 +1,154 @@
+''' Equity of hold'em hands
+
+The equity of a player is its expected share of the pot at the showdown,
+over the cards left to come: 1 for a win, 1/k for a tie between k players.
+The remaining cards are enumerated when there are few possible deals and
+sampled otherwise, and all the deals are evaluated at once with
+evaluator.evaluate_batch. The equities of preflop hands against random
+opponents, which only depend on the class of the hand ('AKs', 'T9o',
+'77'...) and the number of opponents, are memoized in a JSON file.
+'''
+import os
+import json
+import itertools
+
+import numpy as np
+
+from rlcard.games.limitholdem.evaluator import RANKS, card_to_int, evaluate_batch
+
+DEFAULT_PREFLOP_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'rlcard', 'preflop_equity.json')
+
+# The number of deals evaluated in one batch
+_CHUNK_SIZE = 50000
+
+# The memoized preflop equities of the cache files, by path
+_preflop_tables = {}
+
+def _comb(n, k):
+    # math.comb is only in Python 3.8+
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+def _to_ints(cards):
+    return [card if isinstance(card, (int, np.integer)) else card_to_int(card) for card in cards]
+
+def _showdown(hands, boards):
+    ''' The shares of the pot of the players over deals
+
+    Args:
+        hands (numpy.array): (num_deals, num_players, 2) hole cards
+        boards (numpy.array): (num_deals, 5) public cards
+
+    Returns:
+        (numpy.array): The sums of the shares of the players over the deals
+    '''
+    num_deals, num_players = hands.shape[:2]
+    cards = np.concatenate([hands, np.repeat(boards[:, np.newaxis], num_players, axis=1)], axis=2)
+    values = evaluate_batch(cards.reshape(num_deals * num_players, 7)).reshape(num_deals, num_players)
+    winners = values == values.max(axis=1, keepdims=True)
+    return (winners / winners.sum(axis=1, keepdims=True)).sum(axis=0)
+
+def equity(hands, board=(), num_opponents=0, num_samples=10000, exact_limit=50000, seed=None):
+    ''' Compute the equities of hands
+
+    The deals are enumerated when the hole cards of all the players are known
+    and there are at most exact_limit ways to complete the board, and sampled
+    otherwise.
+
+    Args:
+        hands (list): The hole cards of the players, two cards like 'SA' or
+          encoded by evaluator.card_to_int for each player
+        board (list): The public cards dealt so far
+        num_opponents (int): The number of other players with unknown random hole cards
+        num_samples (int): The number of sampled deals
+        exact_limit (int): The maximum number of deals to enumerate
+        seed (int): The seed of the sampling
+
+    Returns:
+        (numpy.array): The equities of the players of hands, then of the unknown opponents
+    '''
+    hands = [_to_ints(hand) for hand in hands]
+    board = _to_ints(board)
+    known = [card for hand in hands for card in hand] + board
+    if len(set(known)) != len(known):
+        raise ValueError('A card is dealt twice')
+    deck = np.array([card for card in range(52) if card not in set(known)])
+    num_players = len(hands) + num_opponents
+    num_board = 5 - len(board)
+
+    num_boards = _comb(len(deck), num_board)
+    if num_opponents == 0 and num_boards <= exact_limit:
+        deals = np.array(list(itertools.combinations(deck, num_board)), dtype=np.int64).reshape(num_boards, num_board)
+    else:
+        # The first cards of a random permutation of the deck of every deal
+        np_random = np.random.RandomState(seed)
+        num_cards = num_board + 2 * num_opponents
+        deals = np.argsort(np_random.random_sample((num_samples, len(deck))), axis=1)[:, :num_cards]
+        deals = deck[deals]
+
+    shares = np.zeros(num_players)
+    for start in range(0, len(deals), _CHUNK_SIZE):
+        chunk = deals[start:start + _CHUNK_SIZE]
+        boards = np.concatenate([np.broadcast_to(np.array(board, dtype=np.int64), (len(chunk), len(board))),
+                                 chunk[:, :num_board]], axis=1)
+        chunk_hands = np.concatenate([np.broadcast_to(np.array(hands, dtype=np.int64).reshape(1, -1, 2),
+                                                      (len(chunk), len(hands), 2)),
+                                      chunk[:, num_board:].reshape(len(chunk), num_opponents, 2)], axis=1)
+        shares += _showdown(chunk_hands, boards)
+    return shares / len(deals)
+
+def preflop_class(hand):
+    ''' Get the class of two hole cards, like 'AKs', 'T9o' or '77'
+
+    Args:
+        hand (list): Two cards like 'SA' or encoded by evaluator.card_to_int
+
+    Returns:
+        (str): The class of the hand
+    '''
+    high, low = sorted(_to_ints(hand), reverse=True)
+    if high >> 2 == low >> 2:
+        return RANKS[high >> 2] * 2
+    return RANKS[high >> 2] + RANKS[low >> 2] + ('s' if high & 3 == low & 3 else 'o')
+
+def preflop_equity(hand, num_opponents=1, num_samples=100000, cache_path=DEFAULT_PREFLOP_CACHE):
+    ''' Compute the equity of hole cards against random hole cards of the
+    opponents before the flop, memoized by the class of the hand
+
+    The equity of a class is sampled once, from the same cards and seed
+    whatever the hand of the class, and saved to cache_path.
+
+    Args:
+        hand (list): Two cards like 'SA' or encoded by evaluator.card_to_int
+        num_opponents (int): The number of opponents
+        num_samples (int): The number of sampled deals of a class that is not memoized
+        cache_path (str): The JSON file of the memoized equities, only memoized in
+          memory if None
+
+    Returns:
+        (float): The equity of the hand
+    '''
+    table = _preflop_tables.get(cache_path)
+    if table is None:
+        table = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                table = json.load(f)
+        _preflop_tables[cache_path] = table
+
+    hand_class = preflop_class(hand)
+    key = '{}:{}:{}'.format(hand_class, num_opponents, num_samples)
+    if key not in table:
+        # Every hand of the class has the same equity, it is sampled with spades and hearts
+        cards = ['S' + hand_class[0], ('S' if hand_class.endswith('s') else 'H') + hand_class[1]]
+        seed = sum(ord(c) * 31 ** i for i, c in enumerate(key)) % (2 ** 31)
+        table[key] = float(equity([cards], num_opponents=num_opponents, num_samples=num_samples, seed=seed)[0])
+        if cache_path is not None:
+            directory = os.path.dirname(cache_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(cache_path, 'w') as f:
+                json.dump(table, f, indent=0, sort_keys=True)
+    return table[key]
@@ -0,0 +1,196 @@
+''' Lookup table evaluator of hold'em hands
+
+A hand of 5 to 7 cards is mapped to a single integer value, greater for a
+better hand, equal for hands of the same strength. The value is the category
+of the hand (1 for a high card up to 9 for a straight flush, like
+Hand.category) times 16^5 plus the ranks deciding between hands of the
+category, from the most significant one, in base 16.
+
+Cards are integers rank * 4 + suit, with ranks from 0 for a two to 12 for an
+ace and suits in the order of SUITS. A hand that is not a flush only depends
+on how many cards of every rank it has, which is encoded by the sum of
+5 ** rank over its cards, and is looked up in a table of all these sums. A
+flush is looked up by the 13-bit mask of the ranks of its suit. The tables
+are built at the first evaluation.
+'''
+import itertools
+
+import numpy as np
+
+RANKS = '23456789TJQKA'
+SUITS = 'SHDC'
+
+HIGH_CARD, ONE_PAIR, TWO_PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH = range(1, 10)
+
+_RANK_INDEX = {rank: i for i, rank in enumerate(RANKS)}
+_POWERS = [5 ** rank for rank in range(13)]
+
+# Tables built by _build_tables
+_rank_values = None
+_rank_keys = None
+_rank_key_values = None
+_flush_values = None
+
+def card_to_int(card):
+    ''' Encode a card string like 'SA' (suit then rank)
+
+    Args:
+        card (str): The card
+
+    Returns:
+        (int): The card as rank * 4 + suit
+    '''
+    return _RANK_INDEX[card[1]] * 4 + SUITS.index(card[0])
+
+def int_to_card(card):
+    ''' Decode a card encoded by card_to_int
+    '''
+    return SUITS[card % 4] + RANKS[card // 4]
+
+def category(value):
+    ''' Get the category of a hand value, from HIGH_CARD to STRAIGHT_FLUSH
+    '''
+    return value >> 20
+
+def _value(hand_category, ranks=()):
+    value = hand_category
+    for i in range(5):
+        value = value * 16 + (ranks[i] if i < len(ranks) else 0)
+    return value
+
+def _straight_high(mask):
+    ''' The highest rank of a straight in a 13-bit rank mask, or None
+    '''
+    # The ace also plays below the two
+    mask = (mask << 1) | (mask >> 12 & 1)
+    for high in range(12, 2, -1):
+        if mask >> (high - 3) & 0b11111 == 0b11111:
+            return high
+    return None
+
+def _counts_value(counts):
+    ''' The value of the best hand that is not a flush with these numbers of cards per rank
+    '''
+    ranks = [rank for rank in range(12, -1, -1) for _ in range(counts[rank])]
+    by_count = sorted(range(13), key=lambda rank: (counts[rank], rank), reverse=True)
+    first, second = by_count[0], by_count[1]
+
+    if counts[first] == 4:
+        return _value(FOUR_OF_A_KIND, [first] + [rank for rank in ranks if rank != first][:1])
+    if counts[first] == 3 and counts[second] >= 2:
+        return _value(FULL_HOUSE, [first, second])
+    mask = sum(1 << rank for rank in range(13) if counts[rank])
+    high = _straight_high(mask)
+    if high is not None:
+        return _value(STRAIGHT, [high])
+    if counts[first] == 3:
+        return _value(THREE_OF_A_KIND, [first] + [rank for rank in ranks if rank != first][:2])
+    if counts[first] == 2 and counts[second] == 2:
+        kicker = [rank for rank in ranks if rank not in (first, second)][:1]
+        return _value(TWO_PAIR, [first, second] + kicker)
+    if counts[first] == 2:
+        return _value(ONE_PAIR, [first] + [rank for rank in ranks if rank != first][:3])
+    return _value(HIGH_CARD, ranks[:5])
+
+def _build_tables():
+    global _rank_values, _rank_keys, _rank_key_values, _flush_values
+    rank_values = {}
+    for num_cards in range(5, 8):
+        for combination in itertools.combinations_with_replacement(range(13), num_cards):
+            counts = [0] * 13
+            for rank in combination:
+                counts[rank] += 1
+            if max(counts) <= 4:
+                rank_values[sum(_POWERS[rank] for rank in combination)] = _counts_value(counts)
+
+    flush_values = np.zeros(1 << 13, dtype=np.int64)
+    for mask in range(1 << 13):
+        if bin(mask).count('1') >= 5:
+            high = _straight_high(mask)
+            if high is not None:
+                flush_values[mask] = _value(STRAIGHT_FLUSH, [high])
+            else:
+                flush_values[mask] = _value(FLUSH, [rank for rank in range(12, -1, -1) if mask >> rank & 1][:5])
+
+    _rank_keys = np.array(sorted(rank_values), dtype=np.int64)
+    _rank_key_values = np.array([rank_values[key] for key in _rank_keys], dtype=np.int64)
+    _flush_values = flush_values
+    _rank_values = rank_values
+
+def evaluate(cards):
+    ''' Evaluate a hand
+
+    Args:
+        cards (list): 5 to 7 cards encoded by card_to_int
+
+    Returns:
+        (int): The value of the best five cards of the hand
+    '''
+    if _rank_values is None:
+        _build_tables()
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    suit_counts = [0, 0, 0, 0]
+    for card in cards:
+        rank, suit = card >> 2, card & 3
+        key += _POWERS[rank]
+        suit_masks[suit] |= 1 << rank
+        suit_counts[suit] += 1
+    value = _rank_values[key]
+    for suit in range(4):
+        if suit_counts[suit] >= 5:
+            value = max(value, int(_flush_values[suit_masks[suit]]))
+    return value
+
+def evaluate_cards(cards):
+    ''' Evaluate a hand of card strings like 'SA' (suit then rank)
+
+    The suits are only compared with each other, so any suit letters work.
+
+    Args:
+        cards (list): 5 to 7 cards
+
+    Returns:
+        (int): The value of the best five cards of the hand
+    '''
+    if _rank_values is None:
+        _build_tables()
+    key = 0
+    suit_masks = {}
+    for card in cards:
+        rank = _RANK_INDEX[card[1]]
+        key += _POWERS[rank]
+        suit_masks[card[0]] = suit_masks.get(card[0], 0) | 1 << rank
+    value = _rank_values[key]
+    for mask in suit_masks.values():
+        if bin(mask).count('1') >= 5:
+            value = max(value, int(_flush_values[mask]))
+    return value
+
+def evaluate_batch(cards):
+    ''' Evaluate many hands at once
+
+    Args:
+        cards (numpy.array): (num_hands, num_cards) cards encoded by card_to_int, with
+          5 to 7 cards per hand
+
+    Returns:
+        (numpy.array): The values of the hands
+    '''
+    if _rank_values is None:
+        _build_tables()
+    cards = np.asarray(cards)
+    ranks = cards >> 2
+    suits = cards & 3
+    keys = np.asarray(_POWERS, dtype=np.int64)[ranks].sum(axis=1)
+    values = _rank_key_values[np.searchsorted(_rank_keys, keys)]
+
+    # At most one suit has five cards or more in seven cards
+    suit_counts = np.stack([(suits == suit).sum(axis=1) for suit in range(4)], axis=1)
+    flush_suits = suit_counts.argmax(axis=1)
+    flush = suit_counts.max(axis=1) >= 5
+    if flush.any():
+        in_suit = suits[flush] == flush_suits[flush, np.newaxis]
+        masks = np.where(in_suit, 1 << ranks[flush], 0).sum(axis=1)
+        values[flush] = np.maximum(values[flush], _flush_values[masks])
+    return values
@@ -1,10 +1,10 @@
-from copy import deepcopy, copy
 import numpy as np
 
 from rlcard.games.limitholdem import Dealer
 from rlcard.games.limitholdem import Player, PlayerStatus
 from rlcard.games.limitholdem import Judger
 from rlcard.games.limitholdem import Round
+from rlcard.games.base import UndoLog
 
 
 class LimitHoldemGame:
@@ -93,7 +93,7 @@ class LimitHoldemGame:
         self.round_counter = 0
 
         # Save the history for stepping back to the last state.
-        self.history = []
+        self.history = UndoLog()
 
         state = self.get_state(self.game_pointer)
 
@@ -116,15 +116,18 @@ class LimitHoldemGame:
                 (int): next player id
         """
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            rn = copy(self.history_raise_nums)
-            self.history.append((r, b, r_c, d, p, ps, rn))
+            # First record what the action may change
+            history = self.history
+            history.begin()
+            history.save_attrs(self, 'game_pointer', 'round_counter')
+            history.save_attrs(self.round, 'game_pointer', 'raise_amount', 'have_raised', 'not_raise_num',
+                               'raised', 'player_folded')
+            history.save_list(self.round.raised)
+            history.save_list(self.dealer.deck)
+            history.save_list(self.public_cards)
+            history.save_list(self.history_raise_nums)
+            for player in self.players:
+                history.save_attrs(player, 'status', 'in_chips')
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -162,11 +165,7 @@ class LimitHoldemGame:
         Returns:
             (bool): True if the game steps back successfully
         """
-        if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, \
-                self.players, self.history_raises_nums = self.history.pop()
-            return True
-        return False
+        return self.history.undo()
 
     def get_num_players(self):
         """
@@ -1,6 +1,7 @@
-from rlcard.games.limitholdem.utils import compare_hands
 import numpy as np
 
+from rlcard.games.limitholdem.evaluator import card_to_int, evaluate
+
 
 class LimitHoldemJudger:
     """The Judger class for limit texas holdem"""
@@ -19,21 +20,27 @@ class LimitHoldemJudger:
         Returns:
             (list): Each entry of the list corresponds to one entry of the
         """
-        # Convert the hands into card indexes
-        hands = [[card.get_index() for card in hand] if hand is not None else None for hand in hands]
-        
+        # Rank the hands once with the evaluator, a folded hand ranks below all the others.
+        # When the others folded, the last hand wins without a showdown, before the river maybe
+        if sum(hand is not None for hand in hands) > 1:
+            values = [evaluate([card_to_int(card.get_index()) for card in hand]) if hand is not None else -1
+                      for hand in hands]
+        else:
+            values = [0 if hand is not None else -1 for hand in hands]
+
         in_chips = [p.in_chips for p in players]
         remaining = sum(in_chips)
         payoffs = [0] * len(hands)
         while remaining > 0:
-            winners = compare_hands(hands)
+            best = max(values)
+            winners = [int(value == best) for value in values]
             each_win = self.split_pots_among_players(in_chips, winners)
             
             for i in range(len(players)):
                 if winners[i]:
                     remaining -= each_win[i]
                     payoffs[i] += each_win[i] - in_chips[i]
-                    hands[i] = None
+                    values[i] = -1
                     in_chips[i] = 0
                 elif in_chips[i] > 0:
                     payoffs[i] += each_win[i] - in_chips[i]
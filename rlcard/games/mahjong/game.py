@@ -1,10 +1,10 @@
 import numpy as np
-from copy import deepcopy
 
 from rlcard.games.mahjong import Dealer
 from rlcard.games.mahjong import Player
 from rlcard.games.mahjong import Round
 from rlcard.games.mahjong import Judger
+from rlcard.games.base import UndoLog
 
 class MahjongGame:
 
@@ -40,7 +40,7 @@ class MahjongGame:
             self.dealer.deal_cards(player, 13)
 
         # Save the hisory for stepping back to the last state.
-        self.history = []
+        self.history = UndoLog()
 
         self.dealer.deal_cards(self.players[self.round.current_player], 1)
         state = self.get_state(self.round.current_player)
@@ -61,10 +61,16 @@ class MahjongGame:
         '''
         # First snapshot the current state
         if self.allow_step_back:
-            hist_dealer = deepcopy(self.dealer)
-            hist_round = deepcopy(self.round)
-            hist_players = deepcopy(self.players)
-            self.history.append((hist_dealer, hist_players, hist_round))
+            history = self.history
+            history.begin()
+            history.save_attrs(self, 'cur_state')
+            history.save_attrs(self.round, 'current_player', 'last_player', 'player_before_act', 'valid_act',
+                               'last_cards')
+            history.save_list(self.dealer.deck)
+            history.save_list(self.dealer.table)
+            for player in self.players:
+                history.save_list(player.hand)
+                history.save_list(player.pile)
         self.round.proceed_round(self.players, action)
         state = self.get_state(self.round.current_player)
         self.cur_state = state
@@ -76,10 +82,7 @@ class MahjongGame:
         Returns:
             (bool): True if the game steps back successfully
         '''
-        if not self.history:
-            return False
-        self.dealer, self.players, self.round = self.history.pop()
-        return True
+        return self.history.undo()
 
     def get_state(self, player_id):
         ''' Return player's state
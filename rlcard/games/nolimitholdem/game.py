@@ -1,7 +1,7 @@
 from enum import Enum
 
 import numpy as np
-from copy import deepcopy
+from rlcard.games.base import UndoLog
 from rlcard.games.limitholdem import Game
 from rlcard.games.limitholdem import PlayerStatus
 
@@ -98,7 +98,7 @@ class NolimitholdemGame(Game):
         self.round_counter = 0
 
         # Save the history for stepping back to the last state.
-        self.history = []
+        self.history = UndoLog()
 
         state = self.get_state(self.game_pointer)
 
@@ -133,14 +133,17 @@ class NolimitholdemGame(Game):
             raise Exception('Action not allowed')
 
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            self.history.append((r, b, r_c, d, p, ps))
+            # First record what the action may change
+            history = self.history
+            history.begin()
+            history.save_attrs(self, 'game_pointer', 'round_counter', 'stage')
+            history.save_attrs(self.round, 'game_pointer', 'not_raise_num', 'not_playing_num', 'raised')
+            history.save_list(self.round.raised)
+            history.save_attrs(self.dealer, 'pot')
+            history.save_list(self.dealer.deck)
+            history.save_list(self.public_cards)
+            for player in self.players:
+                history.save_attrs(player, 'status', 'in_chips', 'remained_chips')
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -215,11 +218,7 @@ class NolimitholdemGame(Game):
         Returns:
             (bool): True if the game steps back successfully
         """
-        if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, self.players = self.history.pop()
-            self.stage = Stage(self.round_counter)
-            return True
-        return False
+        return self.history.undo()
 
     def get_num_players(self):
         """
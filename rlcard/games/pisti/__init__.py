@@ -3,4 +3,4 @@ from rlcard.games.pisti.pisti_judger import PistiJudger as Judger
 from rlcard.games.pisti.pisti_player import PistiPlayer as Player
 from rlcard.games.pisti.pisti_round import PistiRound as Round
 from rlcard.games.pisti.pisti_game import PistiGame as Game
-
+from rlcard.games.pisti.pisti_array_game import PistiArrayGame as ArrayGame
@@ -0,0 +1,373 @@
+'''
+    File name: pisti/pisti_array_game.py
+    Author: Yusa Omer Altintop
+    Date created: 18/10/2026
+'''
+
+import numpy as np
+
+from rlcard.games.pisti.pisti_card import PistiCard
+from rlcard.games.pisti.pisti_delta import PistiDelta
+from rlcard.games.pisti.pisti_utils import CARD_RANKS, JACK_RANK, mask2ids, mask2list, mask_points, masks2planes
+
+# Plain list copies of the card tables, indexing them with a card id is cheaper than indexing arrays
+_RANKS = CARD_RANKS.tolist()
+_CARDS = PistiCard.get_deck()
+
+
+class PistiArrayGame:
+    ''' Array-backed Pisti engine with the same interface as PistiGame.
+
+    Cards are handled by their numeric id (0..51). The shuffled deck is a fixed-size
+    int8 array consumed through a position pointer, while hands, seen cards, the
+    stock pile and the initial secret are 52-bit card masks (bit i is the card with
+    id i). Card points and ranks come from the precomputed tables in pisti_utils, so
+    no PistiCard objects are moved around while the game is played.
+    '''
+
+    def __init__(self, allow_step_back=False, num_players=2, num_init_cards=4, deal_per_round=4,
+                 playing_with_human=False):
+
+        self.allow_step_back: bool = allow_step_back
+        self.np_random = np.random.RandomState()
+        self.num_players = num_players
+        self.num_init_cards = num_init_cards
+        self.deal_per_round = deal_per_round
+        self.playing_with_human = playing_with_human
+
+    def configure(self, game_config):
+        ''' Specifiy some game specific parameters, such as number of players
+        '''
+        self.num_players = game_config['game_num_players']
+
+    def init_game(self):
+        ''' Initialize players and state
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (dict): The first state in one game
+                (int): Current player's id
+        '''
+        num_players = self.num_players
+
+        # Shuffle the card ids the same way PistiDealer shuffles the deck
+        self.deck = np.arange(52, dtype=np.int8)
+        self.np_random.shuffle(self.deck)
+        self._deck_ids = self.deck.tolist()
+        self.deck_pos = self.num_init_cards
+        self.deck_exhausted = False
+
+        # Hidden cards under the first top card. Like PistiDealer.secret_initial_deck,
+        # the mask keeps the whole collected pile once the secret is taken.
+        self.secret_mask = 0
+        for card_id in self._deck_ids[:self.num_init_cards - 1]:
+            self.secret_mask |= 1 << card_id
+        self.secret_open = self.num_init_cards > 1
+
+        # The top card and the size are enough to play on the stock pile
+        self.stock_top = self._deck_ids[self.num_init_cards - 1]
+        self.stock_mask = 1 << self.stock_top
+        self.stock_size = 1
+
+        self.hands = [0 for _ in range(num_players)]
+        self.hand_sizes = [0 for _ in range(num_players)]
+        self.seen = [0 for _ in range(num_players)]
+        self.scores = [0 for _ in range(num_players)]
+        self.collected = [0 for _ in range(num_players)]
+
+        self.current_player_id = 0
+        self.last_collector = -1
+        self.finished = False
+
+        # Changes made by the last move
+        self.last_delta = None
+
+        # Deal cards to each player to prepare for the game
+        self._deal()
+
+        # Save the hisory for stepping back to the last state.
+        self.history = []
+
+        current_player_id = self.get_player_id()
+        state = self.get_state_for_player(current_player_id)
+
+        if self.playing_with_human:
+            print(f'The top card of the deck is {PistiCard.card(self.stock_top)}')
+
+        return state, current_player_id
+
+    def step(self, action):
+        ''' Get the next state
+
+        Args:
+            action (PistiCard or int): The card to play or its numeric id
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (dict): next player's state
+                (int): next plater's id
+        '''
+        card_id = action.card_numeric_id if isinstance(action, PistiCard) else int(action)
+        if not self.hands[self.current_player_id] >> card_id & 1:
+            raise ValueError(f'{PistiCard.card(card_id)} is not in the hand of player {self.current_player_id}')
+
+        if self.allow_step_back:
+            self.history.append(self._snapshot())
+
+        self._play(card_id)
+        if self.hand_sizes[self.current_player_id] == 0:
+            self._deal()
+
+        player_id = self.current_player_id
+        state = self.get_state_for_player(player_id)
+        return state, player_id
+
+    def step_back(self):
+        ''' Return to the previous state of the game
+
+        Returns:
+            (bool): True if the game steps back successfully
+        '''
+        if not self.history:
+            return False
+        self._restore(self.history.pop())
+        return True
+
+    def get_last_delta(self):
+        ''' Return the changes made by the last step
+
+        Returns:
+            (PistiDelta): The delta of the last step, None at the start of the game
+        '''
+        return self.last_delta
+
+    def get_num_players(self) -> int:
+        ''' Return the number of players in the game
+        '''
+        return self.num_players
+
+    def get_legal_actions(self):
+        ''' Return the legal actions for current player
+
+        Returns:
+            (list): A list of legal actions
+        '''
+        return [_CARDS[card_id] for card_id in mask2ids(self.hands[self.current_player_id])]
+
+    def get_state_for_player(self, player_id=-1):
+        ''' Get player's state
+
+        Return:
+            state (dict): The information of the state
+        '''
+        if player_id == -1:
+            player_id = self.get_player_id()
+        state = {}
+        state['hand'] = mask2list(self.hands[player_id])
+        state['seen_cards'] = mask2list(self.seen[player_id])
+        state['collected_num'] = self.collected[player_id]
+        state['player_score'] = self.scores[player_id]
+        state['legal_actions'] = self.get_legal_actions()
+        state['scores'] = list(self.scores)
+        state['current_player'] = self.current_player_id
+        state['num_cards'] = list(self.hand_sizes)
+
+        last_card = None
+        if self.stock_size != 0:
+            last_card = _CARDS[self.stock_top]
+        state['last_card_on_deck'] = last_card
+        state['num_players'] = self.get_num_players()
+
+        return state
+
+    def get_state(self, player_id):
+        return self.get_state_for_player(player_id)
+
+    def get_state_arrays(self, with_future=False):
+        ''' Get the card planes and counters that make up the observation
+
+        Args:
+            with_future (bool): True to also include the next hands and the initial secret
+
+        Returns:
+            (dict): 'hands', 'seen' and 'next_hands' are (num_players, 52) int8 arrays, 'stock',
+                    'top' and 'secret' are (52,) int8 arrays, 'scores' and 'collected' hold one
+                    entry per player.
+        '''
+        masks = self.hands + self.seen + [self.stock_mask, 1 << self.stock_top if self.stock_size != 0 else 0]
+        if with_future:
+            start = self.deck_pos
+            for _ in range(self.num_players):
+                next_hand = 0
+                for card_id in self._deck_ids[start:start + self.deal_per_round]:
+                    next_hand |= 1 << card_id
+                masks.append(next_hand)
+                start += self.deal_per_round
+            masks.append(self.secret_mask)
+        planes = masks2planes(masks)
+
+        num_players = self.num_players
+        arrays = {
+            'hands': planes[:num_players],
+            'seen': planes[num_players:2 * num_players],
+            'stock': planes[2 * num_players],
+            'top': planes[2 * num_players + 1],
+            'scores': np.array(self.scores),
+            'collected': np.array(self.collected),
+        }
+        if with_future:
+            arrays['next_hands'] = planes[2 * num_players + 2:3 * num_players + 2]
+            arrays['secret'] = planes[-1]
+        return arrays
+
+    @staticmethod
+    def get_num_actions():
+        ''' Return the number of applicable actions
+
+        Returns:
+            (int): The number of actions. There are 52 actions each for one card
+        '''
+        return 52
+
+    def get_player_id(self):
+        ''' Return the current player's id
+
+        Returns:
+            (int): current player's id
+        '''
+        return self.current_player_id
+
+    def is_over(self):
+        ''' Check if the game is over
+
+        Returns:
+            (boolean): True if the game is over
+        '''
+        return self.finished
+
+    def get_all_states(self):
+        ''' Get player's state
+
+        Return:
+            state (dict): The information of the state
+        '''
+        state = {'num_players': self.get_num_players()}
+        for player_id in range(self.num_players):
+            state[player_id] = self.get_state_for_player(player_id)
+
+        return state
+
+    def get_all_payoffs(self):
+        ''' Return the payoffs of the game
+
+        Returns:
+            (list): Each entry corresponds to the payoff of one player
+        '''
+        scores = list(self.scores)
+        if self.finished:
+            # The player with the most collected cards (the first one on ties) gets 3 points
+            scores[self.collected.index(max(self.collected))] += 3
+        return scores
+
+    def _deal(self):
+        ''' Deal the next cards to every player, or finish the game if the deck is empty
+        '''
+        if self.deck_exhausted:
+            self.finished = True
+            return
+        for player_id in range(self.num_players):
+            if self.deck_pos >= 52:
+                self.deck_exhausted = True
+            else:
+                for card_id in self._deck_ids[self.deck_pos:self.deck_pos + self.deal_per_round]:
+                    self.hands[player_id] |= 1 << card_id
+                    self.hand_sizes[player_id] += 1
+                    self.deck_pos += 1
+        if self.deck_exhausted:
+            self.finished = True
+        elif self.last_delta is not None:
+            # Record the dealt hands and the following deal
+            num_dealt = self.num_players * self.deal_per_round
+            start = self.deck_pos - num_dealt
+            for _ in range(self.num_players):
+                self.last_delta.dealt.append(self._deck_ids[start:start + self.deal_per_round])
+                self.last_delta.next_hands.append(self._deck_ids[start + num_dealt:start + num_dealt + self.deal_per_round])
+                start += self.deal_per_round
+
+    def _play(self, card_id):
+        ''' Play a card of the current player, following PistiRound.proceed_round
+        '''
+        playing_with_human = self.playing_with_human
+        player_id = self.current_player_id
+        if playing_with_human:
+            print(f'Player {player_id} played {PistiCard.card(card_id)}!')
+        self.last_delta = PistiDelta(player_id, card_id)
+
+        card_bit = 1 << card_id
+        self.hands[player_id] ^= card_bit
+        self.hand_sizes[player_id] -= 1
+        for other_id in range(self.num_players):
+            self.seen[other_id] |= card_bit
+
+        previous_top = self.stock_top
+        self.stock_mask |= card_bit
+        self.stock_top = card_id
+        self.stock_size += 1
+
+        if self.stock_size > 1:
+            rank = _RANKS[card_id]
+            if _RANKS[previous_top] == rank or rank == JACK_RANK:
+                if self.secret_open:
+                    # The first collector also takes the secret cards
+                    self.secret_mask |= self.stock_mask
+                    self.seen[player_id] |= self.secret_mask
+                    self.stock_mask = self.secret_mask
+                    self.stock_size = bin(self.secret_mask).count('1')
+                    self.secret_open = False
+                    self.last_delta.secret_taken = True
+                self._collect(player_id, playing_with_human)
+                self.last_collector = player_id
+
+        if self.deck_pos >= 52 and self.hand_sizes[player_id] == 0 and player_id == self.num_players - 1:
+            if self.stock_size != 0:
+                self._collect(self.last_collector % self.num_players, playing_with_human=False)
+                if playing_with_human:
+                    print(f'{self.last_collector} collected all the remaining cards as the last collector!')
+
+        self.current_player_id = (player_id + 1) % self.num_players
+
+    def _collect(self, player_id, playing_with_human=False):
+        ''' Move the stock pile to a player, following PistiPlayer.collect_cards
+        '''
+        last_card = self.stock_top
+        score_before = self.scores[player_id]
+        if self.stock_size == 2:
+            other_card = (self.stock_mask ^ (1 << last_card)).bit_length() - 1
+            if _RANKS[other_card] == _RANKS[last_card]:  # it means pisti
+                if playing_with_human:
+                    print(f'Player {player_id} made pisti by playing {PistiCard.card(last_card)}!')
+                self.scores[player_id] += 20 if _RANKS[last_card] == JACK_RANK else 10
+        if playing_with_human:
+            print(f'Player {player_id} collected all cards by playing {PistiCard.card(last_card)}!')
+        self.scores[player_id] += mask_points(self.stock_mask)
+        self.collected[player_id] += self.stock_size
+        if playing_with_human:
+            print(f'Player {player_id} collected {self.collected[player_id]} cards in total')
+        self.last_delta.collections.append((player_id, mask2ids(self.stock_mask), self.scores[player_id] - score_before))
+
+        self.stock_mask = 0
+        self.stock_size = 0
+
+    def _snapshot(self):
+        return (list(self.hands), list(self.hand_sizes), list(self.seen), list(self.scores), list(self.collected),
+                self.deck_pos, self.deck_exhausted, self.secret_mask, self.secret_open, self.stock_mask,
+                self.stock_top, self.stock_size, self.current_player_id, self.last_collector, self.finished,
+                self.last_delta)
+
+    def _restore(self, snapshot):
+        (self.hands, self.hand_sizes, self.seen, self.scores, self.collected,
+         self.deck_pos, self.deck_exhausted, self.secret_mask, self.secret_open, self.stock_mask,
+         self.stock_top, self.stock_size, self.current_player_id, self.last_collector, self.finished,
+         self.last_delta) = snapshot
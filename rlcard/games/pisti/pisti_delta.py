@@ -0,0 +1,32 @@
+'''
+    File name: pisti/pisti_delta.py
+    Author: Yusa Omer Altintop
+    Date created: 18/10/2026
+'''
+
+from typing import List, Tuple
+
+
+class PistiDelta:
+    ''' The changes one move made to a Pisti game, in numeric card ids.
+
+    Both PistiGame and PistiArrayGame record one delta per step, so that
+    observers can follow the game without rebuilding it from scratch.
+    '''
+
+    __slots__ = ('player_id', 'card_id', 'collections', 'secret_taken', 'dealt', 'next_hands')
+
+    def __init__(self, player_id: int, card_id: int):
+        # The player who played and the card played
+        self.player_id = player_id
+        self.card_id = card_id
+
+        # (collector id, collected card ids, points earned) of every pile collected in the move
+        self.collections: List[Tuple[int, List[int], int]] = []
+
+        # True if the first collection of the move also took the initial secret
+        self.secret_taken = False
+
+        # Card ids dealt to every player after the move, and the ones of the following deal
+        self.dealt: List[List[int]] = []
+        self.next_hands: List[List[int]] = []
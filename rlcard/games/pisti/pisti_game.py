@@ -4,7 +4,6 @@
     Date created: 25/7/2023
 '''
 
-from copy import deepcopy
 import numpy as np
 
 from rlcard.games.pisti.pisti_round import PistiRound
@@ -82,11 +81,8 @@ class PistiGame:
         '''
 
         if self.allow_step_back:
-            # First snapshot the current state
-            his_dealer = deepcopy(self.dealer)
-            his_round = deepcopy(self.round)
-            his_players = deepcopy(self.players)
-            self.history.append((his_dealer, his_players, his_round))
+            # Record what is needed to undo the move, instead of copying the whole game
+            self.history.append(self._snapshot(action))
 
         self.round.proceed_round(self.players, action, playing_with_human=self.playing_with_human)
         player_id = self.round.current_player_id
@@ -101,9 +97,66 @@ class PistiGame:
         '''
         if not self.history:
             return False
-        self.dealer, self.players, self.round = self.history.pop()
+        self._restore(self.history.pop())
         return True
 
+    def get_last_delta(self):
+        ''' Return the changes made by the last step
+
+        Returns:
+            (PistiDelta): The delta of the last step, None at the start of the game
+        '''
+        return self.round.last_delta
+
+    def _snapshot(self, action):
+        ''' Record the undo entry of a move, before it is played
+
+        The piles only grow at their ends until the next step, except for the played
+        card and the stock pile that may be replaced by an empty one. So their lengths
+        and a few references are enough to restore them, including the cards dealt
+        lazily after the move by get_legal_actions.
+        '''
+        dealer, pisti_round = self.dealer, self.round
+        players = self.players
+        current_player_id = pisti_round.current_player_id
+        hand = players[current_player_id].hand
+        hand_index = hand.index(action)
+        return (current_player_id, hand_index, hand[hand_index], pisti_round.last_collector, pisti_round.is_over,
+                pisti_round.last_delta, dealer.is_over, dealer.current_stock_pile, len(dealer.current_stock_pile),
+                pisti_round.initial_secret, len(pisti_round.initial_secret), len(dealer.remaining_deck),
+                [(len(player.hand), len(player.seen_cards), player.score, player.collected_num)
+                 for player in players])
+
+    def _restore(self, snapshot):
+        ''' Undo a move with its entry recorded by _snapshot
+        '''
+        (current_player_id, hand_index, played_card, last_collector, round_is_over, last_delta,
+         dealer_is_over, stock, stock_size, initial_secret, secret_size, remaining_size, player_infos) = snapshot
+        dealer, pisti_round = self.dealer, self.round
+
+        for player, (hand_size, seen_size, score, collected_num) in zip(self.players, player_infos):
+            if player.player_id == current_player_id:
+                hand_size -= 1
+            del player.hand[hand_size:]
+            del player.seen_cards[seen_size:]
+            player.score = score
+            player.collected_num = collected_num
+        self.players[current_player_id].hand.insert(hand_index, played_card)
+
+        # The remaining deck is always a suffix of the shuffled deck
+        if len(dealer.remaining_deck) != remaining_size:
+            dealer.remaining_deck = dealer.original_shuffled_deck[len(dealer.original_shuffled_deck) - remaining_size:]
+        del stock[stock_size:]
+        dealer.current_stock_pile = stock
+        del initial_secret[secret_size:]
+        pisti_round.initial_secret = initial_secret
+        dealer.is_over = dealer_is_over
+
+        pisti_round.current_player_id = current_player_id
+        pisti_round.last_collector = last_collector
+        pisti_round.is_over = round_is_over
+        pisti_round.last_delta = last_delta
+
     def get_num_players(self) -> int:
         ''' Return the number of players in the game
         '''
@@ -134,6 +187,57 @@ class PistiGame:
     def get_state(self, player_id):
         return self.get_state_for_player(player_id)
 
+    def get_state_arrays(self, with_future=False):
+        ''' Get the card planes and counters that make up the observation
+
+        Args:
+            with_future (bool): True to also include the next hands and the initial secret
+
+        Returns:
+            (dict): 'hands', 'seen' and 'next_hands' are (num_players, 52) int8 arrays, 'stock',
+                    'top' and 'secret' are (52,) int8 arrays, 'scores' and 'collected' hold one
+                    entry per player.
+        '''
+        hands = np.zeros((self.num_players, 52), dtype=np.int8)
+        seen = np.zeros((self.num_players, 52), dtype=np.int8)
+        for player in self.players:
+            for card in player.hand:
+                hands[player.player_id][card.card_numeric_id] = 1
+            for card in player.seen_cards:
+                seen[player.player_id][card.card_numeric_id] = 1
+
+        stock = np.zeros(52, dtype=np.int8)
+        top = np.zeros(52, dtype=np.int8)
+        current_stock = self.dealer.current_stock_pile
+        for card in current_stock:
+            stock[card.card_numeric_id] = 1
+        if len(current_stock) != 0:
+            top[current_stock[-1].card_numeric_id] = 1
+
+        arrays = {
+            'hands': hands,
+            'seen': seen,
+            'stock': stock,
+            'top': top,
+            'scores': np.array(PistiJudger.judge_current_score(self.players)),
+            'collected': np.array([player.get_collected_num() for player in self.players]),
+        }
+        if with_future:
+            next_hands = np.zeros((self.num_players, 52), dtype=np.int8)
+            rem_deck = self.dealer.remaining_deck
+            for player in self.players:
+                for card in rem_deck[:self.deal_per_round]:
+                    next_hands[player.player_id][card.card_numeric_id] = 1
+                rem_deck = rem_deck[self.deal_per_round:]
+
+            secret = np.zeros(52, dtype=np.int8)
+            for card in self.dealer.secret_initial_deck:
+                secret[card.card_numeric_id] = 1
+
+            arrays['next_hands'] = next_hands
+            arrays['secret'] = secret
+        return arrays
+
     @staticmethod
     def get_num_actions():
         ''' Return the number of applicable actions
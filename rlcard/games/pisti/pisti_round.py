@@ -10,6 +10,7 @@ from rlcard.games.pisti.pisti_dealer import PistiDealer
 from rlcard.games.pisti.pisti_utils import cards2list
 from rlcard.games.pisti.pisti_judger import PistiJudger
 from rlcard.games.pisti.pisti_card import PistiCard
+from rlcard.games.pisti.pisti_delta import PistiDelta
 
 
 class PistiRound:
@@ -38,19 +39,31 @@ class PistiRound:
 
         self.last_collector = -1
 
+        # Changes made by the last move
+        self.last_delta = None
+
     def proceed_round(self, players: List[PistiPlayer], action: PistiCard, playing_with_human=False):
         initial_secret = self.initial_secret
         cards_on_stock = self.dealer.current_stock_pile
 
-
+        delta = PistiDelta(self.current_player_id, action.card_numeric_id)
+        self.last_delta = delta
 
         curr_player = players[self.current_player_id]
+        score_before = curr_player.get_score()
         curr_stock = curr_player.play_card(cards_on_stock=cards_on_stock, to_be_played=action,
                                            initial_secret=initial_secret, playing_with_human=playing_with_human)
 
         for player in players:
             player.update_seen_cards(action)
 
+        if len(curr_stock) == 0:
+            # The collected pile is the stock with the played card, extended into the secret on the first collection
+            delta.secret_taken = len(initial_secret) != 0
+            pile = initial_secret if delta.secret_taken else cards_on_stock
+            delta.collections.append((self.current_player_id, [card.card_numeric_id for card in pile],
+                                      curr_player.get_score() - score_before))
+
         if len(curr_stock) == 0 and len(initial_secret) != 0:
             for secret_card in initial_secret:
                 curr_player.update_seen_cards(secret_card)
@@ -63,7 +76,12 @@ class PistiRound:
             if len(curr_player.hand) == 0:
                 if self.current_player_id == (self.num_players - 1):
                     if len(curr_stock) != 0:
-                        players[self.last_collector].collect_cards(curr_stock, playing_with_human=False)
+                        last_collector = players[self.last_collector]
+                        score_before = last_collector.get_score()
+                        last_collector.collect_cards(curr_stock, playing_with_human=False)
+                        delta.collections.append((last_collector.get_player_id(),
+                                                  [card.card_numeric_id for card in curr_stock],
+                                                  last_collector.get_score() - score_before))
                         if playing_with_human:
                             print(f'{self.last_collector} collected all the remaining cards as the last collector!')
 
@@ -80,12 +98,25 @@ class PistiRound:
                 for player in players:
                     self.dealer.deal_cards(player, num=self.deal_per_round)
                 curr_hand = players[self.current_player_id].hand
+                if self.last_delta is not None and not self.dealer.is_over:
+                    self._record_deal(players)
             else:
                 self.is_over = self.dealer.is_over
         legal_actions = curr_hand
 
         return legal_actions
 
+    def _record_deal(self, players):
+        ''' Record the dealt hands and the following deal in the delta of the last move
+        '''
+        self.last_delta.dealt = [[card.card_numeric_id for card in player.hand] for player in players]
+        rem_deck = self.dealer.remaining_deck
+        next_hands = []
+        for _ in players:
+            next_hands.append([card.card_numeric_id for card in rem_deck[:self.deal_per_round]])
+            rem_deck = rem_deck[self.deal_per_round:]
+        self.last_delta.next_hands = next_hands
+
     def get_state_for_current_player(self, players, player_id=-1):
         state = {}
         if player_id == -1:
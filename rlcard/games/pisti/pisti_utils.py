@@ -1,3 +1,24 @@
+import numpy as np
+
+from rlcard.games.pisti.pisti_card import PistiCard
+
+# Precomputed per-card tables indexed by PistiCard.card_numeric_id (0..51)
+CARD_POINTS = np.array([card.get_point() for card in PistiCard.get_deck()], dtype=np.int64)
+CARD_RANKS = np.array([PistiCard.ranks.index(card.rank) for card in PistiCard.get_deck()], dtype=np.int8)
+CARD_STRS = [card.card_str_id for card in PistiCard.get_deck()]
+JACK_RANK = PistiCard.ranks.index('J')
+
+# Card sets as 52-bit masks, bit i standing for the card with numeric id i
+POINT_MASKS = {int(point): sum(1 << int(card_id) for card_id in np.flatnonzero(CARD_POINTS == point))
+               for point in np.unique(CARD_POINTS) if point != 0}
+
+# Card ids and card strings of every byte value at every byte position of a card mask,
+# used by mask2ids and mask2list
+_BYTE_IDS = [[tuple(8 * chunk + bit for bit in range(8) if byte >> bit & 1 and 8 * chunk + bit < 52)
+              for byte in range(256)] for chunk in range(7)]
+_BYTE_STRS = [[tuple(CARD_STRS[card_id] for card_id in card_ids) for card_ids in chunk_ids] for chunk_ids in _BYTE_IDS]
+
+
 def cards2list(cards):
     ''' Get the corresponding string representation of cards
 
@@ -13,6 +34,64 @@ def cards2list(cards):
     return cards_list
 
 
+def mask2ids(mask):
+    ''' Get the numeric ids of the cards in a card mask
+
+    Args:
+        mask (int): 52-bit card mask
+
+    Returns:
+        (list): numeric ids of the cards in increasing order
+    '''
+    card_ids = []
+    for chunk, byte in enumerate(mask.to_bytes(7, 'little')):
+        if byte:
+            card_ids += _BYTE_IDS[chunk][byte]
+    return card_ids
+
+
+def mask2list(mask):
+    ''' Get the corresponding string representation of the cards in a card mask
+
+    Args:
+        mask (int): 52-bit card mask
+
+    Returns:
+        (list): string representation of cards in increasing id order
+    '''
+    cards_list = []
+    for chunk, byte in enumerate(mask.to_bytes(7, 'little')):
+        if byte:
+            cards_list += _BYTE_STRS[chunk][byte]
+    return cards_list
+
+
+def mask_points(mask):
+    ''' Get the total points of the cards in a card mask
+
+    Args:
+        mask (int): 52-bit card mask
+
+    Returns:
+        (int): sum of the card points
+    '''
+    return sum(point * bin(mask & point_mask).count('1') for point, point_mask in POINT_MASKS.items())
+
+
+def masks2planes(masks):
+    ''' Get the one-hot card planes of a list of card masks
+
+    Args:
+        masks (list): 52-bit card masks
+
+    Returns:
+        (numpy.array): (len(masks), 52) int8 array with a 1 for every card in the masks
+    '''
+    data = b''.join(mask.to_bytes(8, 'little') for mask in masks)
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8).reshape(len(masks), 8), axis=1, bitorder='little')
+    return bits[:, :52].view(np.int8)
+
+
 def elegant_form(card):
     ''' Get a elegant form of a card string
 
@@ -1,9 +1,9 @@
-from copy import deepcopy
 import numpy as np
 
 from rlcard.games.uno import Dealer
 from rlcard.games.uno import Player
 from rlcard.games.uno import Round
+from rlcard.games.base import UndoLog
 
 
 class UnoGame:
@@ -34,6 +34,9 @@ class UnoGame:
         # Initialize a dealer that can deal cards
         self.dealer = Dealer(self.np_random)
 
+        # The colors of wild cards change when they are played or drawn
+        self.wild_cards = [card for card in self.dealer.deck if card.type == 'wild']
+
         # Initialize four players to play the game
         self.players = [Player(i, self.np_random) for i in range(self.num_players)]
 
@@ -49,7 +52,7 @@ class UnoGame:
         self.round.perform_top_card(self.players, top_card)
 
         # Save the hisory for stepping back to the last state.
-        self.history = []
+        self.history = UndoLog()
 
         player_id = self.round.current_player
         state = self.get_state(player_id)
@@ -69,11 +72,20 @@ class UnoGame:
         '''
 
         if self.allow_step_back:
-            # First snapshot the current state
-            his_dealer = deepcopy(self.dealer)
-            his_round = deepcopy(self.round)
-            his_players = deepcopy(self.players)
-            self.history.append((his_dealer, his_players, his_round))
+            # First record what the action may change
+            history = self.history
+            history.begin()
+            history.save_attrs(self.round, 'current_player', 'direction', 'target', 'played_cards',
+                               'is_over', 'winner')
+            history.save_list(self.round.played_cards)
+            history.save_list(self.dealer.deck)
+            for player in self.players:
+                history.save_list(player.hand)
+            history.record(self._restore_wild_colors, [card.color for card in self.wild_cards])
+            # Drawing picks wild colors with the round's generator and may shuffle
+            # the deck with the dealer's, the same step must give the same cards again
+            history.record(self.round.np_random.set_state, self.round.np_random.get_state())
+            history.record(self.dealer.np_random.set_state, self.dealer.np_random.get_state())
 
         self.round.proceed_round(self.players, action)
         player_id = self.round.current_player
@@ -86,10 +98,11 @@ class UnoGame:
         Returns:
             (bool): True if the game steps back successfully
         '''
-        if not self.history:
-            return False
-        self.dealer, self.players, self.round = self.history.pop()
-        return True
+        return self.history.undo()
+
+    def _restore_wild_colors(self, colors):
+        for card, color in zip(self.wild_cards, colors):
+            card.color = color
 
     def get_state(self, player_id):
         ''' Return player's state
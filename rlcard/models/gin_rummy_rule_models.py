@@ -94,17 +94,11 @@ class GinRummyNoviceRuleAgent(object):
         best_discards = []  # type: List[Card]
         final_deadwood_count = 999
         env_hand = state['obs'][0]
-        hand = utils.decode_cards(env_cards=env_hand)
+        hand_mask = melding.get_hand_mask(utils.decode_cards(env_cards=env_hand))
         for discard_action_event in discard_action_events:
             discard_card = discard_action_event.card
-            next_hand = [card for card in hand if card != discard_card]
-            meld_clusters = melding.get_meld_clusters(hand=next_hand)
-            deadwood_counts = []
-            for meld_cluster in meld_clusters:
-                deadwood_count = utils.get_deadwood_count(hand=next_hand, meld_cluster=meld_cluster)
-                deadwood_counts.append(deadwood_count)
-            best_deadwood_count = min(deadwood_counts,
-                                      default=utils.get_deadwood_count(hand=next_hand, meld_cluster=[]))
+            next_hand_mask = hand_mask & ~(1 << utils.get_card_id(discard_card))
+            best_deadwood_count = melding.get_min_deadwood_count(next_hand_mask)
             if best_deadwood_count < final_deadwood_count:
                 final_deadwood_count = best_deadwood_count
                 best_discards = [discard_card]
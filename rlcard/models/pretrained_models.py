@@ -3,7 +3,7 @@
 import os
 
 import rlcard
-from rlcard.agents import CFRAgent
+from rlcard.agents import CFRPolicyAgent
 from rlcard.models.model import Model
 
 # Root path of pretrianed models
@@ -15,9 +15,7 @@ class LeducHoldemCFRModel(Model):
     def __init__(self):
         ''' Load pretrained model
         '''
-        env = rlcard.make('leduc-holdem')
-        self.agent = CFRAgent(env, model_path=os.path.join(ROOT_PATH, 'leduc_holdem_cfr'))
-        self.agent.load()
+        self.agent = CFRPolicyAgent(os.path.join(ROOT_PATH, 'leduc_holdem_cfr'))
     @property
     def agents(self):
         ''' Get a list of agents for each position in a the game
@@ -2,3 +2,5 @@ from rlcard.utils.logger import Logger
 from rlcard.utils import seeding
 from rlcard.utils.utils import *
 from rlcard.utils.pettingzoo_utils import *
+from rlcard.utils.evaluation import *
+from rlcard.utils.league import *
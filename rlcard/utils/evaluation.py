@@ -0,0 +1,337 @@
+import os
+import math
+import inspect
+import multiprocessing
+import random
+from collections import namedtuple
+
+import numpy as np
+
+TournamentResult = namedtuple('TournamentResult', ['mean', 'stderr', 'lower', 'upper', 'payoffs'])
+DuplicateResult = namedtuple('DuplicateResult', ['scores', 'differences'])
+
+# The environment of a worker process, set by _init_tournament_worker
+_tournament_env = None
+
+def _init_tournament_worker(env):
+    global _tournament_env
+    _tournament_env = env
+
+def _play_tournament_games(seeds):
+    return play_games(_tournament_env, seeds)
+
+def load_model(model_path, env=None, position=None, device=None):
+    ''' Load an agent
+
+    Args:
+        model_path (str): A torch model or checkpoint file, a CFR model directory,
+          'random', or the id of a model in the model zoo
+        env (Env class): The environment of the agent
+        position (int): The position of the agent, for the models of the model zoo
+        device (torch.device): The device of a torch model
+
+    Returns:
+        (object): The agent
+    '''
+    if os.path.isfile(model_path):  # Torch model
+        import torch
+        agent = torch.load(model_path, map_location=device, weights_only=False)
+        if isinstance(agent, dict) and 'agent_type' in agent:  # Checkpoint attributes
+            from rlcard import agents
+            agent = getattr(agents, agent['agent_type']).from_checkpoint(agent)
+        agent.set_device(device)
+    elif os.path.isdir(model_path):  # CFR model
+        from rlcard.agents import CFRAgent, CFRPolicyAgent
+        from rlcard.agents.cfr_policy_agent import KEYS_FILE
+        if os.path.exists(os.path.join(model_path, KEYS_FILE)):
+            agent = CFRPolicyAgent(model_path)
+        else:
+            agent = CFRAgent(env, model_path)
+            agent.load()
+    elif model_path == 'random':  # Random model
+        from rlcard.agents import RandomAgent
+        agent = RandomAgent(num_actions=env.num_actions)
+    else:  # A model in the model zoo
+        from rlcard import models
+        agent = models.load(model_path).agents[position]
+
+    return agent
+
+def play_games(env, seeds):
+    ''' Play a game for every seed, with the environment and the global random
+    generators seeded with it, so a game only depends on its seed
+
+    Args:
+        env (Env class): The environment with its agents set
+        seeds (list): The seeds of the games
+
+    Returns:
+        (numpy.array): (len(seeds), num_players) payoffs of the games
+    '''
+    # The generators are restored afterwards, the caller may be training with them
+    env_random = env.np_random
+    np_state, random_state = np.random.get_state(), random.getstate()
+
+    payoffs = np.zeros((len(seeds), env.num_players))
+    for i, seed in enumerate(seeds):
+        env.seed(int(seed))
+        np.random.seed(int(seed))
+        random.seed(int(seed))
+        _, payoffs[i] = env.run(is_training=False)
+
+    env.np_random = env.game.np_random = env_random
+    np.random.set_state(np_state)
+    random.setstate(random_state)
+    return payoffs
+
+def _normal_quantile(p):
+    ''' The inverse of the standard normal CDF, by bisection on math.erf
+    '''
+    low, high = -40.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if 0.5 * (1 + math.erf(middle / math.sqrt(2))) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+def summarize_payoffs(payoffs, confidence=0.95):
+    ''' Compute the mean payoffs of the players with their standard errors and
+    normal confidence intervals
+
+    Args:
+        payoffs (numpy.array): (num_games, num_players) payoffs
+        confidence (float): The confidence level of the intervals
+
+    Returns:
+        (TournamentResult): The means, standard errors, lower and upper bounds of
+          the intervals, and the payoffs
+    '''
+    payoffs = np.asarray(payoffs, dtype=np.float64)
+    mean = payoffs.mean(axis=0)
+    if len(payoffs) > 1:
+        stderr = payoffs.std(axis=0, ddof=1) / np.sqrt(len(payoffs))
+    else:
+        stderr = np.full(payoffs.shape[1], np.inf)
+    z = _normal_quantile((1 + confidence) / 2)
+    return TournamentResult(mean, stderr, mean - z * stderr, mean + z * stderr, payoffs)
+
+def parallel_tournament(env, num, num_workers=None, seed=None, confidence=0.95):
+    ''' Evaluate the performance of the agents in the environment with a process pool
+
+    The seeds of the games are drawn from seed and the games are split in
+    contiguous shards over the workers. Every worker gets a copy of the
+    environment and its agents as they are when the function is called, and
+    plays each of its games with the generators seeded with the game's seed.
+    The result only depends on seed, not on the number of workers.
+
+    Args:
+        env (Env class): The environment to be evaluated, with its agents set
+        num (int): The number of games to play
+        num_workers (int): The number of processes, the number of CPUs if None
+        seed (int): The seed of the game seeds
+        confidence (float): The confidence level of the intervals
+
+    Returns:
+        (TournamentResult): The mean payoffs of the players with their standard errors
+          and confidence intervals, and the payoffs of every game
+    '''
+    seeds = np.random.RandomState(seed).randint(np.iinfo(np.int32).max, size=num)
+    num_workers = min(num_workers or multiprocessing.cpu_count(), num)
+
+    if num_workers > 1:
+        shards = [shard for shard in np.array_split(seeds, num_workers * 4) if len(shard)]
+        with multiprocessing.Pool(num_workers, initializer=_init_tournament_worker, initargs=(env,)) as pool:
+            payoffs = np.concatenate(pool.map(_play_tournament_games, shards))
+    else:
+        payoffs = play_games(env, seeds)
+
+    return summarize_payoffs(payoffs, confidence)
+
+def duplicate_tournament(env, num, seed=None, target_width=None, batch_size=100, confidence=0.95):
+    ''' Evaluate the agents with duplicate deals
+
+    Every deal is played once per rotation of the agents over the seats
+    (for two players, once and again with the seats swapped), from the
+    same seed so the cards are the same. A deal scores every agent with
+    its mean payoff over the rotations. The comparison of the agents is the
+    paired difference of every deal: the score of an agent minus the mean
+    score of the others (A - B for two players). The luck of the deal, which
+    the scores still carry when the game is not zero-sum, cancels out in
+    it. The deals are played in batches of batch_size, and the evaluation
+    stops early once the confidence intervals of the differences of all the
+    agents are narrower than target_width.
+
+    Args:
+        env (Env class): The environment to be evaluated, with its agents set
+        num (int): The maximum number of deals
+        seed (int): The seed of the deal seeds
+        target_width (float): The width of the intervals of the differences to stop
+          at, all the deals are played if None
+        batch_size (int): The number of deals between two checks of the intervals
+        confidence (float): The confidence level of the intervals
+
+    Returns:
+        (DuplicateResult): Tuple containing, in the order of the agents of env:
+
+            (TournamentResult): The mean scores of the agents with their standard
+              errors and confidence intervals, and the scores of every deal
+            (TournamentResult): The mean differences of the agents with their
+              standard errors and confidence intervals, and the differences of every deal
+    '''
+    if num <= 0:
+        raise ValueError('duplicate_tournament needs at least one deal, num={}'.format(num))
+    agents = list(env.agents)
+    num_players = env.num_players
+    seeds = np.random.RandomState(seed).randint(np.iinfo(np.int32).max, size=num)
+
+    scores = []
+    try:
+        for start in range(0, num, batch_size):
+            batch_seeds = seeds[start:start + batch_size]
+            batch_scores = np.zeros((len(batch_seeds), num_players))
+            for rotation in range(num_players):
+                # The agent at position i sits at seat (i + rotation) % num_players
+                seats = [(i + rotation) % num_players for i in range(num_players)]
+                env.set_agents([agents[(seat - rotation) % num_players] for seat in range(num_players)])
+                batch_scores += play_games(env, batch_seeds)[:, seats]
+            scores.append(batch_scores / num_players)
+
+            deal_scores = np.concatenate(scores)
+            others = (deal_scores.sum(axis=1, keepdims=True) - deal_scores) / max(num_players - 1, 1)
+            differences = summarize_payoffs(deal_scores - others, confidence)
+            if target_width is not None and np.all(differences.upper - differences.lower < target_width):
+                break
+    finally:
+        env.set_agents(agents)
+
+    return DuplicateResult(summarize_payoffs(deal_scores, confidence), differences)
+
+# The environment and agents of the evaluation process, set by _init_evaluation_worker
+_evaluation_env = None
+_evaluation_agents = None
+
+def _init_evaluation_worker(env, agents):
+    global _evaluation_env, _evaluation_agents
+    # Leave the other cores to the learner
+    import torch
+    torch.set_num_threads(1)
+    _evaluation_env = env
+    _evaluation_agents = agents
+
+def _evaluate_snapshot(agent_class, checkpoint, position, seeds):
+    agents = list(_evaluation_agents)
+    agents[position] = agent_class.from_checkpoint(checkpoint)
+    _evaluation_env.set_agents(agents)
+    return summarize_payoffs(play_games(_evaluation_env, seeds))
+
+def _to_cpu(obj):
+    # Tensors and devices of a checkpoint, moved to the CPU
+    import torch
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().cpu()
+    if isinstance(obj, torch.device):
+        return torch.device('cpu')
+    if isinstance(obj, dict):
+        moved = type(obj)((key, _to_cpu(value)) for key, value in obj.items())
+        if hasattr(obj, '_metadata'):  # Versions of the modules of a state_dict
+            moved._metadata = obj._metadata
+        return moved
+    if isinstance(obj, (list, tuple)) and not hasattr(obj, '_fields'):
+        return type(obj)(_to_cpu(value) for value in obj)
+    return obj
+
+def _evaluation_snapshot(agent):
+    # eval_step does not use the replay and reservoir buffers, so they are left
+    # out of the snapshot of the agents that can do it
+    if 'with_buffers' in inspect.signature(agent.checkpoint_attributes).parameters:
+        checkpoint = agent.checkpoint_attributes(with_buffers=False)
+    else:
+        checkpoint = agent.checkpoint_attributes()
+    # The evaluation process runs on the CPU, whatever the device of the learner
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        return checkpoint
+    return _to_cpu(checkpoint)
+
+class AsyncEvaluator(object):
+    ''' Evaluate snapshots of a training agent in a background process
+
+    An evaluation takes the checkpoint_attributes of the agent, without its
+    replay and reservoir buffers if it supports with_buffers, with its
+    tensors moved to the CPU and its devices set to the CPU, restores it
+    with from_checkpoint in the evaluation process and plays num_games games
+    against the other agents there, while the training goes on. The
+    evaluation process never touches the GPU of a learner trained with CUDA,
+    which it could not use after the fork anyway. The mean
+    payoffs of the agent are written to the logger in the order of the
+    episodes when they are collected by poll, submit or close. At most
+    max_outstanding evaluations are pending, submit waits for the oldest one
+    beyond that.
+    '''
+
+    def __init__(self, env, agents, logger, num_games, position=0, max_outstanding=2, seed=None):
+        ''' Start the evaluation process
+
+        Args:
+            env (Env class): The environment of the evaluation
+            agents (list): The agents of the evaluation, the agent at position is
+              replaced by the snapshots
+            logger (Logger): The logger the results are written to
+            num_games (int): The number of games of an evaluation
+            position (int): The position of the evaluated agent
+            max_outstanding (int): The maximum number of pending evaluations
+            seed (int): The seed of the game seeds of the evaluations
+        '''
+        self.logger = logger
+        self.num_games = num_games
+        self.position = position
+        self.max_outstanding = max_outstanding
+        self.np_random = np.random.RandomState(seed)
+
+        # (episode, result) of the collected evaluations
+        self.results = []
+        self._pending = []
+        agents = list(agents)
+        agents[position] = None
+        self._pool = multiprocessing.Pool(1, initializer=_init_evaluation_worker, initargs=(env, agents))
+
+    def submit(self, episode, agent):
+        ''' Start the evaluation of a snapshot of the agent
+
+        Args:
+            episode (int): The episode the result is logged with
+            agent (object): The agent, with checkpoint_attributes and from_checkpoint
+        '''
+        self.poll()
+        while len(self._pending) >= self.max_outstanding:
+            self._collect()
+        seeds = self.np_random.randint(np.iinfo(np.int32).max, size=self.num_games)
+        result = self._pool.apply_async(_evaluate_snapshot,
+                                        (type(agent), _evaluation_snapshot(agent), self.position, seeds))
+        self._pending.append((episode, result))
+
+    def poll(self):
+        ''' Log the finished evaluations, up to the first pending one
+        '''
+        while self._pending and self._pending[0][1].ready():
+            self._collect()
+
+    def close(self):
+        ''' Wait for the pending evaluations, log them and stop the evaluation process
+        '''
+        if self._pool is None:
+            return
+        while self._pending:
+            self._collect()
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    def _collect(self):
+        episode, result = self._pending.pop(0)
+        result = result.get()
+        self.results.append((episode, result))
+        self.logger.log_performance(episode, result.mean[self.position])
@@ -0,0 +1,220 @@
+import os
+import json
+import multiprocessing
+
+import numpy as np
+
+from rlcard.utils.evaluation import load_model, play_games
+
+# The environment and loaded agents of a worker process, set by _init_league_worker
+_league_env = None
+_league_agents = {}
+
+def _init_league_worker(env_id, config):
+    global _league_env, _league_agents
+    import rlcard
+    _league_env = rlcard.make(env_id, config=config)
+    _league_agents = {}
+
+def _league_agent(model_path, position):
+    # Models of the model zoo depend on the position, the others are loaded once
+    key = (model_path, position if not os.path.exists(model_path) else None)
+    if key not in _league_agents:
+        import torch
+        _league_agents[key] = load_model(model_path, _league_env, position, torch.device('cpu'))
+    return _league_agents[key]
+
+def _play_league_match(task):
+    first, second, seeds = task
+    env = _league_env
+    # Every deal is played with both seatings
+    env.set_agents([_league_agent(first, 0), _league_agent(second, 1)])
+    first_payoffs = play_games(env, seeds)
+    env.set_agents([_league_agent(second, 0), _league_agent(first, 1)])
+    second_payoffs = play_games(env, seeds)[:, ::-1]
+    return first, second, np.concatenate([first_payoffs, second_payoffs])
+
+def _flip_pairing(pairing):
+    # The same pairing seen from the other model
+    return {'models': pairing['models'][::-1],
+            'payoffs': pairing['payoffs'][::-1],
+            'score': pairing['num_games'] - pairing['score'],
+            'num_games': pairing['num_games']}
+
+def model_key(model_path):
+    ''' Identify a model in the cache of a league, with the time it was last
+    modified so a retrained model is played again
+
+    A model directory is saved again by overwriting its files, which does not
+    change the time of the directory itself, so it takes the newest time of
+    the files inside.
+
+    Args:
+        model_path (str): The model, as taken by load_model
+
+    Returns:
+        (str): The key of the model
+    '''
+    if os.path.isdir(model_path):
+        mtime = os.path.getmtime(model_path)
+        for root, _, names in os.walk(model_path):
+            for name in names:
+                mtime = max(mtime, os.path.getmtime(os.path.join(root, name)))
+        return '{}@{}'.format(os.path.abspath(model_path), mtime)
+    if os.path.exists(model_path):
+        return '{}@{}'.format(os.path.abspath(model_path), os.path.getmtime(model_path))
+    return model_path
+
+def find_models(models_dir):
+    ''' List the models of a directory: torch files and CFR model directories
+
+    Args:
+        models_dir (str): The directory
+
+    Returns:
+        (list): The paths of the models, sorted
+    '''
+    models = []
+    for name in sorted(os.listdir(models_dir)):
+        path = os.path.join(models_dir, name)
+        if os.path.isdir(path) or name.endswith(('.pth', '.pt')):
+            models.append(path)
+    return models
+
+def elo_ratings(scores, games, num_iterations=1000):
+    ''' Fit Elo ratings to the scores of pairwise matches with the Bradley-Terry model
+
+    Every pairing that was played gets one extra draw, so that the ratings of
+    models that never won or never lost stay finite.
+
+    Args:
+        scores (numpy.array): (n, n) scores, the number of wins plus half the draws
+          of a model against another one
+        games (numpy.array): (n, n) numbers of games between the models
+
+    Returns:
+        (numpy.array): The ratings, with a mean of 1500
+    '''
+    scores = np.asarray(scores, dtype=np.float64) + 0.5 * (games > 0)
+    games = np.asarray(games, dtype=np.float64) + (games > 0)
+    wins = scores.sum(axis=1)
+    strengths = np.ones(len(scores))
+    for _ in range(num_iterations):
+        # Minorization-maximization update of the strengths
+        denominators = (games / (strengths[:, np.newaxis] + strengths[np.newaxis, :])).sum(axis=1)
+        strengths = np.where(denominators > 0, wins / np.where(denominators > 0, denominators, 1), strengths)
+        strengths /= np.exp(np.log(strengths).mean())
+    ratings = 400 * np.log10(strengths)
+    return ratings - ratings.mean() + 1500
+
+class League(object):
+    ''' Evaluate models against each other in a round robin
+
+    Every pair of models plays num_games deals twice, once in each seating,
+    on a process pool. The results of the pairings are cached in a JSON file,
+    so adding a model to the league only plays its pairings. Only two-player
+    games are supported.
+    '''
+
+    def __init__(self, env_id, models, num_games, cache_path=None, num_workers=1, seed=0, config=None):
+        ''' Set up the league
+
+        Args:
+            env_id (str): The environment of the games
+            models (list): The models, as taken by load_model
+            num_games (int): The number of deals of every pairing
+            cache_path (str): The JSON file of the cached pairings, no cache if None
+            num_workers (int): The number of processes playing the pairings
+            seed (int): The seed of the deals, the same for all the pairings
+            config (dict): The configuration of the environment
+        '''
+        self.env_id = env_id
+        self.models = list(models)
+        self.num_games = num_games
+        self.cache_path = cache_path
+        self.num_workers = num_workers
+        self.seed = seed
+        self.config = dict(config or {})
+        self.config.setdefault('seed', seed)
+
+        # Pairings from (key, key) to the sums of the payoffs, the score of the first model and
+        # the number of games. The keys are sorted, so the order of the models does not matter
+        self.pairings = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                cache = json.load(f)
+            if cache['settings'] == self._settings():
+                for pairing in cache['pairings']:
+                    if pairing['models'][0] > pairing['models'][1]:
+                        pairing = _flip_pairing(pairing)
+                    self.pairings[tuple(pairing['models'])] = pairing
+
+    def run(self):
+        ''' Play the pairings that are not in the cache
+        '''
+        keys = [model_key(model) for model in self.models]
+        tasks = []
+        seeds = np.random.RandomState(self.seed).randint(np.iinfo(np.int32).max, size=self.num_games)
+        for i in range(len(self.models)):
+            for j in range(i + 1, len(self.models)):
+                if tuple(sorted((keys[i], keys[j]))) not in self.pairings:
+                    tasks.append((self.models[i], self.models[j], seeds))
+        if not tasks:
+            return
+
+        paths_to_keys = dict(zip(self.models, keys))
+        with multiprocessing.Pool(min(self.num_workers, len(tasks)), initializer=_init_league_worker,
+                                  initargs=(self.env_id, self.config)) as pool:
+            for first, second, payoffs in pool.imap_unordered(_play_league_match, tasks):
+                if payoffs.shape[1] != 2:
+                    raise ValueError('League only supports two-player games')
+                pairing = {'models': [paths_to_keys[first], paths_to_keys[second]],
+                           'payoffs': payoffs.sum(axis=0).tolist(),
+                           'score': float((payoffs[:, 0] > payoffs[:, 1]).sum() + 0.5 * (payoffs[:, 0] == payoffs[:, 1]).sum()),
+                           'num_games': len(payoffs)}
+                if pairing['models'][0] > pairing['models'][1]:
+                    pairing = _flip_pairing(pairing)
+                self.pairings[tuple(pairing['models'])] = pairing
+                # Saved after every pairing, so an interrupted league keeps its results
+                self.save()
+
+    def save(self):
+        ''' Write the pairings to the cache
+        '''
+        if self.cache_path is None:
+            return
+        directory = os.path.dirname(self.cache_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(self.cache_path, 'w') as f:
+            json.dump({'settings': self._settings(), 'pairings': list(self.pairings.values())}, f)
+
+    def results(self):
+        ''' Gather the results of the models of the league
+
+        Returns:
+            (tuple) Tuple containing:
+
+                (numpy.array): (n, n) mean payoff of every model against every other one
+                (numpy.array): The Elo ratings of the models
+        '''
+        n = len(self.models)
+        keys = [model_key(model) for model in self.models]
+        payoffs = np.zeros((n, n))
+        scores = np.zeros((n, n))
+        games = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i + 1, n):
+                pairing = self.pairings.get(tuple(sorted((keys[i], keys[j]))))
+                if pairing is None:
+                    continue
+                if pairing['models'][0] != keys[i]:
+                    pairing = _flip_pairing(pairing)
+                payoffs[i, j], payoffs[j, i] = np.array(pairing['payoffs']) / pairing['num_games']
+                scores[i, j] = pairing['score']
+                scores[j, i] = pairing['num_games'] - pairing['score']
+                games[i, j] = games[j, i] = pairing['num_games']
+        return payoffs, elo_ratings(scores, games)
+
+    def _settings(self):
+        return {'env_id': self.env_id, 'num_games': self.num_games, 'seed': self.seed, 'config': self.config}
@@ -197,6 +197,54 @@ def remove_illegal(action_probs, legal_actions):
         probs /= sum(probs)
     return probs
 
+def stack_states(states, num_actions):
+    ''' Stack the observations and legal actions of a batch of states
+
+    Args:
+        states (list): State dicts with obs and legal_actions
+        num_actions (int): The number of actions
+
+    Returns:
+        (tuple) Tuple containing:
+
+            (numpy.array): (batch, obs_shape) observations
+            (numpy.array): (batch, num_actions) boolean mask of the legal actions
+    '''
+    obs = np.stack([state['obs'] for state in states])
+    legal_mask = np.zeros((len(states), num_actions), dtype=bool)
+    for i, state in enumerate(states):
+        legal_mask[i, list(state['legal_actions'].keys())] = True
+    return obs, legal_mask
+
+def remove_illegal_batch(action_probs, legal_mask):
+    ''' Remove illegal actions and normalize the probabilities of a batch of states
+
+    Args:
+        action_probs (numpy.array): (batch, num_actions) probabilities
+        legal_mask (numpy.array): (batch, num_actions) boolean mask of the legal actions
+
+    Returns:
+        probs (numpy.array): The normalized probabilities, uniform over the legal actions
+          of the rows without probability on them
+    '''
+    probs = np.where(legal_mask, np.asarray(action_probs, dtype=np.float64), 0)
+    sums = probs.sum(axis=1, keepdims=True)
+    return np.where(sums > 0, probs / np.where(sums > 0, sums, 1),
+                    legal_mask / legal_mask.sum(axis=1, keepdims=True))
+
+def sample_actions(probs):
+    ''' Sample an action from every row of a batch of probabilities
+
+    Args:
+        probs (numpy.array): (batch, num_actions) probabilities, not necessarily normalized
+
+    Returns:
+        actions (numpy.array): The sampled actions, never one of zero probability
+    '''
+    cumulative = np.cumsum(probs, axis=1)
+    thresholds = np.random.random_sample(len(probs)) * cumulative[:, -1]
+    return (cumulative > thresholds[:, np.newaxis]).argmax(axis=1)
+
 def tournament(env, num):
     ''' Evaluate he performance of the agents in the environment
 
@@ -224,6 +272,73 @@ def tournament(env, num):
         payoffs[i] /= counter
     return payoffs
 
+def run_batch(envs, is_training=False):
+    ''' Run a game in each of several environments, batching the decisions of the agents
+
+    The games are stepped together. At every step the pending decisions are
+    grouped by agent, and every agent gets the states of its group in one call
+    to step_batch (or eval_step_batch) if it has one, or one call to step (or
+    eval_step) per state otherwise.
+
+    Args:
+        envs (list): Environments with their agents set. An agent may sit in several
+          environments, its decisions in all of them are batched together.
+        is_training (boolean): True if for training purpose.
+
+    Returns:
+        (tuple) Tuple containing:
+
+            (list): The trajectories of every game, reorganized as by reorganize
+            (list): The payoffs of every game
+    '''
+    trajectories = [[[] for _ in range(env.num_players)] for env in envs]
+    states, player_ids = [], []
+    for i, env in enumerate(envs):
+        state, player_id = env.reset()
+        trajectories[i][player_id].append(state)
+        states.append(state)
+        player_ids.append(player_id)
+
+    running = [i for i, env in enumerate(envs) if not env.is_over()]
+    while running:
+        # Group the decisions by agent
+        groups = {}
+        for i in running:
+            agent = envs[i].agents[player_ids[i]]
+            groups.setdefault(id(agent), (agent, []))[1].append(i)
+
+        actions = {}
+        for agent, indices in groups.values():
+            batch = [states[i] for i in indices]
+            if is_training:
+                if hasattr(agent, 'step_batch'):
+                    batch_actions = agent.step_batch(batch)
+                else:
+                    batch_actions = [agent.step(state) for state in batch]
+            elif hasattr(agent, 'eval_step_batch'):
+                batch_actions, _ = agent.eval_step_batch(batch)
+            else:
+                batch_actions = [agent.eval_step(state)[0] for state in batch]
+            actions.update(zip(indices, batch_actions))
+
+        # Step the environments like Env.run
+        for i in running:
+            env = envs[i]
+            action = actions[i]
+            state, player_id = env.step(action, env.agents[player_ids[i]].use_raw)
+            trajectories[i][player_ids[i]].append(action)
+            if not env.game.is_over():
+                trajectories[i][player_id].append(state)
+            states[i], player_ids[i] = state, player_id
+        running = [i for i in running if not envs[i].is_over()]
+
+    payoffs = []
+    for i, env in enumerate(envs):
+        for player_id in range(env.num_players):
+            trajectories[i][player_id].append(env.get_state(player_id))
+        payoffs.append(env.get_payoffs())
+    return [reorganize(t, p) for t, p in zip(trajectories, payoffs)], payoffs
+
 def plot_curve(csv_path, save_path, algorithm):
     ''' Read data from csv file and plot the results
     '''
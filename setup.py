@@ -34,7 +34,7 @@ setuptools.setup(
                    'games/uno/jsondata/action_space.json',
                    'games/limitholdem/card2index.json',
                    'games/leducholdem/card2index.json',
-                   'games/doudizhu/jsondata.zip',
+                   'games/doudizhu/tables/*',
                    'games/uno/jsondata/*',
                    ]},
     install_requires=[
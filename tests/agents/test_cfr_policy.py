@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.cfr_policy_agent import CFRPolicyAgent, save_cfr_policy
+from rlcard.models.pretrained_models import LeducHoldemCFRModel
+
+class TestCFRPolicy(unittest.TestCase):
+
+    def test_matches_cfr_agent(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = CFRAgent(env, model_path='experiments/cfr_policy_model')
+        for _ in range(20):
+            agent.train()
+        agent.save()
+
+        policy_agent = CFRPolicyAgent('experiments/cfr_policy_model')
+        self.assertEqual(len(policy_agent), len(agent.average_policy))
+        self.assertEqual(policy_agent.probs.dtype, np.float32)
+        self.assertIsInstance(policy_agent.probs, np.memmap)
+        for obs in agent.average_policy:
+            for legal_actions in ([0, 1, 2], [0, 2], [1, 2, 3]):
+                self.assertTrue(np.allclose(policy_agent.action_probs(obs, legal_actions),
+                                            agent.action_probs(obs, legal_actions, agent.average_policy), atol=1e-6))
+
+    def test_unknown_state(self):
+        save_cfr_policy('experiments/cfr_policy_model', [b'b\x00', b'a\x01', b'c\x00'],
+                        np.array([[1., 0., 3.], [0., 0., 0.], [0., 2., 2.]]))
+        agent = CFRPolicyAgent('experiments/cfr_policy_model')
+        self.assertEqual([agent.lookup(key) for key in (b'a\x01', b'b\x00', b'c\x00')], [0, 1, 2])
+        self.assertIsNone(agent.lookup(b'a\x00'))
+        self.assertIsNone(agent.lookup(b'b\x00\x00'))
+        self.assertTrue(np.allclose(agent.action_probs(b'b\x00', [0, 1, 2]), [0.25, 0, 0.75]))
+        self.assertTrue(np.allclose(agent.action_probs(b'a\x01', [0, 2]), [0.5, 0, 0.5]))
+        self.assertTrue(np.allclose(agent.action_probs(b'd\x00', [1, 2]), [0, 0.5, 0.5]))
+
+    def test_pretrained_model(self):
+        agent = LeducHoldemCFRModel().agents[0]
+        env = rlcard.make('leduc-holdem')
+        state, _ = env.reset()
+        action, info = agent.eval_step(state)
+        self.assertIn(action, state['legal_actions'])
+        self.assertIsNotNone(agent.lookup(state['obs'].tobytes()))
+        self.assertAlmostEqual(sum(info['probs'].values()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
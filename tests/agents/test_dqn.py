@@ -2,7 +2,8 @@ import unittest
 import torch
 import numpy as np
 
-from rlcard.agents.dqn_agent import DQNAgent
+from rlcard.utils.utils import stack_states
+from rlcard.agents.dqn_agent import DQNAgent, Memory, Transition, SumTree, PrioritizedMemory
 
 class TestDQN(unittest.TestCase):
 
@@ -51,3 +52,119 @@ class TestDQN(unittest.TestCase):
         predicted_action = agent.step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
+
+    def test_step_batch(self):
+        agent = DQNAgent(num_actions=4,
+                         state_shape=[3],
+                         mlp_layers=[10,10],
+                         epsilon_start=0,
+                         epsilon_end=0,
+                         device=torch.device('cpu'))
+        states = [{'obs': np.random.random_sample((3,)), 'legal_actions': {a: None for a in legal_actions},
+                   'raw_legal_actions': [str(a) for a in legal_actions]}
+                  for legal_actions in ([0, 1], [2], [1, 3], [0, 1, 2, 3])]
+
+        actions, infos = agent.eval_step_batch(states)
+        for state, action, info in zip(states, actions, infos):
+            self.assertEqual(action, agent.eval_step(state)[0])
+            for raw_action, value in agent.eval_step(state)[1]['values'].items():
+                self.assertAlmostEqual(info['values'][raw_action], value, places=5)
+            self.assertIn(action, state['legal_actions'])
+            self.assertTrue(np.array_equal(agent.predict(state), agent.predict_batch(*stack_states([state], 4))[0]))
+        # Greedy without exploration
+        self.assertEqual(agent.step_batch(states), actions)
+
+        agent.epsilons = np.ones(agent.epsilon_decay_steps)
+        for _ in range(10):
+            for state, action in zip(states, agent.step_batch(states)):
+                self.assertIn(action, state['legal_actions'])
+
+    def test_memory(self):
+        memory = Memory(memory_size=4, batch_size=3, num_actions=10)
+        for i in range(6):
+            memory.save(np.full(2, i, dtype=np.int8), i, float(i), np.full(2, i + 1, dtype=np.int8), [i, 9], i == 5)
+        self.assertEqual(len(memory), 4)
+        self.assertEqual(memory.states.dtype, np.int8)
+        self.assertEqual(sorted(memory.actions), [2, 3, 4, 5])
+
+        states, actions, rewards, next_states, dones, legal_actions = memory.sample()
+        self.assertEqual(states.shape, (3, 2))
+        self.assertEqual(legal_actions.shape, (3, 10))
+        for state, action, reward, next_state, done, legal in zip(states, actions, rewards, next_states, dones, legal_actions):
+            self.assertEqual(state[0], action)
+            self.assertEqual(reward, action)
+            self.assertEqual(next_state[0], action + 1)
+            self.assertEqual(done, action == 5)
+            self.assertEqual(list(np.flatnonzero(legal)), [action, 9])
+
+    def test_memory_checkpoint(self):
+        memory = Memory(memory_size=5, batch_size=2)
+        for i in range(7):
+            memory.save(np.full(3, i / 2), i, 1.0, np.zeros(3), list(range(i + 1)), False)
+        self.assertEqual(memory.num_actions, 7)
+
+        restored = Memory.from_checkpoint(memory.checkpoint_attributes())
+        self.assertEqual((restored.position, restored.size, restored.num_actions), (2, 5, 7))
+        for name in ('states', 'actions', 'rewards', 'next_states', 'dones', 'legal_actions'):
+            self.assertTrue(np.array_equal(getattr(restored, name), getattr(memory, name)))
+
+        transitions = [Transition(np.ones(3), 1, 0.5, np.zeros(3), True, [0, 2])]
+        restored = Memory.from_checkpoint({'memory_size': 5, 'batch_size': 1, 'memory': transitions})
+        _, actions, rewards, _, dones, legal_actions = restored.sample()
+        self.assertEqual((actions[0], rewards[0], dones[0]), (1, 0.5, True))
+        self.assertEqual(list(np.flatnonzero(legal_actions[0])), [0, 2])
+
+        empty = Memory.from_checkpoint(Memory(5, 2).checkpoint_attributes())
+        self.assertEqual(len(empty), 0)
+
+    def test_sum_tree(self):
+        tree = SumTree(5)
+        tree.update(np.arange(5), [1., 2., 3., 0., 4.])
+        self.assertEqual(tree.total(), 10)
+        self.assertEqual(list(tree.find([0., 0.99, 1., 2.5, 5.99, 6., 9.99])), [0, 0, 1, 1, 2, 4, 4])
+        tree.update([1, 1, 3], [0., 0., 5.])
+        self.assertEqual(tree.total(), 13)
+        self.assertEqual(list(tree.get([0, 1, 3])), [1., 0., 5.])
+        self.assertEqual(list(tree.find([1., 3.99, 4., 8.99, 9.])), [2, 2, 3, 3, 4])
+
+        tree = SumTree(1)
+        tree.update([0], [2.])
+        self.assertEqual(tree.total(), 2)
+        self.assertEqual(list(tree.find([1.5])), [0])
+
+    def test_prioritized_memory(self):
+        memory = PrioritizedMemory(memory_size=8, batch_size=4, num_actions=2, alpha=1.0)
+        for i in range(6):
+            memory.save(np.full(2, i), i % 2, 0., np.zeros(2), [0, 1], False)
+        _, _, _, _, _, _, weights, indices = memory.sample(beta=1.0)
+        self.assertTrue(np.allclose(weights, 1))
+        self.assertTrue((indices < 6).all())
+
+        memory.update_priorities(np.arange(6), [0., 0., 0., 0., 0., 10.])
+        states, _, _, _, _, _, weights, indices = memory.sample(beta=1.0)
+        self.assertEqual(list(indices), [5, 5, 5, 5])
+        self.assertEqual(list(states[:, 0]), [5, 5, 5, 5])
+
+        restored = PrioritizedMemory.from_checkpoint(memory.checkpoint_attributes())
+        self.assertEqual(restored.tree.total(), memory.tree.total())
+        self.assertEqual(restored.max_priority, memory.max_priority)
+
+    def test_train_prioritized(self):
+        agent = DQNAgent(replay_memory_size=50,
+                         replay_memory_init_size=20,
+                         update_target_estimator_every=10,
+                         batch_size=4,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'),
+                         prioritized_replay=True)
+        self.assertIsInstance(agent.memory, PrioritizedMemory)
+
+        for _ in range(100):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), np.random.randint(2), {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}, True]
+            agent.feed(ts)
+        self.assertGreater(agent.memory.max_priority, 1e-6)
+
+        restored = DQNAgent.from_checkpoint(agent.checkpoint_attributes())
+        self.assertIsInstance(restored.memory, PrioritizedMemory)
+        self.assertAlmostEqual(restored.memory.tree.total(), agent.memory.tree.total())
@@ -0,0 +1,81 @@
+import gc
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.mccfr_agent import MCCFRAgent
+
+class TestMCCFR(unittest.TestCase):
+
+    def test_train(self):
+        for sampling in ('external', 'outcome'):
+            env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+            agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling=sampling, seed=0)
+
+            for _ in range(100):
+                agent.train()
+
+            state = {'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': {0: None, 2: None}, 'raw_legal_actions': ['call', 'fold']}
+            action, _ = agent.eval_step(state)
+            self.assertIn(action, [0, 2])
+            self.assertGreater(len(agent.regrets), 0)
+            self.assertGreater(len(agent.average_policy), 0)
+
+    def test_workers_are_deterministic(self):
+        regrets = []
+        for num_workers in (1, 2):
+            env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+            agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='outcome',
+                               num_traversals=3, num_workers=num_workers, seed=7)
+            for _ in range(5):
+                agent.train()
+            agent.close()
+            regrets.append(agent.regrets)
+        self.assertEqual(set(regrets[0]), set(regrets[1]))
+        for obs in regrets[0]:
+            self.assertTrue(np.array_equal(regrets[0][obs], regrets[1][obs]))
+
+    def test_release_without_close(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='outcome', num_workers=2, seed=0)
+        agent.train()
+        agent.close()
+        self.assertEqual(agent._pools, [])
+        agent.train()
+        processes = list(agent._pools[0]._pool)
+        self.assertTrue(all(process.is_alive() for process in processes))
+        del agent
+        gc.collect()
+        for process in processes:
+            process.join(timeout=10)
+            self.assertFalse(process.is_alive())
+
+    def test_pisti(self):
+        env = rlcard.make('pisti', config={'allow_step_back': True, 'agent_level': 'easy'})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='outcome', seed=0)
+        agent.train()
+        self.assertGreater(len(agent.regrets), 0)
+
+    def test_invalid_sampling(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        self.assertRaises(ValueError, MCCFRAgent, env, 'experiments/mccfr_model', 'unknown')
+
+    def test_save_and_load(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', seed=0)
+
+        for _ in range(20):
+            agent.train()
+
+        agent.save()
+
+        new_agent = CFRAgent(env, model_path='experiments/mccfr_model')
+        new_agent.load()
+        self.assertEqual(len(agent.policy), len(new_agent.policy))
+        self.assertEqual(len(agent.average_policy), len(new_agent.average_policy))
+        self.assertEqual(len(agent.regrets), len(new_agent.regrets))
+        self.assertEqual(agent.iteration, new_agent.iteration)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 import torch
 import numpy as np
 
-from rlcard.agents.nfsp_agent import NFSPAgent
+from rlcard.agents.nfsp_agent import NFSPAgent, ReservoirBuffer, Transition, sparse_probs
 
 class TestNFSP(unittest.TestCase):
 
@@ -45,3 +45,129 @@ class TestNFSP(unittest.TestCase):
 
             ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 0, {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}, True]
             agent.feed(ts)
+
+    def test_train_prioritized(self):
+        agent = NFSPAgent(num_actions=2,
+                          state_shape=[2],
+                          hidden_layers_sizes=[10,10],
+                          reservoir_buffer_capacity=50,
+                          batch_size=4,
+                          min_buffer_size_to_learn=20,
+                          q_replay_memory_size=50,
+                          q_replay_memory_init_size=20,
+                          q_batch_size=4,
+                          q_mlp_layers=[10,10],
+                          device=torch.device('cpu'),
+                          q_prioritized_replay=True)
+
+        for _ in range(100):
+            agent.sample_episode_policy()
+            agent.step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 1, {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}, True]
+            agent.feed(ts)
+        self.assertTrue(agent._rl_agent.prioritized_replay)
+
+        restored = NFSPAgent.from_checkpoint(agent.checkpoint_attributes())
+        self.assertTrue(restored._rl_agent.prioritized_replay)
+        self.assertEqual(len(restored._rl_agent.memory), len(agent._rl_agent.memory))
+
+        # A snapshot without buffers evaluates like the agent
+        snapshot = agent.checkpoint_attributes(with_buffers=False)
+        self.assertIsNone(snapshot['reservoir_buffer']['info_states'])
+        self.assertIsNone(snapshot['rl_agent']['memory']['states'])
+        restored = NFSPAgent.from_checkpoint(snapshot)
+        self.assertEqual(len(restored._rl_agent.memory), 0)
+        self.assertEqual(len(restored._reservoir_buffer), 0)
+        state = {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}
+        self.assertEqual(restored.eval_step(state)[1], agent.eval_step(state)[1])
+
+    def test_step_batch(self):
+        agent = NFSPAgent(num_actions=4,
+                          state_shape=[3],
+                          hidden_layers_sizes=[10,10],
+                          q_mlp_layers=[10,10],
+                          device=torch.device('cpu'))
+        states = [{'obs': np.random.random_sample((3,)), 'legal_actions': {a: None for a in legal_actions},
+                   'raw_legal_actions': [str(a) for a in legal_actions]}
+                  for legal_actions in ([0, 1], [2], [1, 3])]
+
+        agent._mode = 'average_policy'
+        for state, action in zip(states, agent.step_batch(states)):
+            self.assertIn(action, state['legal_actions'])
+        actions, infos = agent.eval_step_batch(states)
+        for state, info in zip(states, infos):
+            self.assertAlmostEqual(sum(info['probs'].values()), 1)
+            self.assertEqual(info['probs'].keys(), agent.eval_step(state)[1]['probs'].keys())
+            for raw_action, prob in agent.eval_step(state)[1]['probs'].items():
+                self.assertAlmostEqual(info['probs'][raw_action], prob, places=5)
+
+        agent._mode = 'best_response'
+        actions = agent.step_batch(states)
+        agent._flush_transitions()
+        self.assertEqual(len(agent._reservoir_buffer), 3)
+        self.assertTrue(np.array_equal(agent._reservoir_buffer.actions[:3, 0], actions))
+
+        agent.evaluate_with = 'best_response'
+        actions, _ = agent.eval_step_batch(states)
+        self.assertEqual(actions, agent._rl_agent.eval_step_batch(states)[0])
+
+    def test_reservoir_buffer(self):
+        buffer = ReservoirBuffer(5, num_actions=3)
+        states = np.arange(12, dtype=np.float32).reshape(6, 2)
+        actions = np.arange(6) % 3
+        buffer.add_many(states[:3], actions[:3])
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.actions.shape, (5, 1))
+        buffer.add(Transition(info_state=states[3], action_probs=np.eye(3)[actions[3]]))
+        buffer.add_many(states[4:], actions[4:])
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(buffer._add_calls, 6)
+        for transition in buffer:
+            row = int(transition.info_state[0]) // 2
+            self.assertTrue(np.array_equal(transition.action_probs, np.eye(3)[actions[row]]))
+
+        info_states, action_probs = buffer.sample(4)
+        self.assertIsInstance(info_states, torch.Tensor)
+        self.assertEqual(tuple(info_states.shape), (4, 2))
+        self.assertEqual(tuple(action_probs.shape), (4, 3))
+        rows = info_states[:, 0].long() // 2
+        self.assertTrue(torch.equal(action_probs.argmax(dim=1), torch.from_numpy(actions)[rows]))
+        self.assertTrue(torch.equal(action_probs.sum(dim=1), torch.ones(4)))
+        with self.assertRaises(ValueError):
+            buffer.sample(6)
+
+        restored = ReservoirBuffer.from_checkpoint(buffer.checkpoint_attributes())
+        self.assertEqual(len(restored), 5)
+        self.assertEqual(restored._add_calls, 6)
+        self.assertTrue(np.array_equal(restored.info_states, buffer.info_states))
+        self.assertTrue(np.array_equal(restored.actions, buffer.actions))
+
+        # Checkpoints saved with the list of transitions
+        legacy = ReservoirBuffer.from_checkpoint({'data': list(buffer), 'add_calls': 6, 'reservoir_buffer_capacity': 5})
+        self.assertEqual(legacy.num_actions, 3)
+        self.assertTrue(np.array_equal(legacy.actions, buffer.actions))
+
+    def test_reservoir_buffer_sparse_targets(self):
+        buffer = ReservoirBuffer(4, num_actions=4)
+        buffer.add_many(np.zeros((1, 2)), [2])
+        buffer.add(Transition(info_state=np.ones(2), action_probs=np.array([0.25, 0, 0.75, 0])))
+        self.assertEqual(buffer.actions.shape, (4, 2))
+        self.assertTrue(np.array_equal(buffer.actions[:2], [[2, 0], [0, 2]]))
+        info_states, action_probs = buffer.sample(2)
+        expected = {0.0: [0, 0, 1, 0], 1.0: [0.25, 0, 0.75, 0]}
+        for info_state, probs in zip(info_states, action_probs):
+            self.assertEqual(probs.tolist(), expected[info_state[0].item()])
+
+        actions, probs = sparse_probs([[0, 0.5, 0.5], [1, 0, 0]])
+        self.assertTrue(np.array_equal(actions, [[1, 2], [0, 1]]))
+        self.assertTrue(np.array_equal(probs, [[0.5, 0.5], [1, 0]]))
+
+    def test_reservoir_buffer_is_uniform(self):
+        np.random.seed(0)
+        counts = np.zeros(50)
+        for _ in range(2000):
+            buffer = ReservoirBuffer(5)
+            buffer.add_many(np.arange(20).reshape(20, 1), np.zeros(20, dtype=int))
+            buffer.add_many(np.arange(20, 50).reshape(30, 1), np.zeros(30, dtype=int))
+            counts[buffer.info_states[:, 0]] += 1
+        self.assertTrue(np.allclose(counts / 2000, 0.1, atol=0.03))
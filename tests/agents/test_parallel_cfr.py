@@ -0,0 +1,100 @@
+import gc
+import sys
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.parallel_cfr_agent import ParallelCFRAgent, shard_of
+
+class TestParallelCFR(unittest.TestCase):
+
+    def test_train(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = ParallelCFRAgent(env, model_path='experiments/parallel_cfr_model', num_workers=2, capacity=2, seed=0)
+
+        for _ in range(20):
+            agent.train()
+
+        state = {'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': {0: None, 2: None}, 'raw_legal_actions': ['call', 'fold']}
+        action, _ = agent.eval_step(state)
+        self.assertIn(action, [0, 2])
+        for shard, keys in zip(agent.shards, agent.keys):
+            self.assertTrue(np.allclose(shard.policy[:len(keys)].sum(axis=1), 1))
+            for row, key in enumerate(keys):
+                self.assertEqual(shard.keys[row].tobytes(), key)
+        agent.close()
+
+    def test_is_deterministic(self):
+        tables = []
+        for _ in range(2):
+            env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+            agent = ParallelCFRAgent(env, model_path='experiments/parallel_cfr_model', num_workers=2, num_traversals=2, seed=3)
+            for _ in range(5):
+                agent.train()
+            tables.append({key: (shard.regrets[row].copy(), shard.average_policy[row].copy())
+                           for shard, keys in zip(agent.shards, agent.keys) for row, key in enumerate(keys)})
+            agent.close()
+        self.assertEqual(set(tables[0]), set(tables[1]))
+        for key, (regrets, average_policy) in tables[0].items():
+            self.assertTrue(np.array_equal(regrets, tables[1][key][0]))
+            self.assertTrue(np.array_equal(average_policy, tables[1][key][1]))
+
+    def test_workers_match_in_process(self):
+        agents = []
+        for num_workers in (1, 2):
+            env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+            agent = ParallelCFRAgent(env, model_path='experiments/parallel_cfr_model', num_workers=num_workers, seed=1)
+            for _ in range(5):
+                agent.train()
+            agents.append(agent)
+        self.assertEqual(sum(map(len, agents[0].keys)), sum(map(len, agents[1].keys)))
+        for keys, shard in zip(agents[0].keys, agents[0].shards):
+            for row, key in enumerate(keys):
+                shard_id = shard_of(key, agents[1].num_shards)
+                other_row = agents[1].index[shard_id][key]
+                self.assertTrue(np.allclose(shard.regrets[row], agents[1].shards[shard_id].regrets[other_row]))
+        for agent in agents:
+            agent.close()
+
+    def test_save_and_load(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = ParallelCFRAgent(env, model_path='experiments/parallel_cfr_model', num_workers=1, seed=0)
+
+        for _ in range(10):
+            agent.train()
+
+        agent.save()
+
+        cfr_agent = CFRAgent(env, model_path='experiments/parallel_cfr_model')
+        cfr_agent.load()
+        self.assertEqual(len(cfr_agent.regrets), sum(map(len, agent.keys)))
+        self.assertEqual(cfr_agent.iteration, agent.iteration)
+
+        new_agent = ParallelCFRAgent(env, model_path='experiments/parallel_cfr_model', num_workers=1, num_shards=3)
+        new_agent.load()
+        self.assertEqual(new_agent.iteration, agent.iteration)
+        for obs, average_policy in cfr_agent.average_policy.items():
+            shard_id = shard_of(obs, 3)
+            row = new_agent.index[shard_id][obs]
+            self.assertTrue(np.array_equal(new_agent.shards[shard_id].average_policy[row], average_policy))
+        new_agent.train()
+        agent.close()
+        new_agent.close()
+
+    @unittest.skipIf(sys.version_info < (3, 8), 'shared_memory needs Python 3.8')
+    def test_release_without_close(self):
+        from multiprocessing import shared_memory
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = ParallelCFRAgent(env, model_path='experiments/parallel_cfr_model', num_workers=2, seed=0)
+        agent.train()
+        names = [shard.name for shard in agent.shards if shard is not None]
+        self.assertGreater(len(names), 0)
+        del agent
+        gc.collect()
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+if __name__ == '__main__':
+    unittest.main()
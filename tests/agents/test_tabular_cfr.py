@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.tabular_cfr_agent import TabularCFRAgent, InfosetTable
+
+class TestTabularCFR(unittest.TestCase):
+
+    def test_train(self):
+        for variant in ('cfr', 'cfr+', 'linear'):
+            env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+            agent = TabularCFRAgent(env, model_path='experiments/tabular_cfr_model', variant=variant)
+
+            for _ in range(20):
+                agent.train()
+
+            state = {'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': {0: None, 2: None}, 'raw_legal_actions': ['call', 'fold']}
+            action, _ = agent.eval_step(state)
+            self.assertIn(action, [0, 2])
+
+            n = len(agent.table)
+            self.assertTrue(np.allclose(agent.table.policy[:n].sum(axis=1), 1))
+            if variant == 'cfr+':
+                self.assertTrue((agent.table.regrets[:n] >= 0).all())
+
+    def test_matches_cfr_agent(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True, 'seed': 3})
+        agent = CFRAgent(env, model_path='experiments/cfr_model')
+        tabular_env = rlcard.make('leduc-holdem', config={'allow_step_back': True, 'seed': 3})
+        tabular_agent = TabularCFRAgent(tabular_env, model_path='experiments/tabular_cfr_model')
+
+        for _ in range(5):
+            agent.train()
+            tabular_agent.train()
+
+        self.assertEqual(len(agent.policy), len(tabular_agent.table))
+        for obs, regrets in agent.regrets.items():
+            index = tabular_agent.table.index[obs]
+            self.assertTrue(np.allclose(regrets, tabular_agent.table.regrets[index]))
+            self.assertTrue(np.allclose(agent.average_policy[obs], tabular_agent.table.average_policy[index]))
+            self.assertTrue(np.allclose(agent.policy[obs], tabular_agent.table.policy[index]))
+
+    def test_table_grows(self):
+        table = InfosetTable(3, capacity=2)
+        for i in range(5):
+            self.assertEqual(table.lookup(bytes([i])), i)
+        self.assertEqual(table.lookup(bytes([1])), 1)
+        self.assertEqual(len(table), 5)
+        self.assertGreaterEqual(table.regrets.shape[0], 5)
+
+        table.regrets[:5] = [[1, -1, 0], [0, 0, 0], [-1, 3, 1], [0, 0, 0], [2, 2, 0]]
+        table.regret_matching()
+        self.assertTrue(np.allclose(table.policy[0], [1, 0, 0]))
+        self.assertTrue(np.allclose(table.policy[1], [1 / 3, 1 / 3, 1 / 3]))
+        self.assertTrue(np.allclose(table.policy[2], [0, 0.75, 0.25]))
+
+    def test_invalid_variant(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        self.assertRaises(ValueError, TabularCFRAgent, env, 'experiments/tabular_cfr_model', 'unknown')
+
+    def test_save_and_load(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = TabularCFRAgent(env, model_path='experiments/tabular_cfr_model', variant='cfr+')
+
+        for _ in range(20):
+            agent.train()
+
+        agent.save()
+
+        new_agent = TabularCFRAgent(env, model_path='experiments/tabular_cfr_model')
+        new_agent.load()
+        self.assertEqual(len(agent.table), len(new_agent.table))
+        self.assertEqual(agent.iteration, new_agent.iteration)
+        self.assertEqual(new_agent.variant, 'cfr+')
+        n = len(agent.table)
+        self.assertTrue(np.array_equal(agent.table.average_policy[:n], new_agent.table.average_policy[:n]))
+        new_agent.train()
+
+if __name__ == '__main__':
+    unittest.main()
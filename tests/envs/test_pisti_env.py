@@ -0,0 +1,115 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents.random_agent import RandomAgent
+from .determism_util import is_deterministic
+
+
+class TestPistiEnv(unittest.TestCase):
+
+    def test_reset_and_extract_state(self):
+        for level, size in (('easy', 208), ('medium', 2 * 211), ('hard', 2 * 315)):
+            env = rlcard.make('pisti', config={'agent_level': level})
+            state, _ = env.reset()
+            self.assertEqual(state['obs'].size, size)
+
+    def test_is_deterministic(self):
+        self.assertTrue(is_deterministic('pisti'))
+
+    def test_get_legal_actions(self):
+        env = rlcard.make('pisti')
+        env.reset()
+        legal_actions = env._get_legal_actions()
+        self.assertEqual(len(legal_actions), 4)
+        for legal_action in legal_actions:
+            self.assertLess(legal_action, 52)
+
+    def test_step(self):
+        env = rlcard.make('pisti')
+        state, _ = env.reset()
+        action = np.random.choice(list(state['legal_actions'].keys()))
+        _, player_id = env.step(action)
+        self.assertEqual(player_id, env.game.get_player_id())
+
+    def test_run(self):
+        for engine in ('object', 'array'):
+            env = rlcard.make('pisti', config={'game_engine': engine})
+            env.set_agents([RandomAgent(env.num_actions) for _ in range(env.num_players)])
+            trajectories, payoffs = env.run(is_training=False)
+            self.assertEqual(len(trajectories), 2)
+            self.assertTrue(env.is_over())
+            self.assertEqual(len(payoffs), 2)
+
+    def test_array_engine_matches_object_engine(self):
+        for level in ('easy', 'medium', 'hard'):
+            envs = [rlcard.make('pisti', config={'seed': 7, 'agent_level': level, 'game_engine': engine})
+                    for engine in ('object', 'array')]
+            states = [env.reset()[0] for env in envs]
+            while not envs[0].is_over():
+                self.assertTrue(np.array_equal(states[0]['obs'], states[1]['obs']))
+                action = min(states[0]['legal_actions'])
+                states = [env.step(action)[0] for env in envs]
+            self.assertTrue(envs[1].is_over())
+            self.assertTrue(np.array_equal(envs[0].get_payoffs(), envs[1].get_payoffs()))
+
+    def test_incremental_obs_matches_rebuild(self):
+        for engine in ('object', 'array'):
+            for level in ('easy', 'medium', 'hard'):
+                env = rlcard.make('pisti', config={'seed': 3, 'agent_level': level, 'game_engine': engine})
+                state, player_id = env.reset()
+                while True:
+                    env.encoder.invalidate()
+                    rebuilt = env.get_state(player_id)['obs']
+                    self.assertEqual(state['obs'].dtype, np.int8)
+                    self.assertTrue(np.array_equal(state['obs'], rebuilt))
+                    if env.is_over():
+                        break
+                    action = max(state['legal_actions'])
+                    state, player_id = env.step(action)
+
+    def test_step_back_rebuilds_obs(self):
+        env = rlcard.make('pisti', config={'seed': 5, 'allow_step_back': True, 'agent_level': 'hard'})
+        state, player_id = env.reset()
+        first_obs = state['obs']
+        for _ in range(3):
+            state, player_id = env.step(min(state['legal_actions']))
+        for _ in range(3):
+            env.step_back()
+        self.assertTrue(np.array_equal(env.get_state(env.get_player_id())['obs'], first_obs))
+
+    def test_share_obs_buffer(self):
+        env = rlcard.make('pisti', config={'seed': 1, 'share_obs_buffer': True})
+        state, _ = env.reset()
+        next_state, _ = env.step(min(state['legal_actions']))
+        self.assertTrue(np.shares_memory(state['obs'], next_state['obs']))
+
+        env = rlcard.make('pisti', config={'seed': 1})
+        state, _ = env.reset()
+        next_state, _ = env.step(min(state['legal_actions']))
+        self.assertFalse(np.shares_memory(state['obs'], next_state['obs']))
+
+    def test_human_req_info(self):
+        env = rlcard.make('pisti', config={'seed': 2})
+        state, _ = env.reset()
+        self.assertNotIn('human_req_info', state)
+
+        for engine in ('object', 'array'):
+            env = rlcard.make('pisti', config={'seed': 2, 'playing_with_human': True, 'game_engine': engine})
+            state, player_id = env.reset()
+            info = state['human_req_info']
+            expected = env.game.get_all_states()
+            self.assertEqual(len(info), 3)
+            self.assertEqual(info['num_players'], 2)
+            self.assertEqual(info[player_id]['hand'], expected[player_id]['hand'])
+            self.assertEqual(info[0]['last_card_on_deck'], expected[0]['last_card_on_deck'])
+            self.assertIs(info[0], info[0])
+            self.assertRaises(KeyError, info.__getitem__, 2)
+
+    def test_invalid_config(self):
+        self.assertRaises(ValueError, rlcard.make, 'pisti', {'game_engine': 'unknown'})
+        self.assertRaises(ValueError, rlcard.make, 'pisti', {'agent_level': 'unknown'})
+
+
+if __name__ == '__main__':
+    unittest.main()
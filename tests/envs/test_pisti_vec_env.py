@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.envs.pisti_vec import PistiVecEnv
+
+
+class FixedDeckRandom:
+    ''' Stands in for np_random so that a PistiEnv game is dealt a given deck
+    '''
+    def __init__(self, deck):
+        self.deck = deck
+
+    def shuffle(self, cards):
+        cards[:] = self.deck
+
+
+class TestPistiVecEnv(unittest.TestCase):
+
+    def test_reset(self):
+        env = PistiVecEnv({'num_envs': 8})
+        obs, legal_masks, player_ids = env.reset()
+        self.assertEqual(obs.shape, (8, 2, 315))
+        self.assertEqual(legal_masks.shape, (8, 52))
+        self.assertTrue(np.all(legal_masks.sum(axis=1) == 4))
+        self.assertTrue(np.all(player_ids == 0))
+
+    def test_state_shape(self):
+        for level, shape in (('easy', (1, 208)), ('medium', (2, 211)), ('hard', (2, 315))):
+            env = PistiVecEnv({'num_envs': 4, 'agent_level': level})
+            obs, _, _ = env.reset()
+            self.assertEqual(obs.shape[1:], shape)
+            self.assertEqual(list(shape), env.state_shape[0])
+
+    def test_illegal_action(self):
+        env = PistiVecEnv({'num_envs': 4, 'seed': 1})
+        _, legal_masks, _ = env.reset()
+        illegal = np.argmin(legal_masks, axis=1)
+        env.step(illegal)
+        self.assertTrue(np.all(env.hand_sizes[:, 0] == 3))
+
+    def test_auto_reset(self):
+        env = PistiVecEnv({'num_envs': 4, 'seed': 1})
+        _, legal_masks, _ = env.reset()
+        for _ in range(48):
+            _, legal_masks, player_ids, payoffs, dones = env.step(np.argmax(legal_masks, axis=1))
+        self.assertTrue(np.all(dones))
+        self.assertTrue(np.all(payoffs.sum(axis=1) >= 16))
+        self.assertTrue(np.all(player_ids == 0))
+        self.assertTrue(np.all(env.deck_pos == 12))
+
+    def test_matches_pisti_env(self):
+        num_envs = 4
+        vec_env = PistiVecEnv({'num_envs': num_envs, 'seed': 3})
+        obs, legal_masks, player_ids = vec_env.reset()
+        envs = []
+        for i in range(num_envs):
+            env = rlcard.make('pisti', config={'game_engine': 'array'})
+            env.game.np_random = FixedDeckRandom(vec_env.deck[i].copy())
+            env.reset()
+            envs.append(env)
+
+        finished = np.zeros(num_envs, dtype=bool)
+        while not finished.all():
+            for i, env in enumerate(envs):
+                if finished[i]:
+                    continue
+                state = env.get_state(env.get_player_id())
+                self.assertTrue(np.array_equal(state['obs'], obs[i]))
+                self.assertEqual(sorted(state['legal_actions']), list(np.flatnonzero(legal_masks[i])))
+                self.assertEqual(env.get_player_id(), player_ids[i])
+            actions = np.argmax(legal_masks, axis=1)
+            obs, legal_masks, player_ids, payoffs, dones = vec_env.step(actions)
+            for i, env in enumerate(envs):
+                if finished[i]:
+                    continue
+                env.step(actions[i])
+                self.assertEqual(env.is_over(), dones[i])
+                if dones[i]:
+                    self.assertEqual(list(env.get_payoffs()), list(payoffs[i]))
+            finished |= dones
+
+
+if __name__ == '__main__':
+    unittest.main()
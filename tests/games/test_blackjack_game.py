@@ -62,6 +62,18 @@ class TestBlackjackGame(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_same_card(self):
+        for seed in range(20):
+            game = Game(allow_step_back=True)
+            game.configure(DEFAULT_GAME_CONFIG)
+            game.np_random = np.random.RandomState(seed)
+            game.init_game()
+            game.step('hit')
+            hand = game.get_state(0)['state'][0]
+            game.step_back()
+            game.step('hit')
+            self.assertEqual(game.get_state(0)['state'][0], hand)
+
     def test_get_state(self):
         game = Game()
         game.configure(DEFAULT_GAME_CONFIG)
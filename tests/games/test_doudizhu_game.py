@@ -1,3 +1,4 @@
+import tempfile
 import unittest
 import numpy as np
 import functools
@@ -6,6 +7,7 @@ from rlcard.games.doudizhu.game import DoudizhuGame as Game
 from rlcard.games.doudizhu.utils import get_landlord_score, encode_cards
 from rlcard.games.doudizhu.utils import doudizhu_sort_str
 from rlcard.games.doudizhu.judger import DoudizhuJudger as Judger
+from rlcard.games.doudizhu.tables import ARRAYS, build_tables, load_tables
 
 
 class TestDoudizhuGame(unittest.TestCase):
@@ -144,5 +146,17 @@ class TestDoudizhuGame(unittest.TestCase):
         self.assertEqual(payoffs[0], 1)
         self.assertEqual(payoffs[1], 1)
 
+    def test_tables(self):
+        # The shipped tables are the ones compiled from jsondata.zip
+        tables, card_types = load_tables()
+        with tempfile.TemporaryDirectory() as directory:
+            build_tables(tables_dir=directory)
+            built_tables, built_card_types = load_tables(directory)
+            self.assertEqual(card_types, built_card_types)
+            for name in ARRAYS:
+                np.testing.assert_array_equal(tables[name], built_tables[name])
+            del built_tables
+        self.assertIsInstance(tables['actions'], np.memmap)
+
 if __name__ == '__main__':
     unittest.main()
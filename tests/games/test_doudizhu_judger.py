@@ -1,6 +1,9 @@
 import unittest
 
-from rlcard.games.doudizhu.utils import CARD_TYPE
+import numpy as np
+
+from rlcard.games.doudizhu.utils import CARD_TYPE, ID_2_ACTION, PASS_ID
+from rlcard.games.doudizhu.utils import cards2counts, contained_action_ids, get_gt_action_ids
 from rlcard.games.doudizhu.judger import DoudizhuJudger as Judger
 
 class TestDoudizhuGame(unittest.TestCase):
@@ -155,5 +158,28 @@ class TestDoudizhuGame(unittest.TestCase):
             self.assertIn(c, playable_cards)
         self.assertEqual(len(playable_cards), len(all_cards_list))
 
+    def test_contained_action_ids(self):
+        np_random = np.random.RandomState(0)
+        deck = list('3456789TJQKA2' * 4 + 'BR')
+        for num_cards in [20, 17, 8, 3]:
+            hand = ''.join(sorted(np_random.choice(deck, num_cards, replace=False), key='3456789TJQKA2BR'.index))
+            action_ids = contained_action_ids(cards2counts(hand))
+            playable_cards = {ID_2_ACTION[action_id] for action_id in action_ids if action_id != PASS_ID}
+            self.assertEqual(playable_cards, Judger.playable_cards_from_hand(hand))
+
+    def test_get_gt_action_ids(self):
+        hand = '334455667789TTBR'
+        gt_cards = [ID_2_ACTION[action_id] for action_id in get_gt_action_ids(hand, '5')]
+        self.assertEqual(gt_cards[0], 'pass')
+        self.assertEqual(set(gt_cards), {'pass', '6', '7', '8', '9', 'T', 'B', 'R', 'BR'})
+        gt_cards = [ID_2_ACTION[action_id] for action_id in get_gt_action_ids(hand + '22', '34567')]
+        self.assertIn('6789T', gt_cards)
+        self.assertNotIn('456789T', gt_cards)
+        self.assertIn('BR', gt_cards)
+        self.assertNotIn('34567', gt_cards)
+        self.assertEqual(list(get_gt_action_ids(hand, 'BR')), [PASS_ID])
+        self.assertEqual([ID_2_ACTION[action_id] for action_id in get_gt_action_ids('33334444R', '3333')],
+                         ['pass', '4444'])
+
 if __name__ == '__main__':
     unittest.main()
@@ -18,6 +18,7 @@ from rlcard.games.gin_rummy.utils.action_event import draw_card_action_id, pick_
 from rlcard.games.gin_rummy.utils.action_event import declare_dead_hand_action_id
 from rlcard.games.gin_rummy.utils.action_event import gin_action_id, discard_action_id, knock_action_id
 from rlcard.games.gin_rummy.utils.melding import get_all_set_melds, get_all_run_melds, get_meld_clusters
+from rlcard.games.gin_rummy.utils.melding import get_best_meld_clusters, get_hand_mask, get_min_deadwood_count
 from rlcard.games.gin_rummy.utils.settings import Setting, Settings
 from rlcard.games.gin_rummy.utils.thinker import Thinker
 
@@ -168,6 +169,36 @@ class TestGinRummyGame(unittest.TestCase):
         self.assertEqual(set(knock_cards), set(correct_knock_cards))
         self.assertEqual(gin_cards, [])
 
+    def test_best_meld_clusters(self):
+        hand_text = ['7H', '6H', '5H', '4H', '3H', 'AS', 'AH', 'AD', '2C', 'KC']
+        hand = [utils.card_from_text(x) for x in hand_text]
+        best_meld_clusters = get_best_meld_clusters(hand=hand)
+        self.assertEqual(get_min_deadwood_count(get_hand_mask(hand)), 12)
+        self.assertEqual(set(frozenset(frozenset(str(card) for card in meld_pile) for meld_pile in meld_cluster)
+                             for meld_cluster in best_meld_clusters),
+                         {frozenset([frozenset(['3H', '4H', '5H', '6H', '7H']), frozenset(['AS', 'AH', 'AD'])])})
+
+        # the best meld clusters are the meld clusters with the least deadwood count
+        np_random = np.random.RandomState(0)
+        low_cards = [utils.get_card(rank_id + 13 * suit_id) for rank_id in range(6) for suit_id in range(4)]
+        for _ in range(50):
+            hand = [low_cards[i] for i in np_random.choice(len(low_cards), 10, replace=False)]
+            deadwood_counts = [utils.get_deadwood_count(hand=hand, meld_cluster=meld_cluster)
+                               for meld_cluster in get_meld_clusters(hand=hand)]
+            best_deadwood_count = min(deadwood_counts, default=utils.get_deadwood_count(hand=hand, meld_cluster=[]))
+            self.assertEqual(get_min_deadwood_count(get_hand_mask(hand)), best_deadwood_count)
+            self.assertEqual(len(get_best_meld_clusters(hand=hand)), deadwood_counts.count(best_deadwood_count))
+
+    def test_player_hand_mask(self):
+        player = GinRummyPlayer(player_id=0, np_random=np.random.RandomState())
+        player.hand = [utils.card_from_text(x) for x in ['AS', '2S', '3S', 'KD']]
+        player.did_populate_hand()
+        player.add_card_to_hand(utils.card_from_text('4S'))
+        player.remove_card_from_hand(utils.card_from_text('KD'))
+        self.assertEqual(player.hand_mask, get_hand_mask(player.hand))
+        self.assertEqual([[str(card) for card in meld_pile] for meld_cluster in player.get_meld_clusters()
+                          for meld_pile in meld_cluster], [['AS', '2S', '3S'], ['AS', '2S', '3S', '4S'], ['2S', '3S', '4S']])
+
     def test_corrected_settings(self):
         default_setting = Setting.default_setting()
         config = {Setting.max_drawn_card_count: 10,
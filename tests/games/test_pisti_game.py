@@ -0,0 +1,142 @@
+import unittest
+import numpy as np
+
+from rlcard.games.pisti.pisti_game import PistiGame as Game
+from rlcard.games.pisti.pisti_array_game import PistiArrayGame as ArrayGame
+from rlcard.games.pisti.pisti_card import PistiCard
+
+
+def play_game(game, seed):
+    ''' Play a full game choosing the smallest legal card id, return the legal actions,
+        scores and top card seen at every step
+    '''
+    game.np_random.seed(seed)
+    game.init_game()
+    trace = []
+    while not game.is_over():
+        actions = sorted(card.card_numeric_id for card in game.get_legal_actions())
+        if not actions:
+            continue
+        trace.append((actions, game.get_all_payoffs(), game.get_state(0)['last_card_on_deck']))
+        game.step(PistiCard.card(actions[0]))
+    return trace
+
+
+class TestPistiMethods(unittest.TestCase):
+
+    def test_get_num_players(self):
+        for game in (Game(), ArrayGame()):
+            self.assertEqual(game.get_num_players(), 2)
+
+    def test_get_num_actions(self):
+        for game in (Game(), ArrayGame()):
+            self.assertEqual(game.get_num_actions(), 52)
+
+    def test_init_game(self):
+        for game in (Game(), ArrayGame()):
+            state, player_id = game.init_game()
+            self.assertEqual(player_id, 0)
+            self.assertEqual(len(state['hand']), 4)
+            self.assertEqual(state['num_cards'], [4, 4])
+            self.assertIsInstance(state['last_card_on_deck'], PistiCard)
+
+    def test_step(self):
+        for game in (Game(), ArrayGame()):
+            game.init_game()
+            action = game.get_legal_actions()[0]
+            state, next_player_id = game.step(action)
+            self.assertEqual(next_player_id, 1)
+            self.assertIn(str(action), state['seen_cards'])
+            self.assertEqual(state['num_cards'], [3, 4])
+
+    def test_array_game_step_with_card_id(self):
+        game = ArrayGame()
+        game.init_game()
+        card_id = game.get_legal_actions()[0].card_numeric_id
+        _, next_player_id = game.step(card_id)
+        self.assertEqual(next_player_id, 1)
+        self.assertRaises(ValueError, game.step, card_id)
+
+    def test_step_back(self):
+        for game in (Game(allow_step_back=True), ArrayGame(allow_step_back=True)):
+            state, _ = game.init_game()
+            game.step(game.get_legal_actions()[0])
+            self.assertTrue(game.step_back())
+            self.assertEqual(game.get_player_id(), 0)
+            self.assertEqual(game.get_state(0)['hand'], state['hand'])
+            self.assertFalse(game.step_back())
+
+    def test_step_back_restores_game(self):
+        def snapshot(game):
+            dealer, pisti_round = game.dealer, game.round
+            piles = [dealer.secret_initial_deck, dealer.current_stock_pile, dealer.remaining_deck,
+                     pisti_round.initial_secret]
+            piles += [player.hand for player in game.players] + [player.seen_cards for player in game.players]
+            return ([[card.card_numeric_id for card in pile] for pile in piles], game.get_all_payoffs(),
+                    [player.collected_num for player in game.players], dealer.is_over, pisti_round.is_over,
+                    pisti_round.current_player_id, pisti_round.last_collector, pisti_round.last_delta)
+
+        np_random = np.random.RandomState(0)
+        for seed in range(10):
+            game = Game(allow_step_back=True)
+            game.np_random.seed(seed)
+            game.init_game()
+            snapshots = []
+            while not game.is_over():
+                legal_actions = game.get_legal_actions()
+                if not legal_actions:
+                    continue
+                snapshots.append(snapshot(game))
+                game.step(legal_actions[np_random.randint(len(legal_actions))])
+                game.get_legal_actions()
+                if np_random.rand() < 0.3:
+                    self.assertTrue(game.step_back())
+                    self.assertEqual(snapshot(game), snapshots.pop())
+            while snapshots:
+                self.assertTrue(game.step_back())
+                self.assertEqual(snapshot(game), snapshots.pop())
+            self.assertFalse(game.step_back())
+
+    def test_get_payoffs(self):
+        for game in (Game(), ArrayGame()):
+            play_game(game, seed=3)
+            payoffs = game.get_all_payoffs()
+            self.assertEqual(len(payoffs), 2)
+            self.assertGreaterEqual(sum(payoffs), 16)
+
+    def test_array_game_matches_game(self):
+        for seed in range(20):
+            game, array_game = Game(), ArrayGame()
+            self.assertEqual(play_game(game, seed), play_game(array_game, seed))
+            self.assertEqual(game.get_all_payoffs(), array_game.get_all_payoffs())
+
+            arrays, array_arrays = game.get_state_arrays(True), array_game.get_state_arrays(True)
+            for key in ('seen', 'scores', 'collected', 'secret'):
+                self.assertTrue(np.array_equal(arrays[key], array_arrays[key]))
+
+    def test_last_delta(self):
+        for seed in range(10):
+            deltas = []
+            for game in (Game(), ArrayGame()):
+                game.np_random.seed(seed)
+                game.init_game()
+                self.assertIsNone(game.get_last_delta())
+                played = []
+                while not game.is_over():
+                    actions = sorted(card.card_numeric_id for card in game.get_legal_actions())
+                    if actions:
+                        game.step(PistiCard.card(actions[0]))
+                        played.append(game.get_last_delta())
+                # The object engine deals lazily, so the deltas are read once the game is over
+                trace = [(delta.player_id, delta.card_id, delta.secret_taken,
+                          [(p, sorted(ids), points) for p, ids, points in delta.collections],
+                          [sorted(ids) for ids in delta.dealt],
+                          [sorted(ids) for ids in delta.next_hands]) for delta in played]
+                deltas.append(trace)
+                self.assertEqual(sum(points for d in trace for _, _, points in d[3]),
+                                 sum(game.get_all_payoffs()) - 3)
+            self.assertEqual(deltas[0], deltas[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
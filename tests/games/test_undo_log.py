@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.games.base import UndoLog
+
+
+class Thing:
+
+    def __init__(self):
+        self.value = 0
+        self.items = [1, 2]
+        self.table = {'a': 1}
+
+
+class TestUndoLog(unittest.TestCase):
+
+    def test_undo(self):
+        thing = Thing()
+        items = thing.items
+        log = UndoLog()
+        self.assertEqual(len(log), 0)
+        self.assertFalse(log.undo())
+
+        log.begin()
+        log.save_attrs(thing, 'value', 'items')
+        log.save_list(thing.items)
+        log.save_dict(thing.table)
+        thing.value = 1
+        thing.items.append(3)
+        thing.items = []
+        thing.table['b'] = 2
+
+        log.begin()
+        undone = []
+        log.record(undone.append, 'second')
+        self.assertEqual(len(log), 2)
+
+        self.assertTrue(log.undo())
+        self.assertEqual(undone, ['second'])
+        self.assertTrue(log.undo())
+        self.assertEqual(thing.value, 0)
+        self.assertIs(thing.items, items)
+        self.assertEqual(thing.items, [1, 2])
+        self.assertEqual(thing.table, {'a': 1})
+        self.assertFalse(log.undo())
+
+    def test_records_are_undone_in_reverse_order(self):
+        log = UndoLog()
+        undone = []
+        log.begin()
+        for i in range(3):
+            log.record(undone.append, i)
+        log.undo()
+        self.assertEqual(undone, [2, 1, 0])
+
+    def test_games_step_back(self):
+        np_random = np.random.RandomState(0)
+        for env_name in ('blackjack', 'limit-holdem', 'no-limit-holdem', 'uno', 'mahjong', 'doudizhu'):
+            env = rlcard.make(env_name, config={'seed': 0, 'allow_step_back': True})
+            state, player_id = env.reset()
+            states = []
+            while not env.is_over():
+                states.append((player_id, state))
+                legal_actions = list(state['legal_actions'])
+                state, player_id = env.step(legal_actions[np_random.randint(len(legal_actions))])
+            while states:
+                self.assertTrue(env.step_back())
+                player_id, state = states.pop()
+                self.assertEqual(env.get_player_id(), player_id)
+                restored_state = env.get_state(player_id)
+                self.assertTrue(np.array_equal(restored_state['obs'], state['obs']))
+                self.assertEqual(list(restored_state['legal_actions']), list(state['legal_actions']))
+            self.assertFalse(env.step_back())
+
+
+if __name__ == '__main__':
+    unittest.main()
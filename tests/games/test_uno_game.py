@@ -69,6 +69,24 @@ class TestUnoMethods(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_same_draw(self):
+        for seed in range(20):
+            game = Game(allow_step_back=True)
+            game.np_random = np.random.RandomState(seed)
+            game.init_game()
+            for _ in range(30):
+                if game.is_over():
+                    break
+                legal_actions = game.get_legal_actions()
+                action = 'draw' if 'draw' in legal_actions else legal_actions[0]
+                game.step(action)
+                target = game.round.target.get_str()
+                hands = [[card.get_str() for card in player.hand] for player in game.players]
+                game.step_back()
+                game.step(action)
+                self.assertEqual(game.round.target.get_str(), target)
+                self.assertEqual([[card.get_str() for card in player.hand] for player in game.players], hands)
+
     def test_hand2dict(self):
         hand_1 = ['y-1', 'r-8', 'b-9', 'y-reverse', 'r-skip']
         hand1_dict = hand2dict(hand_1)
@@ -0,0 +1,151 @@
+import os
+import csv
+import tempfile
+import unittest
+import numpy as np
+import torch
+
+import rlcard
+from rlcard.agents.random_agent import RandomAgent
+from rlcard.agents.dqn_agent import DQNAgent
+from rlcard.utils.logger import Logger
+from rlcard.utils.evaluation import parallel_tournament, play_games, summarize_payoffs, AsyncEvaluator, \
+    duplicate_tournament, _evaluation_snapshot
+
+
+class FirstActionAgent(object):
+    ''' Always plays the first legal action
+    '''
+
+    use_raw = False
+
+    def step(self, state):
+        return next(iter(state['legal_actions']))
+
+    def eval_step(self, state):
+        return self.step(state), {}
+
+
+class TestEvaluation(unittest.TestCase):
+
+    def make_env(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        env.set_agents([RandomAgent(env.num_actions), RandomAgent(env.num_actions)])
+        return env
+
+    def test_summarize_payoffs(self):
+        payoffs = np.array([[1, -1], [3, -3], [2, -2]])
+        result = summarize_payoffs(payoffs, confidence=0.95)
+        self.assertTrue(np.allclose(result.mean, [2, -2]))
+        self.assertTrue(np.allclose(result.stderr, [1 / np.sqrt(3), 1 / np.sqrt(3)]))
+        self.assertTrue(np.allclose(result.upper - result.mean, 1.959964 * result.stderr))
+        self.assertTrue(np.allclose(result.mean - result.lower, 1.959964 * result.stderr))
+        result = summarize_payoffs(payoffs, confidence=0.99)
+        self.assertTrue(np.allclose(result.upper - result.mean, 2.575829 * result.stderr))
+
+    def test_play_games(self):
+        env = self.make_env()
+        np.random.seed(1)
+        expected = np.random.random_sample()
+        np.random.seed(1)
+        payoffs = play_games(env, [3, 4, 3])
+        self.assertEqual(payoffs.shape, (3, 2))
+        self.assertTrue(np.array_equal(payoffs[0], payoffs[2]))
+        self.assertEqual(np.random.random_sample(), expected)
+
+    def test_parallel_tournament(self):
+        env = self.make_env()
+        serial = parallel_tournament(env, 50, num_workers=1, seed=7)
+        parallel = parallel_tournament(env, 50, num_workers=2, seed=7)
+        self.assertEqual(serial.payoffs.shape, (50, 2))
+        self.assertTrue(np.array_equal(serial.payoffs, parallel.payoffs))
+        self.assertTrue(np.allclose(serial.mean, serial.payoffs.mean(axis=0)))
+        self.assertTrue(np.all(serial.lower <= serial.mean) and np.all(serial.mean <= serial.upper))
+
+    def test_duplicate_tournament(self):
+        env = self.make_env()
+        agents = env.agents
+        # The same agent in both seats scores the same on every deal
+        env.set_agents([agents[0], agents[0]])
+        result = duplicate_tournament(env, 30, seed=0, batch_size=10)
+        self.assertEqual(result.scores.payoffs.shape, (30, 2))
+        self.assertTrue(np.allclose(result.scores.payoffs, 0))
+        self.assertTrue(np.allclose(result.differences.payoffs, 0))
+        self.assertEqual(env.agents, [agents[0], agents[0]])
+
+        env.set_agents(agents)
+        result = duplicate_tournament(env, 30, seed=1, batch_size=10)
+        self.assertTrue(np.array_equal(result.scores.payoffs,
+                                       duplicate_tournament(env, 30, seed=1, batch_size=10).scores.payoffs))
+        self.assertTrue(np.allclose(result.scores.mean, result.scores.payoffs.mean(axis=0)))
+        self.assertTrue(np.allclose(result.differences.payoffs[:, 0],
+                                    result.scores.payoffs[:, 0] - result.scores.payoffs[:, 1]))
+        self.assertEqual(env.agents, agents)
+
+        # Stops at the first batch with narrow enough intervals
+        result = duplicate_tournament(env, 1000, seed=1, target_width=100, batch_size=10)
+        self.assertEqual(len(result.differences.payoffs), 10)
+
+        with self.assertRaises(ValueError):
+            duplicate_tournament(env, 0)
+
+    def test_duplicate_tournament_not_zero_sum(self):
+        env = rlcard.make('pisti', config={'seed': 0})
+        agent = FirstActionAgent()
+        # Pisti is not zero-sum: the scores carry the points of the deal, not the differences
+        env.set_agents([agent, agent])
+        result = duplicate_tournament(env, 1000, seed=0, target_width=1e-6, batch_size=20)
+        self.assertEqual(len(result.scores.payoffs), 20)
+        self.assertFalse(np.allclose(result.scores.payoffs, 0))
+        self.assertTrue(np.allclose(result.differences.payoffs, 0))
+
+        env.set_agents([agent, RandomAgent(env.num_actions)])
+        result = duplicate_tournament(env, 200, seed=0, batch_size=50)
+        deal_scores = result.scores.payoffs
+        self.assertTrue(np.allclose(result.differences.payoffs[:, 0], deal_scores[:, 0] - deal_scores[:, 1]))
+        self.assertTrue(np.allclose(result.differences.payoffs[:, 1], -result.differences.payoffs[:, 0]))
+        self.assertTrue(np.allclose(result.differences.mean[0], result.scores.mean[0] - result.scores.mean[1]))
+
+    def test_async_evaluator(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        agent = DQNAgent(num_actions=env.num_actions,
+                         state_shape=env.state_shape[0],
+                         mlp_layers=[8],
+                         device=torch.device('cpu'))
+        agents = [agent, RandomAgent(env.num_actions)]
+        with tempfile.TemporaryDirectory() as log_dir:
+            with Logger(log_dir) as logger:
+                evaluator = AsyncEvaluator(env, agents, logger, 20, max_outstanding=1, seed=0)
+                for episode in (0, 10, 20):
+                    evaluator.submit(episode, agent)
+                    self.assertLessEqual(len(evaluator._pending), 1)
+                evaluator.close()
+            with open(os.path.join(log_dir, 'performance.csv')) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([int(row['episode']) for row in rows], [0, 10, 20])
+        self.assertEqual([episode for episode, _ in evaluator.results], [0, 10, 20])
+        self.assertEqual(evaluator.results[0][1].payoffs.shape, (20, 2))
+
+    def test_evaluation_snapshot_on_cpu(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        agent = DQNAgent(num_actions=env.num_actions,
+                         state_shape=env.state_shape[0],
+                         mlp_layers=[8],
+                         device=torch.device('cpu'))
+        # A learner on the GPU, as far as its checkpoint tells
+        agent.device = agent.q_estimator.device = agent.target_estimator.device = torch.device('cuda:0')
+        snapshot = _evaluation_snapshot(agent)
+        self.assertEqual(snapshot['device'], torch.device('cpu'))
+        self.assertEqual(snapshot['q_estimator']['device'], torch.device('cpu'))
+        self.assertEqual(agent.device, torch.device('cuda:0'))
+        for tensor in snapshot['q_estimator']['qnet'].values():
+            self.assertEqual(tensor.device, torch.device('cpu'))
+        restored = DQNAgent.from_checkpoint(snapshot)
+        self.assertEqual(restored.device, torch.device('cpu'))
+        for name, tensor in agent.q_estimator.qnet.state_dict().items():
+            self.assertTrue(torch.equal(restored.q_estimator.qnet.state_dict()[name], tensor))
+        restored.eval_step(env.reset()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,14 @@
+import os
+import json
+import tempfile
 import itertools
 import unittest
 
 from rlcard.games.limitholdem.judger import LimitHoldemJudger
 from rlcard.games.limitholdem.utils import compare_hands
 from rlcard.games.limitholdem.utils import Hand as Hand
+from rlcard.games.limitholdem import evaluator
+from rlcard.games.limitholdem.equity import equity, preflop_class, preflop_equity
 import numpy as np
 ''' Combinations selected for testing compare_hands function
 Royal straight flush ['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8', 'CA']
@@ -19,6 +24,58 @@ Highcards ['CJ', 'S5', 'H9', 'B4', 'C2', 'C8', 'C7'] ['CJ', 'S5', 'H9', 'B4', 'C
 '''
 class TestHoldemUtils(unittest.TestCase):
 
+    def test_evaluator(self):
+        np_random = np.random.RandomState(0)
+        cards = np.array([np_random.permutation(52)[:7] for _ in range(300)])
+        values = evaluator.evaluate_batch(cards)
+        for hand, value in zip(cards, values):
+            hand = [int(card) for card in hand]
+            self.assertEqual(evaluator.evaluate(hand), value)
+            self.assertEqual(evaluator.evaluate_cards([evaluator.int_to_card(card) for card in hand]), value)
+            # The value of seven cards is the value of their best five
+            self.assertEqual(max(evaluator.evaluate(five) for five in itertools.combinations(hand, 5)), value)
+            old_hand = Hand([evaluator.int_to_card(card) for card in hand])
+            old_hand.evaluateHand()
+            self.assertEqual(evaluator.category(value), old_hand.category)
+
+        royal_flush = [evaluator.card_to_int(card) for card in ['SA', 'SK', 'SQ', 'SJ', 'ST', 'H2', 'D3']]
+        wheel = [evaluator.card_to_int(card) for card in ['SA', 'H2', 'D3', 'C4', 'S5', 'HK', 'DK']]
+        self.assertEqual(evaluator.category(evaluator.evaluate(royal_flush)), evaluator.STRAIGHT_FLUSH)
+        self.assertEqual(evaluator.category(evaluator.evaluate(wheel)), evaluator.STRAIGHT)
+        self.assertEqual(list(evaluator.evaluate_batch([royal_flush, wheel])),
+                         [evaluator.evaluate(royal_flush), evaluator.evaluate(wheel)])
+
+    def test_equity(self):
+        # The board is enumerated: 990 turns and rivers
+        equities = equity([['SA', 'HA'], ['SK', 'HK']], board=['C2', 'D7', 'HJ'])
+        self.assertAlmostEqual(equities.sum(), 1)
+        self.assertAlmostEqual(equities[0], 907 / 990)
+        np.testing.assert_array_equal(equity([['S2', 'H7'], ['SA', 'HK']], board=['C3', 'D4', 'H5', 'S6', 'DA']), [1, 0])
+        np.testing.assert_array_equal(equity([['S2', 'H3'], ['D2', 'C3']], board=['SA', 'SK', 'SQ', 'SJ', 'ST']), [0.5, 0.5])
+        with self.assertRaises(ValueError):
+            equity([['SA', 'HA'], ['SA', 'HK']])
+
+        # The opponents are sampled
+        equities = equity([['SA', 'HA']], num_opponents=2, num_samples=20000, seed=0)
+        self.assertEqual(len(equities), 3)
+        self.assertAlmostEqual(equities.sum(), 1)
+        self.assertAlmostEqual(equities[0], 0.73, delta=0.02)
+        np.testing.assert_array_equal(equities, equity([['SA', 'HA']], num_opponents=2, num_samples=20000, seed=0))
+
+    def test_preflop_equity(self):
+        self.assertEqual(preflop_class(['HT', 'S9']), 'T9o')
+        self.assertEqual(preflop_class(['H9', 'HT']), 'T9s')
+        self.assertEqual(preflop_class([evaluator.card_to_int('D7'), evaluator.card_to_int('C7')]), '77')
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, 'preflop.json')
+            aces = preflop_equity(['HA', 'DA'], num_samples=20000, cache_path=cache_path)
+            self.assertAlmostEqual(aces, 0.85, delta=0.02)
+            self.assertEqual(preflop_equity(['CA', 'SA'], num_samples=20000, cache_path=cache_path), aces)
+            with open(cache_path) as f:
+                self.assertEqual(json.load(f), {'AA:1:20000': aces})
+            self.assertLess(preflop_equity(['H7', 'D2'], num_samples=20000, cache_path=cache_path), 0.4)
+
     def test_evaluate_hand_exception(self):
 
         hand = Hand(['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8'])
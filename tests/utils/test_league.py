@@ -0,0 +1,97 @@
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents import CFRAgent
+from rlcard.utils.league import League, elo_ratings, find_models, model_key
+
+
+class TestLeague(unittest.TestCase):
+
+    def test_elo_ratings(self):
+        scores = np.array([[0, 8, 9], [2, 0, 6], [1, 4, 0]])
+        games = np.array([[0, 10, 10], [10, 0, 10], [10, 10, 0]])
+        ratings = elo_ratings(scores, games)
+        self.assertAlmostEqual(ratings.mean(), 1500)
+        self.assertTrue(ratings[0] > ratings[1] > ratings[2])
+
+        # Equal scores give equal ratings, unplayed models stay at the mean
+        ratings = elo_ratings(np.array([[0, 5, 0], [5, 0, 0], [0, 0, 0]]),
+                              np.array([[0, 10, 0], [10, 0, 0], [0, 0, 0]]))
+        self.assertTrue(np.allclose(ratings, 1500))
+
+    def test_league(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, 'pairings.json')
+            league = League('leduc-holdem', ['random', 'leduc-holdem-rule-v1'], 10, cache_path=cache_path)
+            league.run()
+            payoffs, ratings = league.results()
+            self.assertEqual(payoffs.shape, (2, 2))
+            self.assertAlmostEqual(payoffs[0, 1], -payoffs[1, 0])
+            self.assertEqual(len(ratings), 2)
+            with open(cache_path) as f:
+                cache = json.load(f)
+            self.assertEqual(len(cache['pairings']), 1)
+            self.assertEqual(cache['pairings'][0]['num_games'], 20)
+
+            # A cached pairing is not played again
+            self.assertEqual(cache['pairings'][0]['models'], ['leduc-holdem-rule-v1', 'random'])
+            cache['pairings'][0]['payoffs'] = [-5.0, 5.0]
+            with open(cache_path, 'w') as f:
+                json.dump(cache, f)
+            league = League('leduc-holdem', ['random', 'leduc-holdem-rule-v1', 'leduc-holdem-rule-v2'], 10, cache_path=cache_path)
+            league.run()
+            payoffs, ratings = league.results()
+            self.assertEqual(len(league.pairings), 3)
+            self.assertAlmostEqual(payoffs[0, 1], 0.25)
+            self.assertNotEqual(payoffs[0, 2], 0)
+
+            # The order of the models does not matter
+            league = League('leduc-holdem', ['leduc-holdem-rule-v2', 'leduc-holdem-rule-v1', 'random'], 10, cache_path=cache_path)
+            reversed_payoffs, _ = league.results()
+            self.assertTrue(np.allclose(reversed_payoffs, payoffs[::-1, ::-1]))
+            league.run()
+            self.assertEqual(len(league.pairings), 3)
+            self.assertAlmostEqual(league.results()[0][2, 1], 0.25)
+
+            # A different number of games ignores the cache
+            league = League('leduc-holdem', ['random', 'leduc-holdem-rule-v1'], 5, cache_path=cache_path)
+            self.assertEqual(len(league.pairings), 0)
+
+    def test_retrained_model_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            model_path = os.path.join(directory, 'cfr_model')
+            agent = CFRAgent(rlcard.make('leduc-holdem', config={'allow_step_back': True}), model_path=model_path)
+            agent.train()
+            agent.save()
+            cache_path = os.path.join(directory, 'pairings.json')
+            league = League('leduc-holdem', [model_path, 'random'], 5, cache_path=cache_path)
+            league.run()
+            key = model_key(model_path)
+
+            # Saving again overwrites the files of the directory, the pairing is played again
+            for _ in range(3):
+                agent.train()
+            agent.save()
+            self.assertNotEqual(model_key(model_path), key)
+            league = League('leduc-holdem', [model_path, 'random'], 5, cache_path=cache_path)
+            league.run()
+            self.assertEqual(len(league.pairings), 2)
+            self.assertIn(tuple(sorted([model_key(model_path), 'random'])), league.pairings)
+
+    def test_find_models(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'cfr_model'))
+            for name in ('model.pth', 'notes.txt'):
+                open(os.path.join(directory, name), 'w').close()
+            models = find_models(directory)
+            self.assertEqual([os.path.basename(model) for model in models], ['cfr_model', 'model.pth'])
+            self.assertNotEqual(model_key(models[1]), models[1])
+            self.assertEqual(model_key('random'), 'random')
+
+
+if __name__ == '__main__':
+    unittest.main()
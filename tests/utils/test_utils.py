@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
-from rlcard.utils.utils import init_54_deck, init_standard_deck, rank2int, print_card, elegent_form, reorganize, tournament
+from rlcard.utils.utils import init_54_deck, init_standard_deck, rank2int, print_card, elegent_form, reorganize, tournament, run_batch, \
+    stack_states, remove_illegal, remove_illegal_batch, sample_actions
 import rlcard
 from rlcard.agents.random_agent import RandomAgent
 
@@ -37,11 +38,76 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(len(trajectories[0]), 1)
         self.assertEqual(len(trajectories[0][0]), 5)
 
+    def test_batch_helpers(self):
+        states = [{'obs': np.zeros(2), 'legal_actions': {0: None, 2: None}},
+                  {'obs': np.ones(2), 'legal_actions': {1: None}}]
+        obs, legal_mask = stack_states(states, 3)
+        self.assertEqual(obs.shape, (2, 2))
+        self.assertEqual(legal_mask.tolist(), [[True, False, True], [False, True, False]])
+
+        action_probs = np.array([[0.2, 0.5, 0.3], [0.5, 0, 0.5]])
+        probs = remove_illegal_batch(action_probs, legal_mask)
+        for i, state in enumerate(states):
+            self.assertTrue(np.allclose(probs[i], remove_illegal(action_probs[i], list(state['legal_actions']))))
+
+        np.random.seed(0)
+        actions = np.array([sample_actions(probs) for _ in range(1000)])
+        self.assertTrue(set(actions[:, 0]) == {0, 2})
+        self.assertTrue(np.all(actions[:, 1] == 1))
+        self.assertAlmostEqual(np.mean(actions[:, 0] == 0), 0.4, delta=0.05)
+
     def test_tournament(self):
         env = rlcard.make('leduc-holdem')
         env.set_agents([RandomAgent(env.num_actions), RandomAgent(env.num_actions)])
         payoffs = tournament(env,1000)
         self.assertEqual(len(payoffs), 2)
 
+    def test_run_batch(self):
+        class FirstActionAgent(object):
+            use_raw = False
+
+            def __init__(self):
+                self.batch_sizes = []
+
+            def step(self, state):
+                return list(state['legal_actions'])[0]
+
+            def eval_step(self, state):
+                return self.step(state), {}
+
+            def step_batch(self, states):
+                self.batch_sizes.append(len(states))
+                return [self.step(state) for state in states]
+
+        agent = FirstActionAgent()
+        envs = []
+        for seed in range(4):
+            env = rlcard.make('leduc-holdem', config={'seed': seed})
+            env.set_agents([agent, agent])
+            envs.append(env)
+        batch_trajectories, batch_payoffs = run_batch(envs, is_training=True)
+        self.assertEqual(agent.batch_sizes[0], 4)
+        self.assertEqual(len(batch_trajectories), 4)
+
+        # The games are the same as played one by one
+        for seed in range(4):
+            env = rlcard.make('leduc-holdem', config={'seed': seed})
+            env.set_agents([agent, agent])
+            trajectories, payoffs = env.run(is_training=True)
+            trajectories = reorganize(trajectories, payoffs)
+            self.assertEqual(list(payoffs), list(batch_payoffs[seed]))
+            for player_id in range(2):
+                self.assertEqual(len(trajectories[player_id]), len(batch_trajectories[seed][player_id]))
+                for ts, batch_ts in zip(trajectories[player_id], batch_trajectories[seed][player_id]):
+                    self.assertTrue(np.array_equal(ts[0]['obs'], batch_ts[0]['obs']))
+                    self.assertEqual(ts[1:3], batch_ts[1:3])
+                    self.assertEqual(ts[4], batch_ts[4])
+
+        # Agents without step_batch are called per state
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        env.set_agents([RandomAgent(env.num_actions), RandomAgent(env.num_actions)])
+        _, payoffs = run_batch([env], is_training=False)
+        self.assertEqual(len(payoffs[0]), 2)
+
 if __name__ == '__main__':
     unittest.main()